@@ -3,17 +3,59 @@ import os
 import csv
 import logging
 import os.path
-import math
+import json
+from collections import deque
 
 sys.path.append(os.path.abspath("tests"))
-from consts import ZERO_ADDR, INIT_SUPPLY, E_18
-from utils import fetch_events, get_contract_object
+from consts import INIT_SUPPLY, E_18
+from utils import scan_events, scan_logs, get_contract_object
+from event_store import EventStore
+from balance_indexer import BalanceIndexer
+from address import Address
+from rpc_batch import RpcBatchClient
+from batch_planner import MultiSendBatchPlanner
+from run_journal import RunJournal
+from reconciliation import Reconciliation
 from brownie import chain, accounts, FLIP, web3, network, MultiSend
 
 
 logname = "airdrop.log"
 logging.basicConfig(filename=logname, level=logging.INFO)
 
+# Transfer events already fetched in previous runs are read from here, so a re-run only
+# fetches the new blocks. Delete the file to fetch everything again. Stored logs are checked
+# against the chain's block hashes, so a new local session doesn't reuse the previous one's.
+eventStoreFilename = os.environ.get("EVENT_STORE_FILE") or "airdropEvents.sqlite"
+eventStore = None
+
+
+def getEventStore():
+    global eventStore
+    if eventStore is None:
+        eventStore = EventStore(eventStoreFilename)
+    return eventStore
+
+
+# Progress of the airdrop (phases completed, MultiSend address, transactions sent and their
+# receipts) used to resume it. airdrop.log is only for humans, but a journal can be
+# created from the log of a run started before it existed (see importLogIntoJournal).
+journalFilename = os.environ.get("AIRDROP_JOURNAL_FILE") or "airdropJournal.sqlite"
+journal = None
+
+
+def getJournal():
+    global journal
+    if journal is None:
+        journal = RunJournal(journalFilename)
+        if len(journal) == 0 and os.path.exists(logname):
+            importLogIntoJournal(journal)
+    return journal
+
+
+# Checkpoints of the old FLIP balances, so a snapshot at a later block only folds the new
+# Transfer events. Delete the file to rebuild the balances from the deployment block.
+balanceIndexFilename = os.environ.get("BALANCE_INDEX_FILE") or "airdropBalances.sqlite"
+
 
 # -------------------- Airdrop specific parmeters -------------------- #
 oldStateChainGateway = "0xC960C4eEe4ADf40d24374D85094f3219cf2DD8EB"
@@ -34,6 +76,12 @@ newStateChainGateway = "0x38AA40B7b5a70d738baBf6699a45DacdDBBEB3fc"
 # Set amount to zero to airdrop to all addresses
 airdrop_amount_cutoff = 1000 * E_18
 verify_amount_cutoff = 6000 * 10**18
+# Set VERIFY_ALL_HOLDERS to check the snapshot balance of every holder, not only the top ones
+snapshot_verify_amount_cutoff = (
+    0 if os.environ.get("VERIFY_ALL_HOLDERS") else verify_amount_cutoff
+)
+snapshotVerificationFilename = "snapshotVerification.json"
+airdropReconciliationFilename = "airdropReconciliation.json"
 # -------------------------------------------------------------------- #
 
 
@@ -44,11 +92,18 @@ airdropScGatewaySuccess = "Airdrop to ScGateway sent and confirmed!"
 airdropSuccessMessage = "😎  Airdrop transactions sent and confirmed! 😎"
 multiSendDeploySuccessMessage = "MultiSend deployed at: "
 
-# Amount of transfers per transaction so we don't reach gas limit
+# Transfers are packed into transactions up to this fraction of the block gas limit, with the
+# gas per transfer measured with estimate_gas (see MultiSendBatchPlanner)
+transfer_batch_gas_fraction = float(
+    os.environ.get("TRANSFER_BATCH_GAS_FRACTION") or 0.5
+)
+# Optional cap of transfers per transaction
 # NOTE: When forking with hardhat, doing more than 100 transfers per transaction times out.
-# However in a real network we can easily do 200, gas limit is the only limitation.
 # We can fork at a particular block doing this --fork-block-number 14390000
-transfer_batch_size = 200
+transfer_batch_size = int(os.environ.get("TRANSFER_BATCH_SIZE") or 0) or None
+# Airdrop transactions sent without waiting for the previous ones to be mined. The nonces are
+# assigned locally so they are mined in order. Set it to 1 to wait for every transaction.
+airdrop_max_in_flight = int(os.environ.get("AIRDROP_MAX_IN_FLIGHT") or 8)
 
 # Set the priority fee for all transactions
 network.priority_fee("1 gwei")
@@ -71,23 +126,16 @@ def main():
 
     # --------------------------- Start of the script logic  ----------------------------
 
-    parsedLog = []
-    # Start parsing log
-    file = open(logname, "r")
-    for line in file.readlines():
-        # Only check info messages from previous run (disregard DEBUG and ERROR) and remove end of line
-        infoMessage = line.rstrip("\n").split("INFO:root:")
-        if len(infoMessage) > 1:
-            parsedLog.append(infoMessage[1])
+    journal = getJournal()
 
     logging.info(
         "=========================   Running airdrop.py script  =========================="
     )
 
     # Do oldFlip snapshot if it is has not been logged or if the snapshot csv doesn't exist
-    if (not snapshotSuccessMessage + oldFlipSnapshotFilename in parsedLog) or (
-        not os.path.exists(oldFlipSnapshotFilename)
-    ):
+    if (
+        journal.get("phase", "snapshot", {}).get("filename") != oldFlipSnapshotFilename
+    ) or (not os.path.exists(oldFlipSnapshotFilename)):
         assert chain.id == 5 or chain.id == 31337, logging.error(
             "Wrong chain. Should be running in goerli"
         )
@@ -113,13 +161,9 @@ def main():
         printAndLog("Skipped old FLIP snapshot - snapshot already taken")
 
     # Deploy a Multisend if there isn't a deployed one.
-    multiSend_address = None
-
-    for line in parsedLog:
-        if multiSendDeploySuccessMessage in line:
-            _, multiSend_address = line.split(multiSendDeploySuccessMessage, 1)
-            printAndLog("MultiSend already deployed")
-            break
+    multiSend_address = journal.getAddress("MultiSend")
+    if multiSend_address != None:
+        printAndLog("MultiSend already deployed")
 
     if multiSend_address == None:
         deployMultiSend = input("Deploy MultiSend contract? (y)/n : ")
@@ -130,14 +174,18 @@ def main():
             {"from": airdropper, "required_confs": 1},
         )
         printAndLog(multiSendDeploySuccessMessage + str(multiSend.address))
+        journal.setAddress("MultiSend", multiSend.address)
         multiSend_address = multiSend.address
 
     # Skip airdrop if it is logged succesfully. However, call Airdrop if it has failed at any point before the
     # succesful logging so all sent transactions are checked and we do the remaining airdrop transfers (if any)
-    if not airdropSuccessMessage in parsedLog:
+    if not journal.isPhaseComplete("airdrop"):
         # Inform the user if we are starting or continuing the airdrop
         printAndLog("Airdropper account: " + str(airdropper))
-        if startAirdropMessage in parsedLog:
+        if journal.isPhaseComplete("airdropStarted"):
+            # Transactions from the previous run might still be pending. They need to be mined
+            # before checking which holders have already been airdropped.
+            waitForJournalTXsToComplete(journal)
             inputString = (
                 "Do you want to continue the previously started airdrop? (y)/n : "
             )
@@ -153,7 +201,7 @@ def main():
             oldFlipSnapshotFilename,
             newFlip,
             newStateChainGateway,
-            airdropScGatewaySuccess not in parsedLog,
+            not journal.isPhaseComplete("scGatewayAirdrop"),
             multiSend_address,
         )
     else:
@@ -179,74 +227,66 @@ def snapshot(
     (oldFlipContract, oldFlipContractObject) = getContractFromAddress(
         "FLIP", goerliOldFlip
     )
-    # It will throw an error if there are more than 10.000 events (free Infura Limitation)
-    # Split it if that is the case - there is no time requirement anyway
-
-    # lets do a fetch every 10000 blocks - in total it's around 1,3M blocks. That's to avoid
-    # the providers 10k limits. It might need to be reduced to 1k if Infura rpc calls fail.
-    step = 10000
-    next_block = oldFlip_deployment_block + step
-    from_block = oldFlip_deployment_block
-
-    events = []
-
-    while True:
-        print(
-            "Fetching events from block " + str(from_block) + " to " + str(next_block)
-        )
-        new_events = list(
-            fetch_events(
-                oldFlipContractObject.events.Transfer,
-                from_block=from_block,
-                to_block=next_block,
-            )
-        )
-        events.extend(new_events)
-
-        if next_block == snapshot_blocknumber:
-            break
-        else:
-            # Both from & to_block are inclusive
-            from_block = next_block + 1
-            next_block += step
-            if next_block > snapshot_blocknumber:
-                next_block = snapshot_blocknumber
-
-    # Alternative to avoid the slow getBalance calls which take hourse
-    print("Number of events to be processed: ", len(events))
-    totalBalance = 0
-    holder_dict = {}
-    for event in events:
-        if event.args["value"] == 0:
-            continue
-
-        if event.args["from"] != "0x0000000000000000000000000000000000000000":
-            holder_dict[event.args["from"]] -= event.args["value"]
-            assert holder_dict[event.args["from"]] >= 0
-            if holder_dict[event.args["from"]] == 0:
-                del holder_dict[event.args["from"]]
-        else:
-            totalBalance += event.args["value"]
-
-        if event.args["to"] != "0x0000000000000000000000000000000000000000":
-            holder_dict[event.args["to"]] = (
-                holder_dict.get(event.args["to"], 0) + event.args["value"]
-            )
-            assert holder_dict[event.args["to"]] > 0
-        else:
-            totalBalance -= event.args["value"]
+    # Providers reject ranges with more than 10.000 events (free Infura Limitation) so the
+    # ~1,3M blocks are scanned in ranges that shrink when rejected and grow back otherwise.
+    print(
+        "Fetching events from block "
+        + str(oldFlip_deployment_block)
+        + " to "
+        + str(snapshot_blocknumber)
+    )
+    # Alternative to avoid the slow getBalance calls which take hourse. The balances are
+    # resumed from the closest checkpoint of a previous run and only the logs after it are
+    # decoded and folded, chunk by chunk while the next ones are being fetched.
+    balanceIndexer = BalanceIndexer(
+        balanceIndexFilename,
+        goerliOldFlip,
+        web3.eth.chain_id,
+        oldFlip_deployment_block,
+        lambda fromBlock, toBlock: scan_logs(
+            oldFlipContractObject.events.Transfer,
+            fromBlock,
+            toBlock,
+            store=getEventStore(),
+        ),
+    )
+    holder_dict = balanceIndexer.balancesAt(snapshot_blocknumber)
+    (totalBalance, numberEvents) = (
+        balanceIndexer.totalBalance,
+        balanceIndexer.numberEvents,
+    )
+    balanceIndexer.close()
+    print("Number of events processed: ", numberEvents)
 
     sorted_dict = dict(sorted(holder_dict.items(), key=lambda x: x[1], reverse=True))
 
     # Verify that at least the most relevant accounts' balances are correct
     print("Verifying balances of top holders")
-    for holder, balance in sorted_dict.items():
-        if balance < verify_amount_cutoff:
-            break
-        else:
-            assert balance == oldFlipContract.balanceOf(
-                holder, block_identifier=snapshot_blocknumber
-            )
+    holdersToVerify = {
+        holder: balance
+        for holder, balance in sorted_dict.items()
+        if balance >= snapshot_verify_amount_cutoff
+    }
+    mismatches = verifyBalances(oldFlipContract, holdersToVerify, snapshot_blocknumber)
+    with open(snapshotVerificationFilename, "w") as f:
+        json.dump(
+            {
+                "blockNumber": snapshot_blocknumber,
+                "holdersVerified": len(holdersToVerify),
+                "mismatches": mismatches,
+            },
+            f,
+            indent=2,
+        )
+    printAndLog(
+        "Verified "
+        + str(len(holdersToVerify))
+        + " holders, "
+        + str(len(mismatches))
+        + " mismatches. Report stored in "
+        + snapshotVerificationFilename
+    )
+    assert len(mismatches) == 0
 
     holder_list = list(sorted_dict.keys())
     holder_balances = list(sorted_dict.values())
@@ -282,6 +322,9 @@ def snapshot(
             writer.writerow(row)
 
     printAndLog(snapshotSuccessMessage + filename)
+    getJournal().completePhase(
+        "snapshot", filename=filename, blockNumber=snapshot_blocknumber
+    )
 
 
 # --- Airdrop process ----
@@ -319,12 +362,12 @@ def airdrop(
     # Craft list of addresses that should be skipped when airdropping. Skip following receivers: airdropper,
     # newStateChainGateway, oldStateChainGateway and oldFlipDeployer. Also skip receivers that have already received
     # their airdrop. OldFlipDeployer can be the same as airdropper, that should be fine.
-    skip_receivers_list = [
-        str(airdropper),
-        newStateChainGateway,
-        oldStateChainGateway,
-        oldFlipDeployer,
-    ]
+    skip_receivers = {
+        Address(airdropper),
+        Address(newStateChainGateway),
+        Address(oldStateChainGateway),
+        Address(oldFlipDeployer),
+    }
 
     listAirdropTXs, stateChainGatewayMinted = getTXsAndMintBalancesFromTransferEvents(
         airdropper, newFlipContractObject, newStateChainGateway, multiSend_address
@@ -377,6 +420,13 @@ def airdrop(
             {"from": airdropper, "required_confs": required_confs},
         )
         logging.info("Airdrop transaction Tx Hash:" + tx.txid)
+        getJournal().recordTx(tx.txid, nonce=tx.nonce, receiver="ScGateway")
+        getJournal().recordReceipt(
+            tx.txid,
+            status=int(tx.status),
+            gasUsed=tx.gas_used,
+            blockNumber=tx.block_number,
+        )
 
         assert (
             newFlipContract.balanceOf(str(newStateChainGateway))
@@ -391,6 +441,7 @@ def airdrop(
             "ScGateway supply difference div18: " + str(supplyDifference / E_18)
         )
         printAndLog(airdropScGatewaySuccess)
+        getJournal().completePhase("scGatewayAirdrop")
 
     doAirdrop = input("Proceeding with airdrops to the users. Continue? (y/n): ")
     if doAirdrop not in ["", "y", "Y", "yes", "Yes"]:
@@ -399,19 +450,20 @@ def airdrop(
 
     # Full list of addresses to skip - add already airdropped accounts
     for airdropTx in listAirdropTXs:
-        skip_receivers_list.append(airdropTx[0])
+        skip_receivers.add(airdropTx[0])
 
     printAndLog(startAirdropMessage)
+    getJournal().completePhase("airdropStarted")
 
     # Build a list of transactions to send
     listOfTxtoSend = []
     skip_counter = 0
     totalAmount_toTransfer = 0
     for i in range(len(oldFlipHolderAccounts)):
-        if oldFlipHolderAccounts[i] not in skip_receivers_list:
+        if oldFlipHolderAccounts[i] not in skip_receivers:
             if int(oldFlipholderBalances[i]) >= airdrop_amount_cutoff:
                 listOfTxtoSend.append(
-                    [oldFlipHolderAccounts[i], oldFlipholderBalances[i]]
+                    [str(oldFlipHolderAccounts[i]), oldFlipholderBalances[i]]
                 )
                 totalAmount_toTransfer += int(oldFlipholderBalances[i])
         else:
@@ -433,9 +485,21 @@ def airdrop(
             multiSend.address, totalAmount_toTransfer, {"from": airdropper}
         )
 
-    # Iterate over batches of 200 lists
-    for i in range(0, len(listOfTxtoSend), transfer_batch_size):
-        transfer_batches = listOfTxtoSend[i : i + transfer_batch_size]
+    # Nonce of the next airdrop transaction, pending ones (e.g. the approval) included
+    nonce = web3.eth.get_transaction_count(str(airdropper), "pending")
+    txsInFlight = deque()
+
+    batchPlanner = MultiSendBatchPlanner(
+        multiSend,
+        newFlipContract,
+        airdropper,
+        targetGasFraction=transfer_batch_gas_fraction,
+        maxBatchSize=transfer_batch_size,
+    )
+    batches = batchPlanner.plan(listOfTxtoSend)
+    printAndLog("Airdrop batches planned: " + str(len(batches)))
+
+    for (transfer_batches, predictedGas) in batches:
         # Process the batch
         total_transfer_batch = 0
         for transfer in transfer_batches:
@@ -448,18 +512,32 @@ def airdrop(
             newFlipContract,
             transfer_batches,
             total_transfer_batch,
-            {"from": airdropper, "required_confs": 1},
+            {"from": airdropper, "nonce": nonce, "required_confs": 0},
         )
-        # Logging each individually - if logged at the end of the loop and it breaks before that, then transfers won't be logged
+        # Journaling each individually - if journaled at the end of the loop and it breaks before that, then transfers won't be journaled
+        # On a rerun these are waited for (waitForJournalTXsToComplete) before working out what's left to airdrop
         logging.info("Airdrop transaction Tx Hash:" + tx.txid)
+        getJournal().recordTx(
+            tx.txid,
+            nonce=nonce,
+            transfers=len(transfer_batches),
+            predictedGas=predictedGas,
+        )
+        nonce += 1
 
         listOfTxSent.append(tx.txid)
+        txsInFlight.append((tx, predictedGas))
+        while len(txsInFlight) >= airdrop_max_in_flight:
+            waitForAirdropTx(*txsInFlight.popleft())
+
+    # After all tx's have been send wait for the receipts. This could break (or could have broken before) so extra safety mechanism is added when rerunning script
+    printAndLog("Waiting for airdrop transactions to be confirmed..")
+    while txsInFlight:
+        waitForAirdropTx(*txsInFlight.popleft())
 
     assert newFlipContract.allowance(airdropper, multiSend.address) == 0
     assert newFlipContract.balanceOf(multiSend.address) == 0
-    assert len(listOfTxSent) == int(
-        math.ceil(len(listOfTxtoSend) / transfer_batch_size)
-    )
+    assert len(listOfTxSent) == len(batches)
 
     # Should have skipped oldStateChainGateway and oldFlipDeployer for sure. NewStateChainGateway might have
     # been airdropped depending on the airdrop_scGateway flag but won't be in the lists anyway.
@@ -470,12 +548,8 @@ def airdrop(
         + ". Should have skipped at least 2 (oldStateChainGateway and oldFlipDeployer)"
     )
 
-    # After all tx's have been send wait for the receipts. This could break (or could have broken before) so extra safety mechanism is added when rerunning script
-    printAndLog("Waiting for airdrop transactions to be confirmed..")
-    for txSent in listOfTxSent:
-        web3.eth.wait_for_transaction_receipt(txSent)
-
     printAndLog(airdropSuccessMessage)
+    getJournal().completePhase("airdrop")
 
 
 # --- Verify Airdrop process ----
@@ -511,18 +585,27 @@ def verifyAirdrop(
         oldFlipDeployerBalance,
     ) = readCSVSnapshotChecksum(initalSnapshot)
 
+    # Holders are Address, so compare them against Address
+    (airdropperAddress, oldFlipDeployerAddress) = (
+        Address(airdropper),
+        Address(oldFlipDeployer),
+    )
+
     # Remove oldStateChainGateway - balance is different, will be checked separately below
-    assert oldFlipHolderAccounts[1] == oldStateChainGateway
+    assert oldFlipHolderAccounts[1] == Address(oldStateChainGateway)
     del oldFlipHolderAccounts[1]
     del oldFlipholderBalances[1]
 
     # New airdropper should get the old airdropper balance, assuming it had a balance. Delete oldFlipDeployer from the list.
-    if oldFlipDeployer in oldFlipHolderAccounts:
-        index = oldFlipHolderAccounts.index(oldFlipDeployer)
+    if oldFlipDeployerAddress in oldFlipHolderAccounts:
+        index = oldFlipHolderAccounts.index(oldFlipDeployerAddress)
         assert index == 0
         # New airdropper should get the oldFlipAirdropper balance plus the oldFlipBalance of the airdropper if any
-        if airdropper in oldFlipHolderAccounts and airdropper != oldFlipDeployer:
-            index_airdropper = oldFlipHolderAccounts.index(airdropper)
+        if (
+            airdropperAddress in oldFlipHolderAccounts
+            and airdropperAddress != oldFlipDeployerAddress
+        ):
+            index_airdropper = oldFlipHolderAccounts.index(airdropperAddress)
             amount = int(oldFlipholderBalances[index_airdropper])
         else:
             amount = 0
@@ -540,31 +623,29 @@ def verifyAirdrop(
         del oldFlipholderBalances[index]
 
     # Delete airdropper if it's still in the list, as it won't airdrop itself.
-    if airdropper in oldFlipHolderAccounts:
-        index = oldFlipHolderAccounts.index(airdropper)
+    if airdropperAddress in oldFlipHolderAccounts:
+        index = oldFlipHolderAccounts.index(airdropperAddress)
         del oldFlipHolderAccounts[index]
         del oldFlipholderBalances[index]
 
-    # Sanity check - this could potentially fail if the batch transfers have been broken and it has ended up
-    # doing a different amount of batches than if it had all succeeded.
-    assert int(math.ceil(len(listAirdropTXs) / transfer_batch_size)) <= int(
-        math.ceil(len(oldFlipHolderAccounts) / transfer_batch_size)
+    # Join the snapshot holders against the airdrop transfers. Holders below verify_amount_cutoff
+    # might not have been airdropped, but any transfer made to them must have the right amount.
+    # All the differences are written to airdropReconciliationFilename before failing.
+    reconciliation = Reconciliation(
+        zip(oldFlipHolderAccounts, oldFlipholderBalances),
+        listAirdropTXs,
+        requiredMinAmount=verify_amount_cutoff,
+    )
+    with open(airdropReconciliationFilename, "w") as f:
+        json.dump(reconciliation.report(), f, indent=2)
+    printAndLog("Airdrop reconciliation " + json.dumps(reconciliation.summary()))
+    assert reconciliation.ok, logging.error(
+        "Airdrop doesn't match the snapshot, check " + airdropReconciliationFilename
     )
 
-    # oldFlipHolderAccounts is ordered so we can break as soon as an amount is < verify_amount_cutoff
-    # It is check that oldFlipHolders have been airdropped the correct amount
-    for (holder, balance) in zip(oldFlipHolderAccounts, oldFlipholderBalances):
-        if int(balance) < verify_amount_cutoff:
-            continue
-        else:
-            airdrop_found = False
-            for listAirdropTX in listAirdropTXs:
-                if listAirdropTX[0] == str(holder):
-                    assert listAirdropTX[1] == int(balance)
-                    airdrop_found = True
-                    break
-            assert airdrop_found
-            continue
+    # Sanity check - this could potentially fail if the batch transfers have been broken and it has ended up
+    # airdropping more holders than there are in the snapshot.
+    assert len(listAirdropTXs) <= len(oldFlipHolderAccounts)
 
     # Extra check
     assert (
@@ -589,6 +670,39 @@ def printAndLog(text):
     logging.info(text)
 
 
+# Compare the balances against the token's balanceOf at blockNumber. The calls are sent in
+# JSON-RPC batches, several in flight at once. Returns all the mismatches.
+def verifyBalances(tokenContract, balances, blockNumber):
+    with RpcBatchClient() as client:
+        onChainBalances = {
+            holder: client.call(tokenContract.balanceOf, holder, block=blockNumber)
+            for holder in balances
+        }
+
+    mismatches = []
+    for holder, balance in balances.items():
+        try:
+            onChainBalance = onChainBalances[holder].result()
+        except Exception as e:
+            onChainBalance = None
+            error = str(e)
+        else:
+            if onChainBalance == balance:
+                continue
+            error = None
+        mismatches.append(
+            {
+                "holder": str(holder),
+                "snapshotBalance": str(balance),
+                "onChainBalance": None
+                if onChainBalance is None
+                else str(onChainBalance),
+                "error": error,
+            }
+        )
+    return mismatches
+
+
 # contract_name e.g. "FLIP"
 def getContractFromAddress(contract_name, contract_address):
     # Object to get the event interface from
@@ -610,31 +724,35 @@ def getTXsAndMintBalancesFromTransferEvents(
 ):
     printAndLog("Getting all transfer events")
     events = list(
-        fetch_events(
+        scan_events(
             flipContractObject.events.Transfer,
-            from_block=0,
-            to_block=web3.eth.block_number,
+            0,
+            web3.eth.block_number,
+            store=getEventStore(),
         )
     )
 
+    (airdropper, stateChainGateway, multiSend_address) = (
+        Address(airdropper),
+        Address(stateChainGateway),
+        Address(multiSend_address),
+    )
     listAirdropTXs = []
     initialMintTXs = []
     # Get all transfer events from the airdropper and the initial minting. MultiSend is used, so tx's
     # won't be from the airdropper but from the MultiSend
     for event in events:
-        toAddress = event.args.to
-        fromAddress = event.args["from"]
+        toAddress = Address(event.args.to)
+        fromAddress = Address(event.args["from"])
         amount = event.args.value
         # If there has been an airdrop to the stateChainGateway just account for the amount to make checking easier
-        if fromAddress == str(airdropper) and toAddress == stateChainGateway:
+        if fromAddress == airdropper and toAddress == stateChainGateway:
             continue
-        # Addresses should be unique but just in case
-        elif fromAddress == str(multiSend_address) and (
-            toAddress not in listAirdropTXs
-        ):
+        # Addresses should be unique, duplicates are kept so the verification reports them
+        elif fromAddress == multiSend_address:
             listAirdropTXs.append([toAddress, amount])
         # Mint events
-        elif fromAddress == ZERO_ADDR:
+        elif fromAddress.isZero():
             initialMintTXs.append([toAddress, amount])
 
     # Check amounts against the newFlipDeployer(airdropper) and the newStateChainGateway
@@ -648,19 +766,67 @@ def getTXsAndMintBalancesFromTransferEvents(
     return listAirdropTXs, int(initialMintTXs[0][1])
 
 
-def waitForLogTXsToComplete(parsedLog):
+# Wait for an airdrop transaction sent with required_confs 0 to be mined and log the gas
+# used against the planned one
+def waitForAirdropTx(tx, predictedGas):
+    tx.wait(1)
+    getJournal().recordReceipt(
+        tx.txid, status=int(tx.status), gasUsed=tx.gas_used, blockNumber=tx.block_number
+    )
+    assert tx.status == 1, logging.error("Airdrop transaction failed: " + tx.txid)
+    logging.info(
+        "Airdrop transaction gas used: "
+        + str(tx.gas_used)
+        + " predicted: "
+        + str(predictedGas)
+        + " ("
+        + "{:+.1%}".format(tx.gas_used / predictedGas - 1)
+        + ") Tx Hash:"
+        + tx.txid
+    )
+
+
+def waitForJournalTXsToComplete(journal):
     printAndLog("Waiting for sent transactions to complete...")
-    # Get all previous sent transactions (if any) from the log and check that they have been included in a block and we get a receipt back
-    for line in parsedLog:
-        parsedLine = line.split("Airdrop transaction Tx Hash:")
-        if len(parsedLine) > 1:
-            tx = parsedLine[1]
-            receipt = web3.eth.wait_for_transaction_receipt(tx)
-            # Logging these only if running in debug level
-            logging.debug(
-                "Previous transaction succesfully included in a block. Hash and receipt:"
-            )
-            logging.debug(receipt)
+    # Get all previous sent transactions (if any) without a receipt in the journal and check that they have been included in a block and we get a receipt back
+    for txid in journal.pendingTxs():
+        receipt = web3.eth.wait_for_transaction_receipt(txid)
+        journal.recordReceipt(
+            txid,
+            status=receipt.status,
+            gasUsed=receipt.gasUsed,
+            blockNumber=receipt.blockNumber,
+        )
+        # Logging these only if running in debug level
+        logging.debug(
+            "Previous transaction succesfully included in a block. Hash and receipt:"
+        )
+        logging.debug(receipt)
+
+
+# Create the journal from the airdrop.log of a run started before there was a journal
+def importLogIntoJournal(journal):
+    with open(logname, "r") as file:
+        for line in file.readlines():
+            # Only check info messages from previous run (disregard DEBUG and ERROR) and remove end of line
+            infoMessage = line.rstrip("\n").split("INFO:root:")
+            if len(infoMessage) < 2:
+                continue
+            message = infoMessage[1]
+            if message == snapshotSuccessMessage + oldFlipSnapshotFilename:
+                journal.completePhase("snapshot", filename=oldFlipSnapshotFilename)
+            elif multiSendDeploySuccessMessage in message:
+                journal.setAddress(
+                    "MultiSend", message.split(multiSendDeploySuccessMessage, 1)[1]
+                )
+            elif message == startAirdropMessage:
+                journal.completePhase("airdropStarted")
+            elif message == airdropScGatewaySuccess:
+                journal.completePhase("scGatewayAirdrop")
+            elif message == airdropSuccessMessage:
+                journal.completePhase("airdrop")
+            elif "Airdrop transaction Tx Hash:" in message:
+                journal.recordTx(message.split("Airdrop transaction Tx Hash:")[1])
 
 
 def readCSVSnapshotChecksum(snapshot_csv):
@@ -676,7 +842,7 @@ def readCSVSnapshotChecksum(snapshot_csv):
     for a, b in csv.reader(read_snapshot_csv, delimiter=","):
         if "TotalNumberHolders:" not in a:
             # Append each variable to a separate list
-            holderAccounts.append(a)
+            holderAccounts.append(Address(a))
             holderBalances.append(b)
             totalSupply += int(b)
         else:
@@ -689,11 +855,11 @@ def readCSVSnapshotChecksum(snapshot_csv):
     # We get the holder amounts ordered in a descending order
     # Health check that the biggest holder is the old FLIP deployer and the
     # second one is the StakeMangaer
-    assert holderAccounts[0] == oldFlipDeployer, logging.error(
+    assert holderAccounts[0] == Address(oldFlipDeployer), logging.error(
         "First holder should be the old flip deployer"
     )
     oldFlipDeployerBalance = holderBalances[0]
-    assert holderAccounts[1] == oldStateChainGateway, logging.error(
+    assert holderAccounts[1] == Address(oldStateChainGateway), logging.error(
         "Second holder should be the old StateChainGateway"
     )
     oldStateChainGatewayBalance = holderBalances[1]
@@ -0,0 +1,386 @@
+import sys
+import os
+import time
+import json
+import platform
+import multiprocessing
+
+sys.path.append(os.path.abspath("tests"))
+from consts import *
+from deploy import deploy_Chainflip_contracts
+from log_decoders import LogDecoders
+from reconciliation import Reconciliation
+from address import Address
+from eth_abi import encode_abi
+from brownie import (
+    accounts,
+    KeyManager,
+    Vault,
+    StateChainGateway,
+    FLIP,
+    DeployerContract,
+    AddressChecker,
+)
+
+# Number of synthetic logs decoded per event in the decoders benchmark
+NUM_LOGS = int(os.environ.get("BENCHMARK_NUM_LOGS") or 20000)
+# Number of messages to sign in each benchmark run
+NUM_SIGS = int(os.environ.get("BENCHMARK_NUM_SIGS") or 200)
+# Largest number of synthetic snapshot rows reconciled in the reconciliation benchmark
+NUM_ROWS = int(os.environ.get("BENCHMARK_NUM_ROWS") or 1000000)
+# Number of times each step is run per entry point and argument size in the suite
+NUM_ITERATIONS = int(os.environ.get("BENCHMARK_NUM_ITERATIONS") or 20)
+# Relative drop in ops/s against the baseline that is reported as a regression
+TOLERANCE = float(os.environ.get("BENCHMARK_TOLERANCE") or 0.2)
+
+REPORT_FILE = "reports/benchmark.json"
+BASELINE_FILE = "reports/benchmark_baseline.json"
+
+# Usage: brownie run benchmark [<function>] --network hardhat
+#   main:           run the suite, write REPORT_FILE and compare it to BASELINE_FILE
+#   save_baseline:  run the suite and store the results as the new baseline
+#   sign, sign_parallel, curve: signing throughput comparisons
+#   decoders:       web3's get_event_data against the precompiled log decoders
+#   reconciliation: airdrop reconciliation of synthetic snapshots of increasing size
+def main():
+    report = suite()
+    with open(REPORT_FILE, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {REPORT_FILE}")
+
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, "r") as f:
+            compare(json.load(f), report)
+    else:
+        print(
+            f"No baseline found. Run `brownie run benchmark save_baseline` to store one"
+        )
+
+
+def save_baseline():
+    report = suite()
+    with open(BASELINE_FILE, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Baseline written to {BASELINE_FILE}")
+
+
+# Time generate_contractMsgHash, generate_msgHash, generate_sigData and sign for every
+# signed entry point with different argument sizes. Returns ops/s for each step.
+def suite():
+    cf = deploy_Chainflip_contracts(
+        accounts[0],
+        KeyManager,
+        Vault,
+        StateChainGateway,
+        FLIP,
+        DeployerContract,
+        AddressChecker,
+    )
+    # Warm up the generator table and the contract message encoders
+    generator_table()
+
+    results = {}
+    for name, fcn, args in signed_entry_points(cf):
+        contractMsgHash = Signer.generate_contractMsgHash(fcn, *args)
+        msgHash = Signer.generate_msgHash(
+            contractMsgHash, nonces, cf.keyManager.address, fcn._address
+        )
+        # Use a local nonce counter so that the shared nonces are not altered
+        benchmarkNonces = {AGG: 0}
+
+        steps = {
+            "generate_contractMsgHash": lambda: Signer.generate_contractMsgHash(
+                fcn, *args
+            ),
+            "generate_msgHash": lambda: Signer.generate_msgHash(
+                contractMsgHash, nonces, cf.keyManager.address, fcn._address
+            ),
+            "generate_sigData": lambda: AGG_SIGNER_1.generate_sigData(
+                msgHash, benchmarkNonces
+            ),
+            "sign": lambda: AGG_SIGNER_1.sign(msgHash),
+        }
+
+        results[name] = {}
+        for step, run in steps.items():
+            start = time.perf_counter()
+            for _ in range(NUM_ITERATIONS):
+                run()
+            results[name][step] = NUM_ITERATIONS / (time.perf_counter() - start)
+
+        print(
+            f"{name:45}"
+            + "".join(f"{ops:12.1f}" for ops in results[name].values())
+            + "  ops/s"
+        )
+
+    return {
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "curveBackend": get_curve_backend().name,
+        "iterations": NUM_ITERATIONS,
+        "results": results,
+    }
+
+
+# List of (name, fcn, args) with the argument sizes to benchmark for each signed entry point
+def signed_entry_points(cf):
+    entryPoints = []
+
+    for length in [1, 10, 100]:
+        transferParams = [[NATIVE_ADDR, cf.vault.address, TEST_AMNT]] * length
+        deployFetchParams = [[JUNK_HEX_PAD, NATIVE_ADDR]] * length
+        fetchParams = [[cf.vault.address, cf.flip.address]] * length
+        entryPoints += [
+            (
+                f"Vault.allBatch[{length}]",
+                cf.vault.allBatch,
+                [deployFetchParams, fetchParams, transferParams],
+            ),
+            (
+                f"Vault.transferBatch[{length}]",
+                cf.vault.transferBatch,
+                [transferParams],
+            ),
+        ]
+
+    # Number of calls and bytes of callData/payload per call
+    for length, numBytes in [(1, 0), (1, 1000), (10, 100), (10, 10000)]:
+        calls = [
+            [0, cf.vault.address, 0, "0x" + "ab" * numBytes, "0x" + "cd" * numBytes]
+        ]
+        entryPoints.append(
+            (
+                f"Vault.executeActions[{length}x{numBytes}B]",
+                cf.vault.executeActions,
+                [[NATIVE_ADDR, cf.vault.address, TEST_AMNT], calls * length, 100000],
+            )
+        )
+
+    entryPoints += [
+        (
+            "KeyManager.setAggKeyWithAggKey",
+            cf.keyManager.setAggKeyWithAggKey,
+            [AGG_SIGNER_2.getPubData()],
+        ),
+        (
+            "StateChainGateway.registerRedemption",
+            cf.stateChainGateway.registerRedemption,
+            [JUNK_HEX, TEST_AMNT, NON_ZERO_ADDR, getChainTime(), ZERO_ADDR],
+        ),
+        (
+            "StateChainGateway.updateFlipSupply",
+            cf.stateChainGateway.updateFlipSupply,
+            [NEW_TOTAL_SUPPLY_MINT, 1],
+        ),
+    ]
+
+    return entryPoints
+
+
+# Print the change in ops/s of every step against the baseline, flagging regressions
+def compare(baseline, report):
+    print(
+        f"\nComparison against baseline from {time.ctime(baseline['timestamp'])} (curve backend: {baseline['curveBackend']})"
+    )
+    regressions = 0
+    for name, steps in report["results"].items():
+        for step, ops in steps.items():
+            baselineOps = baseline["results"].get(name, {}).get(step)
+            if baselineOps is None:
+                continue
+            change = ops / baselineOps - 1
+            flag = ""
+            if change < -TOLERANCE:
+                flag = "  <-- REGRESSION"
+                regressions += 1
+            print(f"{name:45}{step:26}{change * 100:+8.1f}%{flag}")
+
+    print(f"\n{regressions} regressions over {TOLERANCE * 100:.0f}%")
+
+
+# Compare signing one message at a time (sign) against the batch engine (sign_many)
+def sign():
+    msgHashesHex = [
+        cleanHexStrPad(web3.keccak(i.to_bytes(32, byteorder="big")))
+        for i in range(NUM_SIGS)
+    ]
+
+    # Build the generator table beforehand, it's a one-off cost per process
+    start = time.perf_counter()
+    generator_table()
+    print(f"Generator table built in {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    sigs = [AGG_SIGNER_1.sign(msgHashHex) for msgHashHex in msgHashesHex]
+    elapsedSign = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sigsMany = AGG_SIGNER_1.sign_many(msgHashesHex)
+    elapsedSignMany = time.perf_counter() - start
+
+    assert sigs == sigsMany, "sign_many output doesn't match sign"
+
+    print(f"sign:      {NUM_SIGS / elapsedSign:10.1f} sigs/s")
+    print(f"sign_many: {NUM_SIGS / elapsedSignMany:10.1f} sigs/s")
+    print(f"Speedup:   {elapsedSign / elapsedSignMany:10.2f}x")
+
+
+# Throughput of sign_many_parallel with an increasing number of processes
+def sign_parallel():
+    msgHashesHex = [
+        cleanHexStrPad(web3.keccak(i.to_bytes(32, byteorder="big")))
+        for i in range(NUM_SIGS * 10)
+    ]
+    generator_table()
+
+    processes = 1
+    elapsedOne = None
+    while processes <= multiprocessing.cpu_count():
+        start = time.perf_counter()
+        AGG_SIGNER_1.sign_many_parallel(msgHashesHex, processes)
+        elapsed = time.perf_counter() - start
+        elapsedOne = elapsedOne or elapsed
+
+        print(
+            f"{processes:3} processes: {len(msgHashesHex) / elapsed:10.1f} sigs/s ({elapsedOne / elapsed:.2f}x)"
+        )
+        processes *= 2
+
+
+# k*G, k*P and P+Q with every available curve backend (see tests/curve.py)
+def curve():
+    scalars = [
+        int.from_bytes(web3.keccak(i.to_bytes(32, byteorder="big")), "big")
+        for i in range(NUM_SIGS)
+    ]
+    point = PyEccBackend().base_multiply(scalars[0])
+    generator_table()
+
+    for name, backend in CURVE_BACKENDS.items():
+        backend = backend()
+
+        start = time.perf_counter()
+        for k in scalars:
+            backend.base_multiply(k)
+        elapsedBase = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for k in scalars:
+            backend.multiply(point, k)
+        elapsedMultiply = time.perf_counter() - start
+
+        print(
+            f"{name:10} k*G: {NUM_SIGS / elapsedBase:10.1f} ops/s   k*P: {NUM_SIGS / elapsedMultiply:10.1f} ops/s"
+        )
+
+
+# Decode synthetic Transfer and SwapNative logs with get_event_data and with LogDecoders
+def decoders():
+    start = time.perf_counter()
+    logDecoders = LogDecoders.from_artifacts()
+    print(f"Decoders built in {time.perf_counter() - start:.3f}s")
+
+    address = NON_ZERO_ADDR
+    holders = [
+        bytes(12) + web3.keccak(i.to_bytes(32, "big"))[-20:] for i in range(1000)
+    ]
+
+    def log(topics, data, i):
+        return {
+            "topics": topics,
+            "data": "0x" + data.hex(),
+            "address": address,
+            "blockNumber": i,
+            "blockHash": web3.keccak(i.to_bytes(32, "big")),
+            "transactionHash": web3.keccak(i.to_bytes(32, "big")),
+            "transactionIndex": 0,
+            "logIndex": 0,
+        }
+
+    cases = {
+        "IFLIP.Transfer": [
+            log(
+                [
+                    logDecoders["Transfer"].topic0,
+                    holders[i % len(holders)],
+                    holders[(i * 7) % len(holders)],
+                ],
+                (i * E_18).to_bytes(32, "big"),
+                i,
+            )
+            for i in range(NUM_LOGS)
+        ],
+        "IVault.SwapNative": [
+            log(
+                [logDecoders["SwapNative"].topic0, holders[i % len(holders)]],
+                encode_abi(
+                    ["uint32", "bytes", "uint32", "uint256", "bytes"],
+                    [1, holders[i % len(holders)], 2, i, bytes(i % 100)],
+                ),
+                i,
+            )
+            for i in range(NUM_LOGS)
+        ],
+    }
+
+    for name, logs in cases.items():
+        [contractName, eventName] = name.split(".")
+        event = getattr(get_contract_object(contractName, address).events, eventName)
+
+        start = time.perf_counter()
+        expected = list(decode_logs(event, logs))
+        elapsedWeb3 = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decoded = logDecoders.decode_many(logs)
+        elapsedDecoders = time.perf_counter() - start
+
+        assert all(
+            d[: len(e.args)] == tuple(e.args.values())
+            for d, e in zip(decoded, expected)
+        ), "LogDecoders output doesn't match get_event_data"
+
+        print(
+            f"{name:20} get_event_data: {NUM_LOGS / elapsedWeb3:10.1f} logs/s   LogDecoders: {NUM_LOGS / elapsedDecoders:10.1f} logs/s ({elapsedWeb3 / elapsedDecoders:.1f}x)"
+        )
+
+
+# Reconcile synthetic snapshots of 1/100, 1/10 and all of NUM_ROWS holders against their
+# transfers, with some missing, duplicated, wrong and unexpected ones. The time per row should
+# stay flat. The nested loop it replaced is quadratic, so it's only timed on 1/1000 of NUM_ROWS.
+def reconciliation():
+    def synthetic(numRows):
+        holders = [
+            Address(web3.keccak(i.to_bytes(32, "big"))[-20:]) for i in range(numRows)
+        ]
+        expected = [(holder, (i + 1) * E_18) for i, holder in enumerate(holders)]
+        transfers = list(expected)
+        step = max(numRows // 100, 1)
+        for i in range(0, numRows, step):
+            transfers[i] = (holders[i], expected[i][1] + 1)
+            transfers.append(expected[(i + 1) % numRows])
+            transfers.append((Address(web3.keccak(text=str(i))[-20:]), E_18))
+        del transfers[2:numRows:step]
+        return expected, transfers
+
+    for numRows in [max(NUM_ROWS // 100, 1), max(NUM_ROWS // 10, 1), NUM_ROWS]:
+        expected, transfers = synthetic(numRows)
+
+        start = time.perf_counter()
+        reconciliation = Reconciliation(expected, transfers)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{numRows:10} rows: {elapsed:8.3f}s  {elapsed / numRows * 1e6:6.3f}us/row  {reconciliation.summary()}"
+        )
+
+    # Nested loop over the transfers for every holder
+    numRows = max(NUM_ROWS // 1000, 1)
+    expected, transfers = synthetic(numRows)
+    start = time.perf_counter()
+    for (holder, amount) in expected:
+        any(r == holder and a == amount for (r, a) in transfers)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{numRows:10} rows nested loop: {elapsed:8.3f}s  {elapsed / numRows * 1e6:6.3f}us/row"
+    )
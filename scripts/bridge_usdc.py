@@ -230,8 +230,6 @@ def bridge_usdc(fuji_to_goerli, depositor, mint_recipient_address):
 
         # Doing it through the Vault means we need to encode the calldata
         keyManager = KeyManager.at(keyManager_address)
-        syncNonce(keyManager)
-
         call0 = [
             0,
             usdc.address,
@@ -245,13 +243,7 @@ def bridge_usdc(fuji_to_goerli, depositor, mint_recipient_address):
 
         args = [usdc, tokens_to_transfer, squid_multicall, calls]
 
-        tx = signed_call(
-            keyManager,
-            vault.executeActions,
-            AGG_SIGNER_1,
-            DEPLOYER,
-            *args,
-        )
+        tx = signed_call_agg(keyManager, vault.executeActions, DEPLOYER, *args)
 
         ## If done through Squid, the depositor of the USDC becomes the Multicall
         depositor = squid_multicall
@@ -340,8 +332,6 @@ def bridge_aUsdc(fuji_to_goerli, depositor, mint_recipient_address):
             )
         # Doing it through the Vault means we need to encode the calldata
         keyManager = KeyManager.at(keyManager_address)
-        syncNonce(keyManager)
-
         call0 = [
             0,
             aUsdc.address,
@@ -355,13 +345,7 @@ def bridge_aUsdc(fuji_to_goerli, depositor, mint_recipient_address):
 
         args = [aUsdc, tokens_to_transfer, squid_multicall, calls]
 
-        tx = signed_call(
-            keyManager,
-            vault.executeActions,
-            AGG_SIGNER_1,
-            DEPLOYER,
-            *args,
-        )
+        tx = signed_call_agg(keyManager, vault.executeActions, DEPLOYER, *args)
 
         ## If done through Squid, the depositor of the USDC becomes the Multicall
         depositor = squid_multicall
@@ -451,8 +435,6 @@ def get_and_submit_attestation(
         keyManager_address = vault.getKeyManager()
 
         keyManager = KeyManager.at(keyManager_address)
-        syncNonce(keyManager)
-
         # Doing it through the Vault means we need to encode the calldata
 
         calls = [
@@ -469,13 +451,7 @@ def get_and_submit_attestation(
 
         args = ["0x0000000000000000000000000000000000000000", 0, squid_multicall, calls]
 
-        tx = signed_call(
-            keyManager,
-            vault.executeActions,
-            AGG_SIGNER_1,
-            DEPLOYER,
-            *args,
-        )
+        tx = signed_call_agg(keyManager, vault.executeActions, DEPLOYER, *args)
 
         ## If done through Squid, the depositor of the USDC becomes the Multicall
         depositor = squid_multicall
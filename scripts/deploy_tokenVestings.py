@@ -10,6 +10,7 @@ from deploy import (
     deploy_tokenVestingNoStaking,
 )
 from utils import prompt_user_continue_or_break
+from run_journal import RunJournal
 from brownie import (
     chain,
     accounts,
@@ -36,6 +37,8 @@ vesting_time_end = vesting_time_cliff + YEAR
 AUTONOMY_SEED = os.environ["SEED"]
 cf_accs = accounts.from_mnemonic(AUTONOMY_SEED, count=10)
 DEPLOYER_ACCOUNT_INDEX = int(os.environ.get("DEPLOYER_ACCOUNT_INDEX") or 0)
+# Record of the deployed contracts
+JOURNAL_FILE = os.environ.get("JOURNAL_FILE") or "tokenVestingsJournal.sqlite"
 
 DEPLOYER = cf_accs[DEPLOYER_ACCOUNT_INDEX]
 
@@ -94,15 +97,31 @@ def main():
 
             flip_total += amount
 
-    # Vesting schedule
-    current_time = chain.time()
-    cliff = current_time + vesting_time_cliff
-    end = current_time + vesting_time_end
+    # On a rerun, the vestings already in the journal are skipped and the rest are deployed
+    # with the same schedule
+    journal = RunJournal(JOURNAL_FILE)
+    parameters = journal.get("phase", "parametersConfirmed")
+    if parameters is not None:
+        assert parameters["vestingInfoFile"] == VESTING_INFO_FILE and parameters[
+            "numberVestings"
+        ] == len(vesting_list), "Journal is from a different vesting file"
+        cliff = parameters["cliff"]
+        end = parameters["end"]
+    else:
+        # Vesting schedule
+        current_time = chain.time()
+        cliff = current_time + vesting_time_cliff
+        end = current_time + vesting_time_end
+
+    deployed_vestings = journal.all("vesting")
+    flip_to_vest = flip_total - sum(
+        vesting["amount"] for vesting in deployed_vestings.values()
+    )
 
-    assert flip_total * E_18 <= flip.balanceOf(
+    assert flip_to_vest * E_18 <= flip.balanceOf(
         DEPLOYER
     ), "Not enough FLIP tokens to fund the vestings"
-    final_balance = (flip.balanceOf(DEPLOYER) - flip_total * E_18) // E_18
+    final_balance = (flip.balanceOf(DEPLOYER) - flip_to_vest * E_18) // E_18
 
     # For live deployment, add a confirmation step to allow the user to verify the row.
     print(f"DEPLOYER = {DEPLOYER}")
@@ -122,6 +141,9 @@ def main():
         f"Vesting end (staking & non-staking)  = {vesting_time_end//YEAR} years and {(vesting_time_end % YEAR)//MONTH} months"
     )
     print(f"Total amount of FLIP to vest    = {flip_total:,}")
+    if deployed_vestings:
+        print(f"Vesting contracts already deployed = {len(deployed_vestings)}")
+        print(f"Remaining amount of FLIP to vest   = {flip_to_vest:,}")
     print(f"Initial deployer's FLIP balance = {flip.balanceOf(DEPLOYER)//E_18:,}")
     print(f"Final deployer's FLIP balance   = {final_balance:,}")
 
@@ -133,22 +155,46 @@ def main():
             False,
         )
 
-    # Deploying the address Holder
-    addressHolder = deploy_addressHolder(
-        DEPLOYER,
-        AddressHolder,
-        governor,
-        sc_gateway_address,
-        stMinter_address,
-        stBurner_address,
-        stFlip_address,
-    )
+    if parameters is None:
+        journal.completePhase(
+            "parametersConfirmed",
+            vestingInfoFile=VESTING_INFO_FILE,
+            cliff=cliff,
+            end=end,
+            numberVestings=len(vesting_list),
+        )
+
+    # Deploying the address Holder if there isn't a deployed one
+    addressHolder_address = journal.getAddress("AddressHolder")
+    if addressHolder_address is None:
+        addressHolder = deploy_addressHolder(
+            DEPLOYER,
+            AddressHolder,
+            governor,
+            sc_gateway_address,
+            stMinter_address,
+            stBurner_address,
+            stFlip_address,
+        )
+        journal.setAddress("AddressHolder", addressHolder.address)
+    else:
+        print(f"AddressHolder already deployed at {addressHolder_address}")
+        addressHolder = AddressHolder.at(addressHolder_address)
 
     # Deploy the staking contracts
-    for vesting in vesting_list:
+    for i, vesting in enumerate(vesting_list):
         beneficiary, amount, lockup_type, transferable_beneficiary = vesting
         amount_E18 = amount * E_18
 
+        if journal.has("vesting", i):
+            deployed = deployed_vestings[str(i)]
+            assert (
+                deployed["beneficiary"] == str(beneficiary)
+                and deployed["amount"] == amount
+            ), f"Vesting {i} in the journal doesn't match the vesting file"
+            vesting.append(deployed["address"])
+            continue
+
         if lockup_type == "A":
 
             tv = deploy_tokenVestingStaking(
@@ -193,12 +239,25 @@ def main():
             flip.balanceOf(tv.address) == amount_E18
         ), "Tokens not transferred correctly"
         vesting.append(tv.address)
+        journal.append(
+            "vesting",
+            i,
+            {
+                "beneficiary": str(beneficiary),
+                "amount": amount,
+                "lockupType": lockup_type,
+                "transferable": transferable_beneficiary,
+                "address": tv.address,
+            },
+        )
 
     for i, vesting in enumerate(vesting_list):
         print(
             f"- {str(i):>2} Lockup type {vesting[2]}, contract with beneficiary {vesting[0]}, amount {str(vesting[1]):>8} FLIP and transferability {str(vesting[3]):<5} deployed at {vesting[4]}"
         )
     print("\n😎😎 Vesting contracts deployed successfully! 😎😎\n")
+    journal.completePhase("deployed")
+    journal.close()
 
     assert final_balance == flip.balanceOf(DEPLOYER) // E_18, "Incorrect final balance"
 
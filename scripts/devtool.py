@@ -3,6 +3,7 @@ from os import environ, path
 
 sys.path.append(path.abspath("tests"))
 from consts import *
+from rpc_batch import RpcBatchClient
 
 from brownie import (
     accounts,
@@ -438,23 +439,27 @@ def viewPendRedemption(nodeId):
         )
 
 
-def viewMinFunding():
-    minFunding = stateChainGateway.getMinimumFunding()
+def viewMinFunding(minFunding=None):
+    if minFunding is None:
+        minFunding = stateChainGateway.getMinimumFunding()
     print(f"Min funding: {minFunding / 10 ** (flip.decimals())} FLIP ")
 
 
-def viewAggKey():
-    aggKey = keyManager.getAggregateKey()
+def viewAggKey(aggKey=None):
+    if aggKey is None:
+        aggKey = keyManager.getAggregateKey()
     print(f"Aggregate key: {aggKey}")
 
 
-def viewGovKey():
-    governor = vault.getGovernor()
+def viewGovKey(governor=None):
+    if governor is None:
+        governor = vault.getGovernor()
     print(f"Governor address: {governor}")
 
 
-def viewCommKey():
-    communityKey = vault.getCommunityKey()
+def viewCommKey(communityKey=None):
+    if communityKey is None:
+        communityKey = vault.getCommunityKey()
     print(f"Community Address: {communityKey}")
 
 
@@ -466,8 +471,9 @@ def isNonceUsed(nonce):
         print(f"Nonce {nonce} has not been used")
 
 
-def viewLastSigTime():
-    lastTime = keyManager.getLastValidateTime()
+def viewLastSigTime(lastTime=None):
+    if lastTime is None:
+        lastTime = keyManager.getLastValidateTime()
     print(f"Last time a signature was validated: {lastTime}")
     printUserReadableTime(lastTime)
 
@@ -482,12 +488,19 @@ def printUserReadableTime(timestamp):
     print(f"User readable time: {datetime.fromtimestamp(timestamp)}")
 
 
+# All the views are fetched in a single JSON-RPC batch
 def viewAll():
-    viewMinFunding()
-    viewAggKey()
-    viewGovKey()
-    viewCommKey()
-    viewLastSigTime()
+    with RpcBatchClient() as client:
+        minFunding = client.call(stateChainGateway.getMinimumFunding)
+        aggKey = client.call(keyManager.getAggregateKey)
+        governor = client.call(vault.getGovernor)
+        communityKey = client.call(vault.getCommunityKey)
+        lastTime = client.call(keyManager.getLastValidateTime)
+    viewMinFunding(minFunding.result())
+    viewAggKey(aggKey.result())
+    viewGovKey(governor.result())
+    viewCommKey(communityKey.result())
+    viewLastSigTime(lastTime.result())
     viewCurrentTime()
 
 
@@ -96,13 +96,11 @@ def register_redemption_genesis_flip():
     )
     prompt_user_continue_or_break("", False)
 
-    syncNonce(keyManager)
-
     # Setting an infinit expiry time
     args = [JUNK_HEX, flip_balance, NEW_SC_GATEWAY_ADDRESS, 2**47]
 
-    tx = signed_call(
-        keyManager, stateChainGateway.registerRedemption, AGG_SIGNER_1, DEPLOYER, *args
+    tx = signed_call_agg(
+        keyManager, stateChainGateway.registerRedemption, DEPLOYER, *args
     )
 
     tx.info()
@@ -139,13 +137,10 @@ def update_issuer():
     )
     prompt_user_continue_or_break("", False)
 
-    syncNonce(keyManager)
-
     # Not omiting checks - check that the new contract has a reference to FLIP
-    tx = signed_call(
+    tx = signed_call_agg(
         keyManager,
         stateChainGateway.updateFlipIssuer,
-        AGG_SIGNER_1,
         DEPLOYER,
         newStateChainGateway,
         False,
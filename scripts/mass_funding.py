@@ -3,8 +3,10 @@ from os import environ, path
 
 sys.path.append(path.abspath("tests"))
 from consts import *
+from run_journal import RunJournal
 
-from brownie import accounts, StateChainGateway, FLIP
+from brownie import accounts, web3, StateChainGateway, FLIP
+from web3.exceptions import TransactionNotFound
 
 FLIP_ADDRESS = environ["FLIP_ADDRESS"]
 SC_GATEWAY_ADDRESS = environ["SC_GATEWAY_ADDRESS"]
@@ -16,6 +18,12 @@ NODE_ID_FILE = environ["NODE_ID_FILE"]
 
 DEPLOYER_ACCOUNT_INDEX = int(environ.get("DEPLOYER_ACCOUNT_INDEX") or 0)
 
+# Funding transactions sent and their receipts, so a rerun skips the nodes that have already
+# been funded successfully
+JOURNAL_FILE = environ.get("JOURNAL_FILE") or "massFundingJournal.sqlite"
+# Seconds to wait for each funding transaction to be mined
+TX_TIMEOUT = int(environ.get("TX_TIMEOUT") or 600)
+
 cf_accs = accounts.from_mnemonic(AUTONOMY_SEED, count=10)
 
 node_ids = []
@@ -30,6 +38,9 @@ def main():
         node_ids = f.readlines()
         f.close()
     funder = cf_accs[DEPLOYER_ACCOUNT_INDEX]
+    journal = RunJournal(JOURNAL_FILE)
+    # Transactions of a previous run must be settled before deciding which nodes to skip
+    settlePendingFunds(journal)
     to_approve = flip.balanceOf(funder)
     tx = flip.approve(
         stateChainGateway, to_approve, {"from": funder, "required_confs": 1}
@@ -38,12 +49,41 @@ def main():
     for i, node_id in enumerate(node_ids):
         to_fund = funding_amount + (i * E_18)
         node_id = node_id.strip()
+        if journal.has("fund", node_id):
+            print(f"Skipping node {node_id}, already funded")
+            continue
         tx = stateChainGateway.fundStateChainAccount(
             node_id,
             to_fund,
             {"from": funder, "required_confs": 0, "gas_limit": 1000000},
         )
         print(f"Funding {to_fund / E_18} FLIP to node {node_id} in tx {tx.txid}")
+        journal.recordTx(tx.txid, nodeId=node_id, amount=str(to_fund))
+    settlePendingFunds(journal)
+    journal.close()
+
+
+# Wait for the funding transactions without a receipt in the journal and record the nodes
+# funded by the successful ones. Transactions the node doesn't know about anymore (dropped or
+# replaced) are recorded as failed so that their nodes are funded again on the next run.
+def settlePendingFunds(journal):
+    for txid, data in journal.pendingTxs().items():
+        try:
+            web3.eth.get_transaction(txid)
+        except TransactionNotFound:
+            print(f"Funding tx {txid} of node {data['nodeId']} was dropped")
+            journal.recordReceipt(txid, status=0, dropped=True)
+            continue
+        receipt = web3.eth.wait_for_transaction_receipt(txid, timeout=TX_TIMEOUT)
+        journal.recordReceipt(
+            txid, status=receipt.status, blockNumber=receipt.blockNumber
+        )
+        if receipt.status == 1:
+            journal.append(
+                "fund", data["nodeId"], {"amount": data["amount"], "txid": txid}
+            )
+        else:
+            print(f"Funding tx {txid} of node {data['nodeId']} reverted")
 
 
 def cleanHexStr(thing):
@@ -0,0 +1,30 @@
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.abspath("tests"))
+from consts import *
+from signing_service import SigningService
+from signing_client import SIGNING_SERVICE_PORT
+from brownie import KeyManager
+
+KEY_MANAGER_ADDRESS = os.environ["KEY_MANAGER_ADDRESS"]
+MAX_BATCH_SIZE = int(os.environ.get("SIGNING_SERVICE_MAX_BATCH") or 64)
+
+# Serve Agg key signatures to scripts running in parallel. Run it once per network:
+#   export KEY_MANAGER_ADDRESS=<Address of the deployed KeyManager contract>
+#   brownie run signing_service --network <network>
+# Scripts then sign through signing_client.SigningClient (see signed_call_service).
+# Assumption that the AGG_KEY is the default one and we can sign with AGG_SIGNER_1
+def main():
+    keyManager = KeyManager.at(KEY_MANAGER_ADDRESS)
+    syncNonce(keyManager)
+
+    service = SigningService(AGG_SIGNER_1, nonces[AGG], MAX_BATCH_SIZE)
+    asyncio.run(serve(service))
+
+
+async def serve(service):
+    port = await service.start(port=SIGNING_SERVICE_PORT)
+    print(f"Signing service listening on port {port}")
+    await service.serve_forever()
@@ -0,0 +1,63 @@
+from eth_utils import to_checksum_address
+
+# 20-byte address value converted once from whatever it comes as (checksummed or lowercase
+# string, with or without 0x, bytes, a 32-byte topic, a brownie Account or Contract...).
+# Hashes and compares as the raw bytes, so Address and 20-byte bytes keys are
+# interchangeable in dicts and sets, e.g. holder balances or the deposit addresses index.
+# It's never equal to a string or an Account, since they don't hash the same, so values
+# have to be converted at the edges for lookups to match. str() is the checksummed address,
+# as expected by brownie and web3.
+class Address:
+    __slots__ = ("raw", "_checksum")
+
+    def __init__(self, value):
+        if isinstance(value, Address):
+            raw = value.raw
+        elif isinstance(value, (bytes, bytearray)):
+            raw = bytes(value)
+            # Indexed address in a topic, left padded with zeros
+            if len(raw) == 32 and raw[:12] == bytes(12):
+                raw = raw[12:]
+        else:
+            value = str(value)
+            raw = bytes.fromhex(value[2:] if value[:2] in ("0x", "0X") else value)
+        if len(raw) != 20:
+            raise ValueError(f"Invalid address {value!r}")
+        self.raw = raw
+        self._checksum = None
+
+    def __bytes__(self):
+        return self.raw
+
+    def __str__(self):
+        if self._checksum is None:
+            self._checksum = to_checksum_address(self.raw)
+        return self._checksum
+
+    def __repr__(self):
+        return f"Address('{self}')"
+
+    def __hash__(self):
+        return hash(self.raw)
+
+    def __eq__(self, other):
+        if isinstance(other, Address):
+            return self.raw == other.raw
+        if isinstance(other, bytes):
+            return self.raw == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __lt__(self, other):
+        if not isinstance(other, Address):
+            return NotImplemented
+        return self.raw < other.raw
+
+    def isZero(self):
+        return self.raw == ZERO_ADDRESS_RAW
+
+
+ZERO_ADDRESS_RAW = bytes(20)
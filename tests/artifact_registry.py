@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+from brownie import web3
+from eth_utils import function_abi_to_4byte_selector, event_abi_to_log_topic
+
+BUILD_DIR = "build/contracts"
+
+
+# Build artifacts loaded on demand, each JSON file at most once. Also maps 4-byte selectors
+# and topic0s back to the functions and events of all the contracts (including the mocks,
+# interfaces and dependencies) and caches the web3 contract objects per (name, address).
+# Names are paths relative to the build folder, e.g. "FLIP" or "dependencies/.../IERC20".
+class ArtifactRegistry:
+    def __init__(self, buildDir=BUILD_DIR):
+        self.buildDir = buildDir
+        self.lock = threading.RLock()
+        self.artifacts = {}
+        self.contracts = {}
+        self.selectors = None
+        self.topics = None
+
+    def names(self):
+        names = []
+        for root, _, files in os.walk(self.buildDir):
+            for file in files:
+                if file.endswith(".json"):
+                    path = os.path.relpath(os.path.join(root, file), self.buildDir)
+                    names.append(path[: -len(".json")].replace(os.sep, "/"))
+        return sorted(names)
+
+    def artifact(self, name):
+        with self.lock:
+            if name not in self.artifacts:
+                with open(os.path.join(self.buildDir, name + ".json")) as f:
+                    self.artifacts[name] = json.load(f)
+            return self.artifacts[name]
+
+    def abi(self, name):
+        return self.artifact(name).get("abi", [])
+
+    # web3 contract object of the contract at address
+    def contract(self, name, address):
+        key = (name, address)
+        with self.lock:
+            if key not in self.contracts:
+                self.contracts[key] = web3.eth.contract(
+                    address=address, abi=self.abi(name)
+                )
+            return self.contracts[key]
+
+    # Build the selector and topic maps from all the artifacts. The first contract (in name
+    # order) declaring a function or an event is the one kept.
+    def _index(self):
+        with self.lock:
+            if self.selectors is not None:
+                return
+            selectors = {}
+            topics = {}
+            for name in self.names():
+                for entry in self.abi(name):
+                    if entry.get("type") == "function":
+                        selectors.setdefault(
+                            function_abi_to_4byte_selector(entry), (name, entry)
+                        )
+                    elif entry.get("type") == "event" and not entry.get("anonymous"):
+                        topics.setdefault(event_abi_to_log_topic(entry), (name, entry))
+            (self.selectors, self.topics) = (selectors, topics)
+
+    # (contract name, function ABI) of a selector or calldata, None if it's unknown
+    def function(self, selector):
+        self._index()
+        return self.selectors.get(_to_bytes(selector)[:4])
+
+    # (contract name, event ABI) of a topic0, None if it's unknown
+    def event(self, topic0):
+        self._index()
+        return self.topics.get(_to_bytes(topic0))
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value[:2] == "0x" else value)
+    return bytes(value)
+
+
+# Shared registry of the build folder in the working directory
+artifactRegistry = ArtifactRegistry()
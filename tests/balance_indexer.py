@@ -0,0 +1,167 @@
+import sqlite3
+from eth_hash.auto import keccak
+from eth_utils import to_checksum_address
+from pipeline import Pipeline
+
+TRANSFER_TOPIC = keccak(b"Transfer(address,address,uint256)")
+ZERO_ADDRESS_BYTES = bytes(20)
+
+
+# ERC20 balances of all the holders of a token folded from its Transfer logs. Balances are
+# kept as {20-byte address: int} and the state is checkpointed every checkpointInterval
+# blocks (and at the end of every update) so that it can be resumed or rebuilt at an older
+# block by replaying only the logs after the closest checkpoint.
+#
+# fetchLogs(fromBlock, toBlock) must return the Transfer logs of the token in that range, in
+# chunks in (blockNumber, logIndex) order, e.g. scan_logs(flipContractObject.events.Transfer, ...).
+# The chunks are decoded in a Pipeline stage while the previous ones are folded.
+# Blocks that can still be reorged shouldn't be indexed since checkpoints are never invalidated.
+class BalanceIndexer:
+    def __init__(
+        self, path, token, chainId, startBlock, fetchLogs, checkpointInterval=100000
+    ):
+        self.token = str(token)
+        self.chainId = chainId
+        self.startBlock = startBlock
+        self.fetchLogs = fetchLogs
+        self.checkpointInterval = checkpointInterval
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                chainId INTEGER, token TEXT, blockNumber INTEGER,
+                totalBalance TEXT, numberEvents INTEGER, balances BLOB,
+                PRIMARY KEY (chainId, token, blockNumber)
+            )
+            """
+        )
+        self.reset()
+
+    def close(self):
+        self.db.close()
+
+    def reset(self):
+        self.balances = {}
+        self.totalBalance = 0
+        self.numberEvents = 0
+        # Last block folded into the balances
+        self.block = self.startBlock - 1
+
+    # Balances are stored as 20-byte address + 32-byte balance records
+    def checkpoint(self):
+        balances = b"".join(
+            holder + balance.to_bytes(32, "big")
+            for holder, balance in self.balances.items()
+        )
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self.chainId,
+                    self.token,
+                    self.block,
+                    str(self.totalBalance),
+                    self.numberEvents,
+                    balances,
+                ),
+            )
+
+    # Block of the latest checkpoint at or before blockNumber, None if there isn't one
+    def closestCheckpoint(self, blockNumber):
+        row = self.db.execute(
+            "SELECT MAX(blockNumber) FROM checkpoints WHERE chainId=? AND token=? AND blockNumber<=?",
+            (self.chainId, self.token, blockNumber),
+        ).fetchone()
+        return row[0]
+
+    # Load the latest checkpoint at or before blockNumber, or start over if there isn't one
+    def load(self, blockNumber):
+        checkpointBlock = self.closestCheckpoint(blockNumber)
+        if checkpointBlock is None:
+            self.reset()
+            return
+        (totalBalance, numberEvents, balances) = self.db.execute(
+            "SELECT totalBalance, numberEvents, balances FROM checkpoints WHERE chainId=? AND token=? AND blockNumber=?",
+            (self.chainId, self.token, checkpointBlock),
+        ).fetchone()
+        self.balances = {
+            balances[i : i + 20]: int.from_bytes(balances[i + 20 : i + 52], "big")
+            for i in range(0, len(balances), 52)
+        }
+        self.totalBalance = int(totalBalance)
+        self.numberEvents = numberEvents
+        self.block = checkpointBlock
+
+    # Fold a chunk of raw Transfer logs into the balances
+    def applyLogs(self, logs):
+        self.applyTransfers(decodeTransfers(logs))
+
+    # Fold a chunk of (sender, recipient, value) transfers into the balances
+    def applyTransfers(self, transfers):
+        balances = self.balances
+        for (sender, recipient, value) in transfers:
+            if value == 0:
+                continue
+
+            if sender != ZERO_ADDRESS_BYTES:
+                balance = balances[sender] - value
+                assert balance >= 0
+                if balance == 0:
+                    del balances[sender]
+                else:
+                    balances[sender] = balance
+            else:
+                self.totalBalance += value
+
+            if recipient != ZERO_ADDRESS_BYTES:
+                balances[recipient] = balances.get(recipient, 0) + value
+            else:
+                self.totalBalance -= value
+
+        self.numberEvents += len(transfers)
+
+    # Fold the logs up to toBlock, checkpointing on every multiple of checkpointInterval
+    def update(self, toBlock):
+        while self.block < toBlock:
+            end = min(
+                (self.block // self.checkpointInterval + 1) * self.checkpointInterval,
+                toBlock,
+            )
+            for transfers in Pipeline(self.fetchLogs(self.block + 1, end)).map(
+                decodeTransfers
+            ):
+                self.applyTransfers(transfers)
+            self.block = end
+            if end % self.checkpointInterval == 0 or end == toBlock:
+                self.checkpoint()
+
+    # Balances at the end of blockNumber, replaying from the closest state available
+    def balancesAt(self, blockNumber):
+        assert blockNumber >= self.startBlock - 1
+        checkpointBlock = self.closestCheckpoint(blockNumber)
+        if self.block > blockNumber or (
+            checkpointBlock is not None and checkpointBlock > self.block
+        ):
+            self.load(blockNumber)
+        self.update(blockNumber)
+        return self.holders()
+
+    # {checksum address: balance}
+    def holders(self):
+        return {
+            to_checksum_address(holder): balance
+            for holder, balance in self.balances.items()
+        }
+
+
+# (sender, recipient, value) of every log in a chunk of raw Transfer logs, with the
+# addresses as 20 bytes
+def decodeTransfers(logs):
+    transfers = []
+    for log in logs:
+        topics = log["topics"]
+        assert bytes(topics[0]) == TRANSFER_TOPIC
+        data = log["data"]
+        value = int(data, 16) if isinstance(data, str) else int.from_bytes(data, "big")
+        transfers.append((bytes(topics[1])[12:], bytes(topics[2])[12:], value))
+    return transfers
@@ -0,0 +1,92 @@
+from brownie import web3
+from rpc_batch import RpcBatchClient
+
+# Fraction of the block gas limit that a batch is packed up to
+MULTISEND_TARGET_GAS_FRACTION = 0.5
+# Transfers per sample when measuring the gas per transfer
+MULTISEND_SAMPLE_SIZE = 20
+
+
+# Packs [recipient, amount] transfers into MultiSend.multiSendToken batches that use up to a
+# target fraction of the block gas limit. The gas is modelled as base + gas per transfer,
+# measured with estimate_gas on samples of the transfers themselves. Transfers to recipients
+# that don't hold the token yet (cold) pay for a new balance slot, so they are measured
+# separately from the ones to existing holders (warm).
+class MultiSendBatchPlanner:
+    def __init__(
+        self,
+        multiSend,
+        token,
+        sender,
+        targetGasFraction=MULTISEND_TARGET_GAS_FRACTION,
+        sampleSize=MULTISEND_SAMPLE_SIZE,
+        maxBatchSize=None,
+    ):
+        self.multiSend = multiSend
+        self.token = token
+        self.sender = sender
+        self.sampleSize = sampleSize
+        self.maxBatchSize = maxBatchSize
+        self.gasTarget = int(web3.eth.get_block("latest").gasLimit * targetGasFraction)
+
+    def estimateGas(self, transfers):
+        return self.multiSend.multiSendToken.estimate_gas(
+            self.token,
+            transfers,
+            sum(int(amount) for (_, amount) in transfers),
+            {"from": self.sender},
+        )
+
+    # Recipients that already hold the token
+    def warmRecipients(self, transfers):
+        with RpcBatchClient() as client:
+            balances = [
+                client.call(self.token.balanceOf, recipient)
+                for (recipient, _) in transfers
+            ]
+        return {
+            str(recipient)
+            for (recipient, _), balance in zip(transfers, balances)
+            if balance.result() > 0
+        }
+
+    # (base gas, gas per transfer) fitted from the estimates of two sample sizes
+    def measure(self, transfers):
+        large = transfers[: self.sampleSize]
+        small = large[: max(len(large) // 2, 1)]
+        gasSmall = self.estimateGas(small)
+        if len(large) == len(small):
+            return (0, gasSmall / len(small))
+        gasLarge = self.estimateGas(large)
+        gasPerTransfer = (gasLarge - gasSmall) / (len(large) - len(small))
+        return (max(gasSmall - gasPerTransfer * len(small), 0), gasPerTransfer)
+
+    # List of (batch, predicted gas)
+    def plan(self, transfers):
+        if not transfers:
+            return []
+        warm = self.warmRecipients(transfers)
+        coldTransfers = [t for t in transfers if str(t[0]) not in warm]
+        warmTransfers = [t for t in transfers if str(t[0]) in warm]
+
+        (baseGas, coldGas) = self.measure(coldTransfers or warmTransfers)
+        warmGas = coldGas
+        if coldTransfers and warmTransfers:
+            sample = warmTransfers[: self.sampleSize]
+            warmGas = (self.estimateGas(sample) - baseGas) / len(sample)
+        (self.baseGas, self.coldGas, self.warmGas) = (baseGas, coldGas, warmGas)
+
+        batches = []
+        (batch, batchGas) = ([], baseGas)
+        for transfer in transfers:
+            transferGas = warmGas if str(transfer[0]) in warm else coldGas
+            if batch and (
+                batchGas + transferGas > self.gasTarget
+                or len(batch) == self.maxBatchSize
+            ):
+                batches.append((batch, int(batchGas)))
+                (batch, batchGas) = ([], baseGas)
+            batch.append(transfer)
+            batchGas += transferGas
+        batches.append((batch, int(batchGas)))
+        return batches
@@ -1,3 +1,6 @@
+import os
+import requests
+from rpc_batch import RpcBatchClient, RpcError
 from crypto import *
 from utils import *
 
@@ -61,18 +64,107 @@ AGG_KEY_TIMEOUT = 2 * 24 * 60 * 60
 # This wouldn't be the case if a single uint was used to track the current nonce for
 # each agg and gov key tho
 nonces = {AGG: 0}
+NONCE_SYNC = os.environ.get("NONCE_SYNC") or "search"
+NONCE_SYNC_BATCH = int(os.environ.get("NONCE_SYNC_BATCH") or 8)
 
 
 # Deployed contract might have already signed some messages, so we need to sync the nonce
 # of the contract with the nonces in consts.py used to signed the messages.
-def syncNonce(keyManager):
-    while keyManager.isNonceUsedByAggKey(nonces[AGG]) != False:
-        nonces[AGG] += 1
+# Modes (default from the NONCE_SYNC env variable, "search" if unset):
+#   "linear": query the nonces one by one from the in-memory counter.
+#   "search": gallop + k-ary search with NONCE_SYNC_BATCH concurrent eth_calls per round.
+#             Assumes nonces are consumed in order, which is how the State Chain uses them.
+#             Falls back to "logs" if the RPC calls fail.
+#   "logs":   rebuild the set of used nonces from the KeyManager's SignatureAccepted events.
+def syncNonce(keyManager, mode=None):
+    mode = mode or NONCE_SYNC
+    if mode == "linear":
+        nonces[AGG] = syncNonceLinear(keyManager, nonces[AGG])
+    elif mode == "search":
+        try:
+            nonces[AGG] = syncNonceSearch(keyManager, nonces[AGG])
+        except (ValueError, ConnectionError, RpcError, requests.RequestException) as e:
+            print(f"Nonce search failed ({e}), falling back to SignatureAccepted logs")
+            nonces[AGG] = syncNonceLogs(keyManager, nonces[AGG])
+    elif mode == "logs":
+        nonces[AGG] = syncNonceLogs(keyManager, nonces[AGG])
+    else:
+        raise ValueError(f"Unknown nonce sync mode {mode}")
 
     print("Synched Nonce: ", nonces[AGG])
     return nonces
 
 
+def syncNonceLinear(keyManager, startNonce):
+    nonce = startNonce
+    while keyManager.isNonceUsedByAggKey(nonce) != False:
+        nonce += 1
+    return nonce
+
+
+# Returns one bool per nonce, querying them in a JSON-RPC batch. With rpcBatch=False
+# they're called one by one, e.g. for a keyManager that isn't a deployed contract.
+def areNoncesUsed(keyManager, nonceList, rpcBatch=True):
+    isNonceUsed = keyManager.isNonceUsedByAggKey
+    if not rpcBatch or len(nonceList) == 1:
+        return [isNonceUsed(nonce) for nonce in nonceList]
+    with RpcBatchClient() as client:
+        used = [client.call(isNonceUsed, n) for n in nonceList]
+    return [u.result() for u in used]
+
+
+def syncNonceSearch(keyManager, startNonce, batchSize=None, rpcBatch=True):
+    batchSize = batchSize or NONCE_SYNC_BATCH
+    assert batchSize > 0
+
+    if not keyManager.isNonceUsedByAggKey(startNonce):
+        return startNonce
+
+    # Galloping: probe startNonce + 2^i for a batch of i's per round until an unused
+    # nonce is found. Invariant: lastUsed is used, firstUnused is not.
+    lastUsed = startNonce
+    firstUnused = None
+    step = 1
+    while firstUnused is None:
+        probes = [lastUsed + step * 2**i for i in range(batchSize)]
+        for probe, used in zip(probes, areNoncesUsed(keyManager, probes, rpcBatch)):
+            if not used:
+                firstUnused = probe
+                break
+            lastUsed = probe
+        step = 2**batchSize * step
+
+    # Split (lastUsed, firstUnused) into batchSize + 1 intervals per round
+    while firstUnused - lastUsed > 1:
+        width = firstUnused - lastUsed
+        probes = sorted(
+            {lastUsed + (width * i) // (batchSize + 1) for i in range(1, batchSize + 1)}
+            - {lastUsed}
+        )
+        for probe, used in zip(probes, areNoncesUsed(keyManager, probes, rpcBatch)):
+            if not used:
+                firstUnused = probe
+                break
+            lastUsed = probe
+
+    return firstUnused
+
+
+def syncNonceLogs(keyManager, startNonce, from_block=0):
+    keyManagerObject = get_contract_object("KeyManager", keyManager.address)
+    usedNonces = {
+        event.args.sigData[1]
+        for event in fetch_events(
+            keyManagerObject.events.SignatureAccepted, from_block=from_block
+        )
+    }
+
+    nonce = startNonce
+    while nonce in usedNonces:
+        nonce += 1
+    return nonce
+
+
 # Keys for use in tests
 
 # Original keys in the constructor
@@ -83,6 +175,11 @@ AGG_SIGNER_1 = Signer(AGG_PRIV_HEX_1, AGG, nonces)
 AGG_PRIV_HEX_2 = "bbade2da39cfc81b1b64b6a2d66531ed74dd01803dc5b376ce7ad548bbe23608"
 AGG_SIGNER_2 = Signer(AGG_PRIV_HEX_2, AGG, nonces)
 
+# Freshly generated keys for the tests that need random signers (e.g. stateful tests)
+KEY_POOL_FILE = os.environ.get("KEY_POOL_FILE") or "build/keyPool.bin"
+KEY_POOL_SIZE = 256
+KEY_POOL = KeyPool(KEY_POOL_FILE, KEY_POOL_SIZE)
+
 NULL_KEY = (0, 0)
 BAD_AGG_KEY = [0xEE2E4DC8797847D69A9E59C1B051E3EF2ABD7A60AA7EDC3100A69666DF9AC525, 0x01]
 
@@ -3,11 +3,39 @@ from brownie import chain
 import umbral
 from umbral import SecretKey
 from py_ecc.secp256k1 import secp256k1
+from curve import *
 from eth_abi import encode_abi
+from eth_abi.encoding import TupleEncoder
+from eth_abi.registry import registry
+from eth_hash.auto import keccak
 from brownie.convert import to_bytes
 from brownie.convert.utils import get_type_strings
 from brownie.convert.normalize import format_input
 import copy
+import multiprocessing
+import os
+import secrets
+
+# Runs in the worker processes of Signer.sign_many_parallel. Module-level so it can be pickled
+def _sign_many_worker(privKeyHex, msgHashesHex):
+    return Signer(privKeyHex, Signer.AGG, {}).sign_many(msgHashesHex)
+
+
+# Runs in the worker processes of KeyPool.extend. Draws random scalars and keeps the ones with
+# a valid pubKeyX (< HALF_Q). Returns a list of (privKey, pubKeyX, pubKeyYPar) records.
+def _gen_keys_worker(numKeys):
+    keys = []
+    while len(keys) < numKeys:
+        privKeys = [
+            int.from_bytes(secrets.token_bytes(32), "big")
+            for _ in range(2 * (numKeys - len(keys)))
+        ]
+        privKeys = [k for k in privKeys if 0 < k < secp256k1.N]
+        for privKey, pubKey in zip(privKeys, base_multiply_many(privKeys)):
+            if pubKey[0] < Signer.HALF_Q_INT and len(keys) < numKeys:
+                keys.append((privKey, pubKey[0], pubKey[1] % 2))
+    return keys
+
 
 # Fcns return a list instead of a tuple since they need to be modified
 # for some tests (e.g. to make them revert)
@@ -18,26 +46,39 @@ class Signer:
     HALF_Q_INT = (Q_INT >> 1) + 1
     AGG = "Agg"
 
-    def __init__(self, privKeyHex, keyID, nonces):
+    # pubData can be passed as (pubKeyX bytes, pubKeyYPar) when it is already known (e.g.
+    # from the KeyPool) so that no EC work is done when creating the Signer.
+    def __init__(self, privKeyHex, keyID, nonces, pubData=None):
         self.privKeyHex = privKeyHex
-        self.privKey = SecretKey._from_exact_bytes(bytes.fromhex(privKeyHex))
         self.privKeyInt = int(self.privKeyHex, 16)
 
-        self.pubKey = self.privKey.public_key()
-        self.pubKeyX = bytes(self.pubKey)[1:]
+        if pubData is None:
+            pubKey = get_curve_backend().base_multiply(self.privKeyInt)
+            pubData = (pubKey[0].to_bytes(32, byteorder="big"), pubKey[1] % 2)
+
+        (self.pubKeyX, self.pubKeyYPar) = pubData
         self.pubKeyXHex = cleanHexStr(self.pubKeyX)
         self.pubKeyXInt = int(self.pubKeyXHex, 16)
-
-        self.pubKeyYPar = 0 if cleanHexStr(bytes(self.pubKey)[:1]) == "02" else 1
         self.pubKeyYParHex = "00" if self.pubKeyYPar == 0 else "01"
+        # abi.encodePacked(pubKeyX, pubKeyYPar), the start of every challenge
+        self.challengePrefix = self.pubKeyXInt.to_bytes(32, "big") + bytes.fromhex(
+            self.pubKeyYParHex
+        )
 
         self.nonces = nonces
 
+    @property
+    def privKey(self):
+        return SecretKey._from_exact_bytes(bytes.fromhex(self.privKeyHex))
+
+    @property
+    def pubKey(self):
+        return self.privKey.public_key()
+
     @classmethod
     def priv_key_to_pubX_int(cls, privKey):
-        pubKey = privKey.public_key()
-        pubKeyX = bytes(pubKey)[1:]
-        return int(cleanHexStr(pubKeyX), 16)
+        privKeyInt = int.from_bytes(privKey.to_secret_bytes(), byteorder="big")
+        return get_curve_backend().base_multiply(privKeyInt)[0]
 
     @classmethod
     def gen_key(cls):
@@ -77,6 +118,33 @@ class Signer:
         # Return sigData
         return self.generate_sigData(msgHash, nonces)
 
+    # Sign a run of consecutive nonces, one per (fcn, args) pair in calls, starting from
+    # nonces[AGG]. Returns the sigData list of each call in order. The hashing is done in
+    # this process and the EC work is fanned out to a process pool.
+    def getSigDataPipeline(self, keyManager, calls, nonces, processes=None):
+        startNonce = nonces[self.AGG]
+
+        msgHashes = []
+        for i, (fcn, args) in enumerate(calls):
+            contractMsgHash = Signer.generate_contractMsgHash(fcn, *args)
+            msgHashes.append(
+                Signer.generate_msgHash(
+                    contractMsgHash,
+                    {self.AGG: startNonce + i},
+                    keyManager.address,
+                    fcn._address,
+                )
+            )
+
+        sigDataList = []
+        for [s, nonceTimesGeneratorAddress] in self.sign_many_parallel(
+            msgHashes, processes
+        ):
+            sigDataList.append([s, nonces[self.AGG], nonceTimesGeneratorAddress])
+            nonces[self.AGG] += 1
+
+        return sigDataList
+
     def generate_sigData(self, msgHash, nonces):
 
         [s, nonceTimesGeneratorAddress] = self.sign(msgHash)
@@ -93,12 +161,32 @@ class Signer:
     # Generate the contractMsgHash by hashing the function selector and the function arguments
     @staticmethod
     def generate_contractMsgHash(fcn, *args):
+        (numInputs, fcnSig, modified_abi, encoder) = Signer.get_contractMsgEncoder(fcn)
+
         # Health check - function arguments contains an extra sigData
-        assert len(fcn.abi["inputs"]) == len(args) + 1
+        assert numInputs == len(args) + 1
+
+        # Format inputs according to abi, otherwise brownie accounts fail to be understood as addresses
+        formatted_args = format_input(modified_abi, args)
+
+        contractMsgToHash = encoder([fcnSig, *formatted_args])
+        return web3.keccak(contractMsgToHash)
+
+    # Signed functions never change, so the ABI work for each of them is done only once.
+    # Keyed by (contract address, function selector).
+    contractMsgEncoders = {}
+    contractMsgEncoderStats = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def get_contractMsgEncoder(cls, fcn):
+        key = (fcn._address, fcn.signature)
+        if key in cls.contractMsgEncoders:
+            cls.contractMsgEncoderStats["hits"] += 1
+            return cls.contractMsgEncoders[key]
+        cls.contractMsgEncoderStats["misses"] += 1
 
         # Get the function selector signature
-        fcnSig = fcn.signature
-        fcnSig = to_bytes(fcnSig, "bytes4")
+        fcnSig = to_bytes(fcn.signature, "bytes4")
 
         # Get the function types from the abi
         types = get_type_strings(fcn.abi["inputs"])
@@ -108,15 +196,26 @@ class Signer:
         assert types[0] == "(uint256,uint256,address)"
         types[0] = type_fcnSig
 
-        # Format inputs according to abi, otherwise brownie accounts fail to be understood as addresses
         # Remove sigData input to match args. We need to first remove sigData
         modified_abi = copy.deepcopy(fcn.abi)
         # Remove sigData type
         modified_abi["inputs"].pop(0)
-        formatted_args = format_input(modified_abi, args)
 
-        contractMsgToHash = encode_abi(types, [fcnSig, *formatted_args])
-        return web3.keccak(contractMsgToHash)
+        # Same encoding as encode_abi(types, ...) without resolving the types on every call
+        encoder = TupleEncoder(encoders=[registry.get_encoder(t) for t in types])
+
+        cls.contractMsgEncoders[key] = (
+            len(fcn.abi["inputs"]),
+            fcnSig,
+            modified_abi,
+            encoder,
+        )
+        return cls.contractMsgEncoders[key]
+
+    @classmethod
+    def clear_contractMsgEncoders(cls):
+        cls.contractMsgEncoders.clear()
+        cls.contractMsgEncoderStats.update({"hits": 0, "misses": 0})
 
     # Generate the msgHash by hashing the contractMsgHash, the nonces, the keyManager address and the chainID
     @staticmethod
@@ -125,64 +224,358 @@ class Signer:
     ):
         chainId = kwargs.get("chainId", chain.id)
 
-        # Format inputs according to abi, otherwise brownie accounts fail to be understood as addresses
-        aux_abi = {
-            "inputs": [
-                {"type": "bytes32"},
-                {"type": "uint256"},
-                {"type": "address"},
-                {"type": "uint256"},
-                {"type": "address"},
+        # Same as abi.encode(bytes32, uint256, address, uint256, address), every field
+        # being a 32-byte big-endian word
+        msgToHash = b"".join(
+            [
+                bytes32_to_bytes(contractMsgHash),
+                nonces["Agg"].to_bytes(32, "big"),
+                address_to_bytes(nonceConsumerAddress).rjust(32, b"\0"),
+                chainId.to_bytes(32, "big"),
+                address_to_bytes(keyManagerAddress).rjust(32, b"\0"),
             ]
-        }
-        args = [
-            contractMsgHash,
-            nonces["Agg"],
-            nonceConsumerAddress,
-            chainId,
-            keyManagerAddress,
-        ]
-        formatted_args = format_input(aux_abi, args)
-
-        # msgToHash will be in hex format (HexBytes('0x8ce..'))
-        msgToHash = encode_abi(
-            ["bytes32", "uint256", "address", "uint256", "address"],
-            formatted_args,
         )
 
-        # No need for "hexstr="" as msgToHash a hex byte obj
-        return cleanHexStr(web3.keccak(msgToHash))
+        return keccak(msgToHash).hex()
 
     # @dev reference /contracts/abstract/SchnorrSECP256k1.sol
     def sign(self, msgHashHex):
-        # Pick a "random" nonce (k)
-        k = int(web3.keccak(hexstr=msgHashHex).hex(), 16)
-        kTimesG = tuple(secp256k1.multiply(secp256k1.G, k))
+        k = self.gen_nonce(msgHashHex)
+        kTimesG = get_curve_backend().base_multiply(k)
+
+        return self.sign_with_nonce(msgHashHex, k, kTimesG)
+
+    # Same output as calling sign for every msgHash, but computing all the k*G together
+    # using the precomputed generator table (unless the curve backend is native).
+    def sign_many(self, msgHashesHex):
+        ks = [self.gen_nonce(msgHashHex) for msgHashHex in msgHashesHex]
+        kTimesGs = base_multiply_many(ks)
+
+        return [
+            self.sign_with_nonce(msgHashHex, k, kTimesG)
+            for msgHashHex, k, kTimesG in zip(msgHashesHex, ks, kTimesGs)
+        ]
+
+    # Same output as sign_many, splitting the msgHashes in contiguous chunks across a pool
+    # of processes (defaults to one per core). Small batches aren't worth the pool overhead.
+    def sign_many_parallel(self, msgHashesHex, processes=None):
+        processes = processes or multiprocessing.cpu_count()
+        if processes == 1 or len(msgHashesHex) < 2 * processes:
+            return self.sign_many(msgHashesHex)
+
+        # Build the table before forking so that the workers inherit it
+        generator_table()
 
-        # Get the x and y ordinate of our k*G value
-        kTimesGXInt = kTimesG[0]
-        kTimesGYInt = kTimesG[1]
-        kTimesGXBytes = (kTimesGXInt).to_bytes(32, byteorder="big")
-        kTimesGYParityBytes = (kTimesGYInt).to_bytes(32, byteorder="big")
-        kTimesGConcat = kTimesGXBytes + kTimesGYParityBytes
+        chunkSize = -(-len(msgHashesHex) // processes)
+        chunks = [
+            (self.privKeyHex, msgHashesHex[i : i + chunkSize])
+            for i in range(0, len(msgHashesHex), chunkSize)
+        ]
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.starmap(_sign_many_worker, chunks)
+
+        return [sig for chunk in results for sig in chunk]
 
-        # Get the hash of the concatenated (uncompressed) key
-        k256 = web3.keccak(kTimesGConcat)
+    # Pick a "random" nonce (k)
+    @staticmethod
+    def gen_nonce(msgHashHex):
+        return int.from_bytes(keccak(msgHash_to_bytes(msgHashHex)), "big")
+
+    def sign_with_nonce(self, msgHashHex, k, kTimesG):
+        # Get the hash of the concatenated (uncompressed) k*G
+        k256 = keccak(kTimesG[0].to_bytes(32, "big") + kTimesG[1].to_bytes(32, "big"))
 
         # Get the last 20 bytes of the hash, which is Ethereum Address format
-        nonceTimesGeneratorAddress = web3.toChecksumAddress(cleanHexStr(k256)[-40:])
+        nonceTimesGeneratorAddress = k256[12:]
 
-        challengeEncodedPacked = (
-            cleanHexStrPad(self.pubKeyX)
-            + self.pubKeyYParHex
-            + cleanHexStr(msgHashHex)
-            + cleanHexStr(nonceTimesGeneratorAddress)
+        # abi.encodePacked(pubKeyX, pubKeyYPar, msgHash, nonceTimesGeneratorAddress)
+        e = keccak(
+            self.challengePrefix
+            + msgHash_to_bytes(msgHashHex)
+            + nonceTimesGeneratorAddress
         )
-
-        e = web3.keccak(hexstr=challengeEncodedPacked)
-        eInt = int(cleanHexStr(e), 16)
+        eInt = int.from_bytes(e, "big")
 
         s = (k - (self.privKeyInt * eInt)) % self.Q_INT
         s = s + self.Q_INT if s < 0 else s
 
-        return [s, nonceTimesGeneratorAddress]
+        return [s, to_checksum_address(nonceTimesGeneratorAddress)]
+
+
+# msgHash as a hex string (with or without 0x) or bytes-like to bytes
+def msgHash_to_bytes(msgHash):
+    if isinstance(msgHash, str):
+        return bytes.fromhex(cleanHexStr(msgHash))
+    return bytes(msgHash)
+
+
+# Same conversion as brownie's format_input for a bytes32 argument
+def bytes32_to_bytes(value):
+    if isinstance(value, str):
+        value = int(value, 16)
+    elif not isinstance(value, int):
+        value = int.from_bytes(value, "big")
+    return value.to_bytes(32, "big")
+
+
+# Raw 20 bytes of an address given as a hex string, bytes or a brownie Account/Contract
+def address_to_bytes(address):
+    if hasattr(address, "address"):
+        address = address.address
+    if isinstance(address, str):
+        address = bytes.fromhex(cleanHexStr(address))
+    if len(address) != 20:
+        raise ValueError(f"Invalid address {address.hex()}")
+    return bytes(address)
+
+
+# EIP-55 checksummed hex string of the raw 20 bytes of an address
+def to_checksum_address(addressBytes):
+    addressHex = addressBytes.hex()
+    hashHex = keccak(addressHex.encode()).hex()
+    return "0x" + "".join(
+        c.upper() if int(h, 16) >= 8 else c for c, h in zip(addressHex, hashHex)
+    )
+
+
+# Pool of valid keys (pubKeyX < HALF_Q) generated in bulk and stored in a file so that
+# Signers can be handed out without any EC work. Each record is the private key, pubKeyX
+# (32 bytes each) and pubKeyYPar (1 byte). The pool is loaded on first use and extended
+# (and the file appended to) whenever it runs out of keys.
+class KeyPool:
+
+    RECORD_SIZE = 65
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self.records = None
+        self.next = 0
+
+    def load(self):
+        if self.records is not None:
+            return
+
+        self.records = []
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                data = f.read()
+            # Disregard a partially written last record
+            for i in range(0, len(data) - self.RECORD_SIZE + 1, self.RECORD_SIZE):
+                self.records.append(data[i : i + self.RECORD_SIZE])
+
+        if len(self.records) < self.size:
+            self.extend(self.size - len(self.records))
+
+    # Generate numKeys new keys, splitting the work across a pool of processes
+    def extend(self, numKeys, processes=None):
+        processes = processes or multiprocessing.cpu_count()
+        chunkSize = -(-numKeys // processes)
+        chunks = [min(chunkSize, numKeys - i) for i in range(0, numKeys, chunkSize)]
+
+        # Build the table before forking so that the workers inherit it
+        generator_table()
+        if len(chunks) == 1:
+            results = [_gen_keys_worker(chunks[0])]
+        else:
+            with multiprocessing.Pool(len(chunks)) as pool:
+                results = pool.map(_gen_keys_worker, chunks)
+
+        newRecords = [
+            privKey.to_bytes(32, "big")
+            + pubKeyX.to_bytes(32, "big")
+            + pubKeyYPar.to_bytes(1, "big")
+            for keys in results
+            for (privKey, pubKeyX, pubKeyYPar) in keys
+        ]
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(b"".join(newRecords))
+        self.records.extend(newRecords)
+
+    # Hand out the next unused key of the pool as a Signer
+    def signer(self, keyID, nonces):
+        self.load()
+        if self.next == len(self.records):
+            self.extend(self.size)
+
+        record = self.records[self.next]
+        self.next += 1
+
+        return Signer(
+            record[:32].hex(), keyID, nonces, pubData=(record[32:64], record[64])
+        )
+
+    def signers(self, numSigners, keyID, nonces):
+        return [self.signer(keyID, nonces) for _ in range(numSigners)]
+
+
+# ---------------------------------------------------------------------------------------- #
+# Off-chain mirror of /contracts/abstract/SchnorrSECP256K1.sol. Reverts are raised as a
+# ValueError with the same revert message as the contract.
+# ---------------------------------------------------------------------------------------- #
+
+# Minimum number of signatures from the same key for verifySignatures to build a
+# fixed-base table for that key (~255 additions per window) instead of multiplying
+PUBKEY_TABLE_THRESHOLD = 64
+
+
+def verifySigningKeyX(signingPubKeyX):
+    if signingPubKeyX >= Signer.HALF_Q_INT:
+        raise ValueError("Public-key x >= HALF_Q")
+
+
+def verifySignature(
+    msgHash, signature, signingPubKeyX, pubKeyYParity, nonceTimesGeneratorAddress
+):
+    (msgHash, nonceTimesGeneratorAddress) = _check_sig_inputs(
+        msgHash, signature, signingPubKeyX, nonceTimesGeneratorAddress
+    )
+    msgChallenge = _sig_challenge(
+        msgHash, signingPubKeyX, pubKeyYParity, nonceTimesGeneratorAddress
+    )
+
+    recoveredAddress = ecrecover(
+        Signer.Q_INT - ((signingPubKeyX * signature) % Signer.Q_INT),
+        27 if pubKeyYParity == 0 else 28,
+        signingPubKeyX,
+        (msgChallenge * signingPubKeyX) % Signer.Q_INT,
+    )
+    if recoveredAddress is None:
+        raise ValueError("Schnorr: recoveredAddress is 0")
+
+    return nonceTimesGeneratorAddress == recoveredAddress
+
+
+# Verify many signatures at once. Each element of sigs is a tuple with the verifySignature
+# arguments. Returns a list of bools, False for the signatures that would make the contract
+# revert. The challenge only commits to the address of k*G, so the k*G points needed for a
+# random linear combination check aren't available. Instead the signatures share the EC work:
+# ecrecover above recovers signature*G + msgChallenge*PK, so all the signature*G are computed
+# with the generator table, all msgChallenge*PK with a table per repeated key, and the sums
+# with a single batched addition. A native curve backend just verifies them one by one.
+def verifySignatures(sigs):
+    results = [False] * len(sigs)
+    valid = []
+    for i, (msgHash, signature, signingPubKeyX, pubKeyYParity, address) in enumerate(
+        sigs
+    ):
+        try:
+            (msgHash, address) = _check_sig_inputs(
+                msgHash, signature, signingPubKeyX, address
+            )
+        except ValueError:
+            continue
+
+        msgChallenge = _sig_challenge(msgHash, signingPubKeyX, pubKeyYParity, address)
+        # ecrecover fails for a zero s argument and for an x ordinate not on the curve
+        if (msgChallenge * signingPubKeyX) % Signer.Q_INT == 0:
+            continue
+        pubKey = lift_x(signingPubKeyX, pubKeyYParity)
+        if pubKey is None:
+            continue
+
+        valid.append((i, signature, msgChallenge, pubKey, address))
+
+    backend = get_curve_backend()
+
+    # A native backend is faster one signature at a time
+    if backend.native:
+        for (i, signature, msgChallenge, pubKey, address) in valid:
+            point = backend.add(
+                backend.base_multiply(signature), backend.multiply(pubKey, msgChallenge)
+            )
+            results[i] = address == point_to_address(point)
+        return results
+
+    sigTimesGs = fixed_base_multiply_many([v[1] for v in valid])
+
+    # Group the challenges by public key
+    challengesByKey = {}
+    for j, (_, _, msgChallenge, pubKey, _) in enumerate(valid):
+        challengesByKey.setdefault(pubKey, []).append((j, msgChallenge))
+
+    challengeTimesPubKeys = [None] * len(valid)
+    for pubKey, challenges in challengesByKey.items():
+        if len(challenges) >= PUBKEY_TABLE_THRESHOLD:
+            points = fixed_base_multiply_many(
+                [c for _, c in challenges], build_point_table(pubKey)
+            )
+        else:
+            points = [backend.multiply(pubKey, c) for _, c in challenges]
+        for (j, _), point in zip(challenges, points):
+            challengeTimesPubKeys[j] = point
+
+    # Degenerate sums (same x ordinate) can't be batched
+    idxs, ps, qs = [], [], []
+    for j, (p, q) in enumerate(zip(sigTimesGs, challengeTimesPubKeys)):
+        if p[0] == q[0]:
+            results[valid[j][0]] = valid[j][4] == point_to_address(backend.add(p, q))
+        else:
+            idxs.append(j)
+            ps.append(p)
+            qs.append(q)
+
+    for j, point in zip(idxs, batch_add(ps, qs)):
+        results[valid[j][0]] = valid[j][4] == point_to_address(point)
+
+    return results
+
+
+# Mirror of the ecrecover precompile. Returns the 20-byte address or None on failure
+def ecrecover(msgHash, v, r, s):
+    if v not in [27, 28] or not (0 < r < secp256k1.N) or not (0 < s < secp256k1.N):
+        return None
+
+    R = lift_x(r, v - 27)
+    if R is None:
+        return None
+
+    rInv = pow(r, secp256k1.N - 2, secp256k1.N)
+    u1 = (-msgHash * rInv) % secp256k1.N
+    u2 = (s * rInv) % secp256k1.N
+    backend = get_curve_backend()
+    point = backend.add(backend.base_multiply(u1), backend.multiply(R, u2))
+
+    return point_to_address(point)
+
+
+# Lower 20 bytes of the keccak of the affine coordinates. None for the point at infinity
+def point_to_address(point):
+    if point[0] == 0 and point[1] == 0:
+        return None
+    return keccak(point[0].to_bytes(32, "big") + point[1].to_bytes(32, "big"))[-20:]
+
+
+def _check_sig_inputs(msgHash, signature, signingPubKeyX, nonceTimesGeneratorAddress):
+    msgHash = int(cleanHexStr(msgHash), 16)
+    nonceTimesGeneratorAddress = bytes.fromhex(
+        cleanHexStr(str(nonceTimesGeneratorAddress)).rjust(40, "0")
+    )
+
+    verifySigningKeyX(signingPubKeyX)
+    if signature >= Signer.Q_INT:
+        raise ValueError("Sig must be reduced modulo Q")
+    if (
+        nonceTimesGeneratorAddress == bytes(20)
+        or signingPubKeyX == 0
+        or signature == 0
+        or msgHash == 0
+    ):
+        raise ValueError("No zero inputs allowed")
+
+    return msgHash, nonceTimesGeneratorAddress
+
+
+# keccak256(abi.encodePacked(signingPubKeyX, pubKeyYParity, msgHash, nonceTimesGeneratorAddress))
+def _sig_challenge(msgHash, signingPubKeyX, pubKeyYParity, nonceTimesGeneratorAddress):
+    return int.from_bytes(
+        keccak(
+            signingPubKeyX.to_bytes(32, "big")
+            + pubKeyYParity.to_bytes(1, "big")
+            + msgHash.to_bytes(32, "big")
+            + nonceTimesGeneratorAddress
+        ),
+        "big",
+    )
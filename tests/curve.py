@@ -0,0 +1,316 @@
+import os
+from py_ecc.secp256k1 import secp256k1
+
+# Optional native backend
+try:
+    import coincurve
+except ImportError:
+    coincurve = None
+
+# secp256k1 arithmetic used by crypto.py. Points are affine (x, y) tuples and the point at
+# infinity is (0, 0), same as py_ecc. Three interchangeable backends are available:
+#   - py_ecc:    the reference implementation (what the Signer used originally)
+#   - jacobian:  pure python, Jacobian coordinates with a single inversion per result
+#   - coincurve: libsecp256k1 bindings, only if coincurve is installed
+# The backend is selected with set_curve_backend() or the CURVE_BACKEND env variable and
+# defaults to the fastest one available.
+
+# Fixed-base precomputation for k*P. A table holds (2**FIXED_BASE_WINDOW - 1) affine multiples
+# of P for every window of the scalar, so k*P is just one addition per window instead of the
+# full double-and-add. 8 bits => 32 windows of 255 points. The table for G is built once and
+# on demand, tables for other points (e.g. public keys) are built by the caller.
+FIXED_BASE_WINDOW = 8
+FIXED_BASE_MASK = (1 << FIXED_BASE_WINDOW) - 1
+_gTable = None
+
+
+# Montgomery's trick - invert all the field elements with a single modular inversion
+def batch_inverse(values):
+    if len(values) == 0:
+        return []
+
+    prefix = []
+    acc = 1
+    for value in values:
+        prefix.append(acc)
+        acc = (acc * value) % secp256k1.P
+
+    inv = pow(acc, secp256k1.P - 2, secp256k1.P)
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        inverses[i] = (prefix[i] * inv) % secp256k1.P
+        inv = (inv * values[i]) % secp256k1.P
+
+    return inverses
+
+
+# Affine addition of ps[i] + qs[i] for all i sharing a single inversion. The caller must
+# ensure that no point is the identity and that ps[i] != +-qs[i] (different x ordinates).
+def batch_add(ps, qs):
+    inverses = batch_inverse([(q[0] - p[0]) % secp256k1.P for p, q in zip(ps, qs)])
+    sums = []
+    for (x1, y1), (x2, y2), inv in zip(ps, qs, inverses):
+        lam = ((y2 - y1) * inv) % secp256k1.P
+        x3 = (lam * lam - x1 - x2) % secp256k1.P
+        sums.append((x3, (lam * (x1 - x3) - y1) % secp256k1.P))
+    return sums
+
+
+# table[j][d] = d * 2**(FIXED_BASE_WINDOW * j) * point. Index 0 is unused (identity)
+def build_point_table(point):
+    numWindows = (secp256k1.N.bit_length() + FIXED_BASE_WINDOW - 1) // FIXED_BASE_WINDOW
+
+    bases = [tuple(point)]
+    for _ in range(numWindows - 1):
+        base = bases[-1]
+        for _ in range(FIXED_BASE_WINDOW):
+            base = tuple(secp256k1.add(base, base))
+        bases.append(base)
+
+    # Build every row at once, one batched addition per multiple
+    table = [[None, base, tuple(secp256k1.add(base, base))] for base in bases]
+    for _ in range(3, FIXED_BASE_MASK + 1):
+        sums = batch_add([row[-1] for row in table], bases)
+        for row, point in zip(table, sums):
+            row.append(point)
+
+    return table
+
+
+def generator_table():
+    global _gTable
+    if _gTable is None:
+        _gTable = build_point_table(secp256k1.G)
+    return _gTable
+
+
+# Compute k*P for every scalar, where P is G unless another point's table is passed. Each
+# window is a round of batched additions across all the scalars, so the cost of each
+# inversion is shared by the whole batch.
+def fixed_base_multiply_many(scalars, table=None):
+    table = table or generator_table()
+    scalars = [k % secp256k1.N for k in scalars]
+    accs = [None] * len(scalars)
+    # Degenerate additions (acc == +-table point) can't be batched, fallback to py_ecc
+    fallback = set()
+
+    for j, row in enumerate(table):
+        shift = j * FIXED_BASE_WINDOW
+        idxs, ps, qs = [], [], []
+        for i, k in enumerate(scalars):
+            digit = (k >> shift) & FIXED_BASE_MASK
+            if digit == 0 or i in fallback:
+                continue
+            point = row[digit]
+            if accs[i] is None:
+                accs[i] = point
+            elif accs[i][0] == point[0]:
+                fallback.add(i)
+            else:
+                idxs.append(i)
+                ps.append(accs[i])
+                qs.append(point)
+
+        for i, point in zip(idxs, batch_add(ps, qs)):
+            accs[i] = point
+
+    # Zero scalars never get an accumulator, let py_ecc return its identity representation
+    for i in fallback.union(i for i, acc in enumerate(accs) if acc is None):
+        accs[i] = tuple(secp256k1.multiply(table[0][1], scalars[i]))
+
+    return accs
+
+
+# Get the point with the x ordinate and the y parity. None if x is not on the curve
+def lift_x(x, yParity):
+    if x >= secp256k1.P:
+        return None
+    ySquared = (pow(x, 3, secp256k1.P) + secp256k1.B) % secp256k1.P
+    y = pow(ySquared, (secp256k1.P + 1) // 4, secp256k1.P)
+    if (y * y) % secp256k1.P != ySquared:
+        return None
+    return (x, y if y % 2 == yParity else secp256k1.P - y)
+
+
+class PyEccBackend:
+
+    name = "py_ecc"
+    native = False
+
+    def base_multiply(self, k):
+        return tuple(secp256k1.multiply(secp256k1.G, k))
+
+    def multiply(self, point, k):
+        return tuple(secp256k1.multiply(point, k))
+
+    def add(self, p, q):
+        return tuple(secp256k1.add(p, q))
+
+
+# Formulas for a = 0 from https://hyperelliptic.org/EFD/g1p/auto-shortw-jacobian-0.html
+# Jacobian points are (X, Y, Z) with x = X/Z^2, y = Y/Z^3. None is the point at infinity.
+class JacobianBackend:
+
+    name = "jacobian"
+    native = False
+
+    # k*G with the generator table, one mixed addition per window
+    def base_multiply(self, k):
+        k %= secp256k1.N
+        acc = None
+        for j, row in enumerate(generator_table()):
+            digit = (k >> (j * FIXED_BASE_WINDOW)) & FIXED_BASE_MASK
+            if digit != 0:
+                acc = self._add_affine(acc, row[digit])
+        return self._to_affine(acc)
+
+    # Left-to-right fixed window of 4 bits. The 15 multiples of the point are normalised to
+    # affine with a single (batched) inversion so that they can be used as mixed addends.
+    def multiply(self, point, k):
+        k %= secp256k1.N
+        if k == 0 or point == (0, 0):
+            return (0, 0)
+
+        multiples = [(point[0], point[1], 1)]
+        for _ in range(14):
+            multiples.append(self._add_affine(multiples[-1], point))
+        multiples = [None] + self._to_affine_many(multiples)
+
+        acc = None
+        for shift in range((k.bit_length() + 3) // 4 * 4 - 4, -4, -4):
+            for _ in range(4):
+                acc = self._double(acc)
+            digit = (k >> shift) & 0xF
+            if digit != 0:
+                acc = self._add_affine(acc, multiples[digit])
+        return self._to_affine(acc)
+
+    def add(self, p, q):
+        if p == (0, 0):
+            return tuple(q)
+        if q == (0, 0):
+            return tuple(p)
+        return self._to_affine(self._add_affine((p[0], p[1], 1), q))
+
+    @staticmethod
+    def _double(p):
+        if p is None or p[1] == 0:
+            return None
+        (X1, Y1, Z1) = p
+        A = (X1 * X1) % secp256k1.P
+        B = (Y1 * Y1) % secp256k1.P
+        C = (B * B) % secp256k1.P
+        D = (2 * ((X1 + B) * (X1 + B) - A - C)) % secp256k1.P
+        E = 3 * A
+        X3 = (E * E - 2 * D) % secp256k1.P
+        Y3 = (E * (D - X3) - 8 * C) % secp256k1.P
+        Z3 = (2 * Y1 * Z1) % secp256k1.P
+        return (X3, Y3, Z3)
+
+    # Mixed addition of a Jacobian point p and an affine point q (madd-2007-bl)
+    @classmethod
+    def _add_affine(cls, p, q):
+        if p is None:
+            return (q[0], q[1], 1)
+        (X1, Y1, Z1) = p
+        (x2, y2) = q
+        Z1Z1 = (Z1 * Z1) % secp256k1.P
+        U2 = (x2 * Z1Z1) % secp256k1.P
+        S2 = (y2 * Z1 * Z1Z1) % secp256k1.P
+        H = (U2 - X1) % secp256k1.P
+        r = (2 * (S2 - Y1)) % secp256k1.P
+        if H == 0:
+            return cls._double(p) if r == 0 else None
+        HH = (H * H) % secp256k1.P
+        I = 4 * HH
+        J = (H * I) % secp256k1.P
+        V = (X1 * I) % secp256k1.P
+        X3 = (r * r - J - 2 * V) % secp256k1.P
+        Y3 = (r * (V - X3) - 2 * Y1 * J) % secp256k1.P
+        Z3 = ((Z1 + H) * (Z1 + H) - Z1Z1 - HH) % secp256k1.P
+        return (X3, Y3, Z3)
+
+    @classmethod
+    def _to_affine(cls, p):
+        if p is None or p[2] == 0:
+            return (0, 0)
+        return cls._to_affine_many([p])[0]
+
+    # The points can't be the point at infinity
+    @staticmethod
+    def _to_affine_many(ps):
+        affine = []
+        for (X, Y, _), zInv in zip(ps, batch_inverse([p[2] for p in ps])):
+            zInv2 = (zInv * zInv) % secp256k1.P
+            affine.append(((X * zInv2) % secp256k1.P, (Y * zInv2 * zInv) % secp256k1.P))
+        return affine
+
+
+class CoincurveBackend:
+
+    name = "coincurve"
+    native = True
+
+    def base_multiply(self, k):
+        k %= secp256k1.N
+        if k == 0:
+            return (0, 0)
+        return coincurve.PublicKey.from_secret(k.to_bytes(32, "big")).point()
+
+    def multiply(self, point, k):
+        k %= secp256k1.N
+        if k == 0 or point == (0, 0):
+            return (0, 0)
+        return (
+            coincurve.PublicKey.from_point(*point)
+            .multiply(k.to_bytes(32, "big"))
+            .point()
+        )
+
+    def add(self, p, q):
+        if p == (0, 0):
+            return tuple(q)
+        if q == (0, 0):
+            return tuple(p)
+        try:
+            return coincurve.PublicKey.combine_keys(
+                [coincurve.PublicKey.from_point(*p), coincurve.PublicKey.from_point(*q)]
+            ).point()
+        except ValueError:
+            # Sum is the point at infinity
+            return (0, 0)
+
+
+CURVE_BACKENDS = {
+    backend.name: backend
+    for backend in [PyEccBackend, JacobianBackend, CoincurveBackend]
+    if backend is not CoincurveBackend or coincurve is not None
+}
+_curveBackend = None
+
+
+def set_curve_backend(name):
+    global _curveBackend
+    if name not in CURVE_BACKENDS:
+        raise ValueError(
+            f"Unknown or unavailable curve backend {name}. Available: {list(CURVE_BACKENDS)}"
+        )
+    _curveBackend = CURVE_BACKENDS[name]()
+    return _curveBackend
+
+
+def get_curve_backend():
+    if _curveBackend is None:
+        set_curve_backend(
+            os.environ.get("CURVE_BACKEND")
+            or ("coincurve" if "coincurve" in CURVE_BACKENDS else "jacobian")
+        )
+    return _curveBackend
+
+
+# k*G for every scalar. Batched through the generator table unless the backend is native
+def base_multiply_many(scalars):
+    backend = get_curve_backend()
+    if backend.native:
+        return [backend.base_multiply(k) for k in scalars]
+    return fixed_base_multiply_many(scalars)
@@ -0,0 +1,74 @@
+import multiprocessing
+from eth_hash.auto import keccak
+from eth_utils import to_checksum_address
+from utils import cleanHexStrPad, getInitCodeHash
+from address import Address
+
+# Worker of DepositAddresses.addresses. Module-level so it can be pickled
+def _derive_worker(prefix, initCodeHash, salts):
+    return [keccak(prefix + salt + initCodeHash)[12:] for salt in salts]
+
+
+# Salt of the Deposit deployed for a swapID: the swapID as a bytes32
+def swapID_to_salt(swapID):
+    if isinstance(swapID, int):
+        return swapID.to_bytes(32, "big")
+    return bytes.fromhex(cleanHexStrPad(swapID))
+
+
+# CREATE2 addresses of the Deposit contracts deployed by the Vault, one per (swapID, token).
+# The init code hash is cached per token (see getInitCodeHash) so deriving an address is a
+# single keccak. Derived addresses are kept in a reverse index to attribute transfers to
+# deposit addresses back to their (swapID, token).
+class DepositAddresses:
+
+    # Below this many swapIDs the process pool isn't worth it
+    MIN_PARALLEL_BATCH = 20000
+
+    def __init__(self, vault, contractContainer):
+        self.vault = str(vault)
+        self.bytecode = contractContainer.bytecode
+        self.prefix = b"\xff" + Address(self.vault).raw
+        self.index = {}
+
+    def initCodeHash(self, token):
+        return bytes(getInitCodeHash(self.bytecode, cleanHexStrPad(str(token))))
+
+    # Same as getCreate2Addr(vault, cleanHexStrPad(swapID), Deposit, cleanHexStrPad(token))
+    def address(self, swapID, token):
+        return self.addresses([swapID], token)[0]
+
+    # Checksummed addresses of the swapIDs for a token, in order. They're added to the
+    # reverse index. With processes > 1 large batches are split across a process pool.
+    def addresses(self, swapIDs, token, processes=1):
+        swapIDs = list(swapIDs)
+        salts = [swapID_to_salt(swapID) for swapID in swapIDs]
+        initCodeHash = self.initCodeHash(token)
+
+        processes = processes or multiprocessing.cpu_count()
+        if processes == 1 or len(salts) < self.MIN_PARALLEL_BATCH:
+            rawAddresses = _derive_worker(self.prefix, initCodeHash, salts)
+        else:
+            chunkSize = -(-len(salts) // processes)
+            chunks = [
+                (self.prefix, initCodeHash, salts[i : i + chunkSize])
+                for i in range(0, len(salts), chunkSize)
+            ]
+            with multiprocessing.Pool(processes) as pool:
+                results = pool.starmap(_derive_worker, chunks)
+            rawAddresses = [address for chunk in results for address in chunk]
+
+        token = str(token)
+        for swapID, rawAddress in zip(swapIDs, rawAddresses):
+            self.index[rawAddress] = (swapID, token)
+        return [to_checksum_address(rawAddress) for rawAddress in rawAddresses]
+
+    # (swapID, token) of a derived deposit address, None if it's not in the index
+    def lookup(self, address):
+        return self.index.get(Address(address).raw)
+
+    def __contains__(self, address):
+        return self.lookup(address) is not None
+
+    def __len__(self):
+        return len(self.index)
@@ -0,0 +1,196 @@
+import json
+import sqlite3
+import threading
+from hexbytes import HexBytes
+
+# On-disk store of raw logs so that repeated scans of the same event only fetch the blocks
+# past what has already been stored. Logs are keyed by (chainId, address, topic0) and each
+# key has a single contiguous range of blocks [fromBlock, toBlock] known to be complete.
+# Blocks less than `confirmations` deep are never stored in case they are reorged.
+# The hash of toBlock is stored with the range and checked against the chain before the logs
+# are used, so they are dropped if the chain has changed under the same chainId (e.g. a new
+# hardhat session or a reorg deeper than `confirmations`).
+class EventStore:
+    VERSION = 1
+
+    def __init__(self, path, confirmations=12):
+        self.path = path
+        self.confirmations = confirmations
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        # Stores from before the block hashes were kept are dropped
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < self.VERSION:
+            self.db.executescript(
+                f"""
+                DROP TABLE IF EXISTS logs;
+                DROP TABLE IF EXISTS ranges;
+                PRAGMA user_version = {self.VERSION};
+                """
+            )
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS logs (
+                chainId INTEGER, address TEXT, topic0 TEXT,
+                blockNumber INTEGER, logIndex INTEGER,
+                transactionIndex INTEGER, transactionHash TEXT, blockHash TEXT,
+                topics TEXT, data TEXT,
+                PRIMARY KEY (chainId, address, topic0, blockNumber, logIndex)
+            );
+            CREATE TABLE IF NOT EXISTS ranges (
+                chainId INTEGER, address TEXT, topic0 TEXT,
+                fromBlock INTEGER, toBlock INTEGER, blockHash TEXT,
+                PRIMARY KEY (chainId, address, topic0)
+            );
+            """
+        )
+
+    def close(self):
+        self.db.close()
+
+    # Range of blocks stored for the key, or None. If get_block_hash is passed and the chain
+    # doesn't have the stored hash at toBlock anymore, the logs of the key are dropped.
+    def coverage(self, key, get_block_hash=None):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT fromBlock, toBlock, blockHash FROM ranges WHERE chainId=? AND address=? AND topic0=?",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+        (from_block, to_block, block_hash) = row
+        if get_block_hash is not None and get_block_hash(to_block) != block_hash:
+            self.drop(key)
+            return None
+        return (from_block, to_block)
+
+    def drop(self, key):
+        with self.lock, self.db:
+            for table in ["logs", "ranges"]:
+                self.db.execute(
+                    f"DELETE FROM {table} WHERE chainId=? AND address=? AND topic0=?",
+                    key,
+                )
+
+    # Stored logs between from_block and to_block (inclusive) in (blockNumber, logIndex) order
+    def read(self, key, from_block, to_block):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT blockNumber, logIndex, transactionIndex, transactionHash, blockHash, topics, data, address"
+                " FROM logs WHERE chainId=? AND address=? AND topic0=? AND blockNumber BETWEEN ? AND ?"
+                " ORDER BY blockNumber, logIndex",
+                (*key, from_block, to_block),
+            ).fetchall()
+        return [
+            {
+                "blockNumber": blockNumber,
+                "logIndex": logIndex,
+                "transactionIndex": transactionIndex,
+                "transactionHash": HexBytes(transactionHash),
+                "blockHash": HexBytes(blockHash),
+                "topics": [HexBytes(topic) for topic in json.loads(topics)],
+                "data": data,
+                "address": address,
+                "removed": False,
+            }
+            for (
+                blockNumber,
+                logIndex,
+                transactionIndex,
+                transactionHash,
+                blockHash,
+                topics,
+                data,
+                address,
+            ) in rows
+        ]
+
+    # Store all the logs of the key between from_block and to_block. The stored range is only
+    # extended if it overlaps or is adjacent to the new one, otherwise the logs are not kept.
+    # get_block_hash(blockNumber) returns the hash of a block as a hex string, None if missing.
+    def write(self, key, logs, from_block, to_block, latest_block, get_block_hash):
+        safe_block = latest_block - self.confirmations
+        to_block = min(to_block, safe_block)
+        if to_block < from_block:
+            return
+
+        coverage = self.coverage(key)
+        if coverage is not None and (
+            from_block > coverage[1] + 1 or to_block < coverage[0] - 1
+        ):
+            return
+        if coverage is not None:
+            from_block = min(from_block, coverage[0])
+            to_block = max(to_block, coverage[1])
+        block_hash = get_block_hash(to_block)
+        if block_hash is None:
+            return
+
+        with self.lock, self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO logs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        *key,
+                        log["blockNumber"],
+                        log["logIndex"],
+                        log["transactionIndex"],
+                        HexBytes(log["transactionHash"]).hex(),
+                        HexBytes(log["blockHash"]).hex(),
+                        json.dumps([HexBytes(topic).hex() for topic in log["topics"]]),
+                        HexBytes(log["data"]).hex(),
+                    )
+                    for log in logs
+                    if log["blockNumber"] <= safe_block
+                ],
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO ranges VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, from_block, to_block, block_hash),
+            )
+
+    # Key of the logs matched by the filter, None if the filter can't be stored because it's
+    # not on a single address and topic0 or the range isn't given as block numbers
+    @staticmethod
+    def key(filter_params, chain_id):
+        address = filter_params.get("address")
+        topics = filter_params.get("topics") or []
+        if (
+            not isinstance(address, str)
+            or len(topics) != 1
+            or not isinstance(topics[0], (str, bytes))
+        ):
+            return None
+        return (chain_id, address, HexBytes(topics[0]).hex())
+
+    # Same as get_logs(filter_params) using the stored logs where possible
+    def get_logs(self, filter_params, get_logs, chain_id, latest_block, get_block_hash):
+        from_block = filter_params.get("fromBlock")
+        to_block = filter_params.get("toBlock")
+        if to_block == "latest":
+            to_block = latest_block
+        key = self.key(filter_params, chain_id)
+        if (
+            key is None
+            or not isinstance(from_block, int)
+            or not isinstance(to_block, int)
+        ):
+            return get_logs(filter_params)
+
+        coverage = self.coverage(key, get_block_hash)
+        if coverage is None or from_block > coverage[1] or to_block < coverage[0]:
+            logs = get_logs({**filter_params, "toBlock": to_block})
+            self.write(key, logs, from_block, to_block, latest_block, get_block_hash)
+            return logs
+
+        logs = []
+        if from_block < coverage[0]:
+            logs += get_logs(
+                {**filter_params, "fromBlock": from_block, "toBlock": coverage[0] - 1}
+            )
+        logs += self.read(key, max(from_block, coverage[0]), min(to_block, coverage[1]))
+        if to_block > coverage[1]:
+            logs += get_logs(
+                {**filter_params, "fromBlock": coverage[1] + 1, "toBlock": to_block}
+            )
+        self.write(key, logs, from_block, to_block, latest_block, get_block_hash)
+        return logs
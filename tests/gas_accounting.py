@@ -0,0 +1,88 @@
+from brownie import history
+from rpc_batch import RpcBatchClient
+
+
+# Base fees of a list of blocks, fetched in JSON-RPC batches
+def get_base_fees(blockNumbers):
+    with RpcBatchClient() as client:
+        blocks = [client.getBlock(blockNumber) for blockNumber in blockNumbers]
+    return {
+        blockNumber: int(block.result()["baseFeePerGas"], 16)
+        for blockNumber, block in zip(blockNumbers, blocks)
+    }
+
+
+# Gas accounting of the transactions broadcasted by brownie (history). Base fees are cached
+# per block and the missing ones are fetched in batches. The transactions are processed
+# once, as they get added to the history, into a running total per sender. The gas spent by
+# an address from its nth transaction is then the difference of two running totals.
+class GasAccounting:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.baseFees = {}
+        self.processed = 0
+        self.lastTx = None
+        # sender => running totals, cumulative[n] is the gas spent in its first n transactions
+        self.cumulative = {}
+        # sender => transactions not added to the running totals yet because they, or an
+        # earlier one of the same sender, are not mined yet
+        self.pending = {}
+
+    # Base fees of the blocks not cached yet
+    def fetchBaseFees(self, blockNumbers):
+        missing = sorted({b for b in blockNumbers if b not in self.baseFees})
+        if missing:
+            self.baseFees.update(get_base_fees(missing))
+
+    def gasTransaction(self, txReceipt):
+        self.fetchBaseFees([txReceipt.block_number])
+        # Could be simplified with `txReceipt.gas_used * txReceipt.gas_price`, but keeping the calculation to show `base_fee + priority_fee`
+        base_fee = self.baseFees[txReceipt.block_number]
+        priority_fee = txReceipt.gas_price - base_fee
+        return (txReceipt.gas_used * base_fee) + (txReceipt.gas_used * priority_fee)
+
+    # Add the transactions broadcasted since the last update to the running totals. A sender's
+    # transactions are added in order up to the first one that is not mined yet, the rest are
+    # picked up on a later update. Other senders aren't held back by it.
+    def update(self):
+        # The history is rolled back on chain.revert/undo and the blocks with it
+        if len(history) < self.processed or (
+            self.processed > 0 and history[self.processed - 1] is not self.lastTx
+        ):
+            self.reset()
+
+        for txReceipt in history[self.processed :]:
+            self.pending.setdefault(str(txReceipt.sender).lower(), []).append(txReceipt)
+        if len(history) > self.processed:
+            self.processed = len(history)
+            self.lastTx = history[-1]
+
+        mined = {}
+        for sender, txReceipts in self.pending.items():
+            numMined = 0
+            while (
+                numMined < len(txReceipts)
+                and txReceipts[numMined].block_number is not None
+            ):
+                numMined += 1
+            mined[sender] = txReceipts[:numMined]
+            del txReceipts[:numMined]
+        self.fetchBaseFees(
+            [txReceipt.block_number for txs in mined.values() for txReceipt in txs]
+        )
+
+        for sender, txReceipts in mined.items():
+            cumulative = self.cumulative.setdefault(sender, [0])
+            for txReceipt in txReceipts:
+                cumulative.append(cumulative[-1] + self.gasTransaction(txReceipt))
+
+    # Same as adding up gasTransaction for history.filter(sender=address)[initialTransactionNumber:]
+    def gasSpentByAddress(self, address, initialTransactionNumber):
+        self.update()
+        cumulative = self.cumulative.get(str(address).lower(), [0])
+        return (
+            cumulative[-1]
+            - cumulative[min(initialTransactionNumber, len(cumulative) - 1)]
+        )
@@ -0,0 +1,37 @@
+from consts import *
+from brownie.test import given, strategy
+from shared_tests import *
+
+
+@given(
+    st_govKeys=strategy("address[]", min_length=1, max_length=10),
+    st_processes=strategy("uint", min_value=1, max_value=4),
+)
+def test_sig_pipeline(cf, st_govKeys, st_processes):
+    calls = [(cf.keyManager.setGovKeyWithAggKey, [govKey]) for govKey in st_govKeys]
+    startNonce = nonces[AGG]
+
+    sigDataList = AGG_SIGNER_1.getSigDataPipeline(
+        cf.keyManager, calls, nonces, st_processes
+    )
+
+    # Nonce advanced once per call
+    assert nonces[AGG] == startNonce + len(calls)
+    assert [sigData[1] for sigData in sigDataList] == list(
+        range(startNonce, nonces[AGG])
+    )
+
+    # Same signatures as signing them one by one
+    sequentialNonces = {AGG: startNonce}
+    assert sigDataList == [
+        AGG_SIGNER_1.getSigDataWithNonces(cf.keyManager, fcn, sequentialNonces, *args)
+        for fcn, args in calls
+    ]
+
+    # Broadcast them in order
+    for sigData, (fcn, args) in zip(sigDataList, calls):
+        oldGovKey = cf.keyManager.getGovernanceKey()
+        tx = fcn(sigData, *args, {"from": cf.ALICE})
+        assert tx.events["GovKeySetByAggKey"][0].values() == [oldGovKey, args[0]]
+
+    assert cf.keyManager.getGovernanceKey() == st_govKeys[-1]
@@ -257,6 +257,35 @@ def test_sig_msgHash(cf, st_sender, st_new_govKey, st_address, st_chainId, st_am
     )
 
 
+@given(
+    st_new_govKey=strategy("address"),
+    st_amount=strategy("uint256", exclude=0),
+)
+def test_sig_contractMsgEncoder_cache(cf, st_new_govKey, st_amount):
+    Signer.clear_contractMsgEncoders()
+
+    args = [JUNK_HEX, st_amount, st_new_govKey, getChainTime(), ZERO_ADDR]
+    for fcn, fcnArgs in [
+        (cf.keyManager.setGovKeyWithAggKey, [st_new_govKey]),
+        (cf.stateChainGateway.registerRedemption, args),
+    ]:
+        # Hash computed without the cached encoders
+        types = get_type_strings(fcn.abi["inputs"])
+        types[0] = "bytes4"
+        abi = {"inputs": fcn.abi["inputs"][1:]}
+        expectedHash = web3.keccak(
+            encode_abi(
+                types,
+                [to_bytes(fcn.signature, "bytes4"), *format_input(abi, fcnArgs)],
+            )
+        )
+
+        assert Signer.generate_contractMsgHash(fcn, *fcnArgs) == expectedHash
+        assert Signer.generate_contractMsgHash(fcn, *fcnArgs) == expectedHash
+
+    assert Signer.contractMsgEncoderStats == {"hits": 2, "misses": 2}
+
+
 def contractMsgHash_sigVerification(
     fcn, keyManager, contractMsgHash, sigData, st_sig, st_sender, st_address, *args
 ):
@@ -0,0 +1,128 @@
+from consts import *
+from shared_tests import *
+from signing_service import SigningService
+from signing_client import SigningClient
+from concurrent.futures import ThreadPoolExecutor
+from brownie.test import given, strategy
+import asyncio
+import threading
+import pytest
+
+
+# Run the service in its own event loop thread, as if it was a separate process
+@pytest.fixture
+def service():
+    service = SigningService(AGG_SIGNER_1, nonces[AGG])
+    loop = asyncio.new_event_loop()
+    service.port = loop.run_until_complete(service.start(port=0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    yield service
+
+    asyncio.run_coroutine_threadsafe(service.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    # Keep the in-memory nonce in sync for the rest of the tests
+    nonces[AGG] = service.nonces[AGG]
+
+
+@given(
+    st_amounts=strategy("uint[]", min_value=1, max_value=TEST_AMNT, max_length=20),
+    st_numClients=strategy("uint", min_value=1, max_value=5),
+)
+def test_signingService(cf, service, st_amounts, st_numClients):
+    cf.SAFEKEEPER.transfer(cf.vault, sum(st_amounts))
+    startNonce = service.nonces[AGG]
+    calls = [[[NATIVE_ADDR, cf.BOB, amount]] for amount in st_amounts]
+
+    # Concurrent clients, one connection each
+    clients = [SigningClient(port=service.port) for _ in range(st_numClients)]
+
+    def getSigData(i):
+        return clients[i % st_numClients].getSigData(
+            cf.keyManager, cf.vault.transferBatch, calls[i]
+        )
+
+    with ThreadPoolExecutor(max_workers=st_numClients) as executor:
+        sigDataList = list(executor.map(getSigData, range(len(calls))))
+
+    # Every request got a different nonce
+    assert sorted(sigData[1] for sigData in sigDataList) == list(
+        range(startNonce, startNonce + len(calls))
+    )
+    assert service.nonces[AGG] == startNonce + len(calls)
+
+    # Same signature as signing in-process with the assigned nonce
+    for sigData, args in zip(sigDataList, calls):
+        assert sigData == AGG_SIGNER_1.getSigDataWithNonces(
+            cf.keyManager, cf.vault.transferBatch, {AGG: sigData[1]}, args
+        )
+
+    # Nonces don't need to be consumed in order
+    iniBalance = cf.BOB.balance()
+    for sigData, args in reversed(list(zip(sigDataList, calls))):
+        cf.vault.transferBatch(sigData, args, {"from": cf.ALICE})
+    assert cf.BOB.balance() == iniBalance + sum(st_amounts)
+
+    stats = clients[0].stats()
+    assert stats["signed"] >= len(calls)
+    assert stats["nonce"] == service.nonces[AGG]
+    assert stats["batches"] <= stats["signed"]
+
+    for client in clients:
+        client.close()
+
+
+def test_signingService_signed_call(cf, service):
+    client = SigningClient(port=service.port)
+    startNonce = service.nonces[AGG]
+
+    tx = signed_call_service(
+        client, cf.keyManager, cf.keyManager.setGovKeyWithAggKey, cf.ALICE, cf.BOB
+    )
+
+    assert tx.events["GovKeySetByAggKey"][0].values() == [cf.GOVERNOR, cf.BOB]
+    assert cf.keyManager.isNonceUsedByAggKey(startNonce)
+    client.close()
+
+
+def test_signingService_rev_request(cf, service):
+    client = SigningClient(port=service.port)
+    startNonce = service.nonces[AGG]
+
+    with pytest.raises(ValueError, match="No signed function"):
+        client.getSigData(cf.keyManager, cf.vault.transferBatch, [], [])
+
+    with pytest.raises(ValueError, match="Unknown method"):
+        client.request({"method": "junk"})
+
+    # Invalid requests don't take a nonce
+    assert service.nonces[AGG] == startNonce
+    assert client.stats()["errors"] == 2
+
+    # A request failing within a batch doesn't leave a gap in the nonces
+    request = {
+        "method": "sign",
+        "keyManager": "0xjunk",
+        "contract": "KeyManager",
+        "address": str(cf.keyManager.address),
+        "function": "setGovKeyWithAggKey",
+        "args": [str(cf.BOB)],
+    }
+    clients = [SigningClient(port=service.port) for _ in range(2)]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        invalid = executor.submit(clients[0].request, request)
+        valid = executor.submit(
+            clients[1].getSigData,
+            cf.keyManager,
+            cf.keyManager.setGovKeyWithAggKey,
+            cf.BOB,
+        )
+        with pytest.raises(ValueError):
+            invalid.result()
+        assert valid.result()[1] == startNonce
+    assert service.nonces[AGG] == startNonce + 1
+
+    for c in clients + [client]:
+        c.close()
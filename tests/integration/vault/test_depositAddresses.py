@@ -0,0 +1,58 @@
+from consts import *
+from utils import *
+from shared_tests import *
+from deposit_addresses import DepositAddresses
+
+
+def test_depositAddresses_matches_getCreate2Addr(cf, token, Deposit):
+    depositAddresses = DepositAddresses(cf.vault.address, Deposit)
+    swapIDs = [0, 1, 2**256 - 1, JUNK_HEX_PAD]
+
+    for tok in [NATIVE_ADDR, token]:
+        addresses = depositAddresses.addresses(swapIDs, tok)
+        assert addresses == [
+            getCreate2Addr(
+                cf.vault.address, cleanHexStrPad(swapID), Deposit, cleanHexStrPad(tok)
+            )
+            for swapID in swapIDs
+        ]
+        for swapID, address in zip(swapIDs, addresses):
+            assert depositAddresses.lookup(address) == (swapID, str(tok))
+            assert depositAddresses.lookup(address.lower()) == (swapID, str(tok))
+            assert depositAddresses.address(swapID, tok) == address
+
+    assert len(depositAddresses) == 2 * len(swapIDs)
+    assert cf.ALICE.address not in depositAddresses
+
+
+def test_depositAddresses_parallel(cf, Deposit):
+    depositAddresses = DepositAddresses(cf.vault.address, Deposit)
+    depositAddresses.MIN_PARALLEL_BATCH = 0
+    swapIDs = range(100)
+
+    assert depositAddresses.addresses(
+        swapIDs, NATIVE_ADDR, processes=4
+    ) == DepositAddresses(cf.vault.address, Deposit).addresses(swapIDs, NATIVE_ADDR)
+    assert len(depositAddresses) == len(swapIDs)
+
+
+def test_depositAddresses_deployed(cf, token, Deposit):
+    depositAddresses = DepositAddresses(cf.vault.address, Deposit)
+    swapIDs = [cleanHexStrPad(0), cleanHexStrPad(1)]
+    addresses = depositAddresses.addresses(swapIDs, token)
+    for address in addresses:
+        token.transfer(address, TEST_AMNT, {"from": cf.SAFEKEEPER})
+
+    tx = signed_call_cf(
+        cf,
+        cf.vault.deployAndFetchBatch,
+        [[swapID, token] for swapID in swapIDs],
+        sender=cf.ALICE,
+    )
+
+    # Attribute the fetches back to their swapIDs through the reverse index
+    assert len(tx.events["Transfer"]) == len(swapIDs)
+    for event, swapID in zip(tx.events["Transfer"], swapIDs):
+        assert depositAddresses.lookup(event["from"]) == (swapID, str(token))
+        assert event["to"] == cf.vault.address
+    assert token.balanceOf(cf.vault) == TEST_AMNT * len(swapIDs)
@@ -0,0 +1,153 @@
+import keyword
+from collections import namedtuple
+from functools import lru_cache
+from eth_abi.decoding import TupleDecoder, ContextFramesBytesIO
+from eth_abi.grammar import parse, TupleType
+from eth_abi.registry import registry
+from eth_hash.auto import keccak
+from eth_utils import to_checksum_address
+from eth_utils.abi import collapse_if_tuple
+from artifact_registry import artifactRegistry
+
+# Decoders for raw logs built once per event from the build artifacts. Same values as
+# web3's get_event_data, but reading the topics and data straight from bytes into a
+# namedtuple per event (args in ABI order followed by LOG_FIELDS) instead of parsing the
+# ABI and building AttributeDicts for every log.
+
+# Contracts whose events are decoded by default. Their ABIs include the inherited events.
+CHAINFLIP_EVENT_SOURCES = ["IVault", "IStateChainGateway", "IKeyManager", "IFLIP"]
+
+LOG_FIELDS = ("address", "blockNumber", "transactionHash", "logIndex")
+
+# Holders and senders repeat a lot across logs, so it's worth caching the checksum
+checksum_address = lru_cache(maxsize=2**16)(to_checksum_address)
+
+
+# Decoder of a 32-byte word for the static types that fit in one, None otherwise
+def word_decoder(type_str):
+    if type_str == "address":
+        return lambda word: checksum_address(word[12:])
+    if type_str == "bool":
+        return lambda word: word[31] != 0
+    if type_str.startswith("uint") and type_str[4:].isdigit():
+        return lambda word: int.from_bytes(word, "big")
+    if type_str.startswith("int") and type_str[3:].isdigit():
+        return lambda word: int.from_bytes(word, "big", signed=True)
+    if type_str.startswith("bytes") and type_str[5:].isdigit():
+        size = int(type_str[5:])
+        return lambda word: word[:size]
+    return None
+
+
+# Addresses from the eth_abi decoders are lowercase, web3 returns them checksummed
+def checksum_addresses(abi_type, value):
+    if abi_type.is_array:
+        return [checksum_addresses(abi_type.item_type, item) for item in value]
+    if isinstance(abi_type, TupleType):
+        return tuple(
+            checksum_addresses(component, item)
+            for component, item in zip(abi_type.components, value)
+        )
+    if abi_type.base == "address":
+        return checksum_address(value)
+    return value
+
+
+def field_name(name, index, used):
+    name = name or f"arg{index}"
+    while keyword.iskeyword(name) or name in used:
+        name += "_"
+    return name
+
+
+class EventDecoder:
+    def __init__(self, abi):
+        self.name = abi["name"]
+        types = [collapse_if_tuple(input) for input in abi["inputs"]]
+        self.topic0 = keccak(f"{self.name}({','.join(types)})".encode())
+
+        fields = []
+        for i, input in enumerate(abi["inputs"]):
+            fields.append(field_name(input["name"], i, fields + list(LOG_FIELDS)))
+        self.Event = namedtuple(self.name, fields + list(LOG_FIELDS))
+
+        # (position in the args, decoder) of each indexed input, in topic order. Indexed
+        # dynamic types are hashed in the topic, which is returned as is.
+        self.indexed = [
+            (i, word_decoder(types[i]) or bytes)
+            for i, input in enumerate(abi["inputs"])
+            if input["indexed"]
+        ]
+        self.positions = [
+            i for i, input in enumerate(abi["inputs"]) if not input["indexed"]
+        ]
+        dataTypes = [types[i] for i in self.positions]
+
+        # Data with only single word static types is sliced, anything else goes through the
+        # eth_abi decoders (resolved here once)
+        self.words = [word_decoder(t) for t in dataTypes]
+        if None in self.words:
+            self.words = None
+            self.tupleDecoder = TupleDecoder(
+                decoders=[registry.get_decoder(t) for t in dataTypes]
+            )
+            self.dataTypes = [parse(t) if "address" in t else None for t in dataTypes]
+
+    def decode(self, log):
+        values = [None] * (len(self.indexed) + len(self.positions))
+
+        topics = log["topics"]
+        for (i, decoder), topic in zip(self.indexed, topics[1:]):
+            values[i] = decoder(bytes(topic))
+
+        data = log["data"]
+        if isinstance(data, str):
+            data = bytes.fromhex(data[2:] if data[:2] == "0x" else data)
+        if self.words is not None:
+            for j, (i, decoder) in enumerate(zip(self.positions, self.words)):
+                values[i] = decoder(data[32 * j : 32 * j + 32])
+        else:
+            for i, abi_type, value in zip(
+                self.positions,
+                self.dataTypes,
+                self.tupleDecoder(ContextFramesBytesIO(data)),
+            ):
+                values[i] = (
+                    value if abi_type is None else checksum_addresses(abi_type, value)
+                )
+
+        return self.Event(
+            *values,
+            log["address"],
+            log["blockNumber"],
+            log["transactionHash"],
+            log["logIndex"],
+        )
+
+
+# All the event decoders of a set of contracts, indexed by topic0
+class LogDecoders:
+    def __init__(self, abis):
+        self.decoders = {}
+        for abi in abis:
+            for entry in abi:
+                if entry["type"] == "event" and not entry.get("anonymous"):
+                    decoder = EventDecoder(entry)
+                    self.decoders.setdefault(decoder.topic0, decoder)
+        self.byName = {decoder.name: decoder for decoder in self.decoders.values()}
+
+    @classmethod
+    def from_artifacts(cls, contract_names=CHAINFLIP_EVENT_SOURCES):
+        return cls([artifactRegistry.abi(name) for name in contract_names])
+
+    def __getitem__(self, name):
+        return self.byName[name]
+
+    # Decoded log, or None if the event is unknown
+    def decode(self, log):
+        topics = log["topics"]
+        decoder = self.decoders.get(bytes(topics[0])) if topics else None
+        return decoder.decode(log) if decoder else None
+
+    def decode_many(self, logs):
+        return [self.decode(log) for log in logs]
@@ -0,0 +1,113 @@
+import queue
+import threading
+
+# Streaming pipeline where each stage runs in its own thread as soon as an item arrives
+# from the previous one. Stages are connected by bounded queues, so a slow stage blocks the
+# ones before it instead of everything being buffered in memory. Items are meant to be
+# chunks (e.g. the logs of a block range) so the threading overhead is paid per chunk.
+#
+#   state = (
+#       Pipeline(scan_logs(event, fromBlock, toBlock))
+#       .map(decoders.decode_many)
+#       .map(lambda events: [e for e in events if e.value != 0])
+#       .fold(foldTransfers, initialState)
+#   )
+
+_END = object()
+
+
+class _Error:
+    def __init__(self, exception):
+        self.exception = exception
+
+
+class Pipeline:
+    def __init__(self, source, maxsize=4):
+        self.maxsize = maxsize
+        self.stop = threading.Event()
+        self.threads = []
+        self.queue = self._start(lambda put: self._drain(iter(source), put))
+
+    # Run fn in a thread that puts its items into a new bounded queue
+    def _start(self, fn):
+        out = queue.Queue(self.maxsize)
+
+        def put(item):
+            # Give up if the consumer has stopped, otherwise we would block forever
+            while not self.stop.is_set():
+                try:
+                    out.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def run():
+            try:
+                fn(put)
+                put(_END)
+            except Exception as e:
+                put(_Error(e))
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        return out
+
+    def _drain(self, items, put):
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        finally:
+            if hasattr(items, "close"):
+                items.close()
+
+    def _items(self, q):
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if self.stop.is_set():
+                    return
+                continue
+            if item is _END:
+                return
+            if isinstance(item, _Error):
+                raise item.exception
+            yield item
+
+    # Apply fn to every item in a new stage
+    def map(self, fn):
+        upstream = self.queue
+        self.queue = self._start(
+            lambda put: self._drain((fn(item) for item in self._items(upstream)), put)
+        )
+        return self
+
+    # Keep the items for which fn is true in a new stage
+    def filter(self, fn):
+        upstream = self.queue
+        self.queue = self._start(
+            lambda put: self._drain(
+                (item for item in self._items(upstream) if fn(item)), put
+            )
+        )
+        return self
+
+    def __iter__(self):
+        try:
+            yield from self._items(self.queue)
+        finally:
+            self.close()
+
+    # Consume the pipeline in the calling thread, state = fn(state, item) for every item
+    def fold(self, fn, state):
+        for item in self:
+            state = fn(state, item)
+        return state
+
+    def close(self):
+        self.stop.set()
+        for thread in self.threads:
+            thread.join()
@@ -0,0 +1,86 @@
+# Joins the amounts each holder should have received (e.g. from a snapshot) against the
+# transfers actually made (e.g. the airdrop Transfer events) with hash maps, so it's linear in
+# the number of rows. Recipients are used as dict keys, so they should be converted once to
+# a hashable canonical form first (e.g. Address) for the two sides to match.
+class Reconciliation:
+    def __init__(self, expected, transfers, requiredMinAmount=0):
+        self.expected = {}
+        for (holder, amount) in expected:
+            self.expected[holder] = int(amount)
+
+        # First amount received by each recipient, later ones are duplicates
+        self.received = {}
+        duplicates = {}
+        for (recipient, amount) in transfers:
+            amount = int(amount)
+            if recipient in self.received:
+                duplicates.setdefault(recipient, [self.received[recipient]]).append(
+                    amount
+                )
+            else:
+                self.received[recipient] = amount
+
+        # Holders expected to receive at least requiredMinAmount that received nothing
+        self.missing = [
+            (holder, amount)
+            for holder, amount in self.expected.items()
+            if amount >= requiredMinAmount and holder not in self.received
+        ]
+        # Recipients that received more than one transfer, with all the amounts
+        self.duplicated = list(duplicates.items())
+        # (recipient, expected, received) of the first transfer of every expected recipient
+        self.wrongAmount = []
+        # Recipients that weren't expected to receive anything
+        self.unexpected = []
+        self.matched = 0
+        for recipient, amount in self.received.items():
+            expectedAmount = self.expected.get(recipient)
+            if expectedAmount is None:
+                self.unexpected.append((recipient, amount))
+            elif expectedAmount != amount:
+                self.wrongAmount.append((recipient, expectedAmount, amount))
+            else:
+                self.matched += 1
+
+    @property
+    def ok(self):
+        return not (
+            self.missing or self.duplicated or self.wrongAmount or self.unexpected
+        )
+
+    def summary(self):
+        return {
+            "expected": len(self.expected),
+            "received": len(self.received),
+            "matched": self.matched,
+            "missing": len(self.missing),
+            "duplicated": len(self.duplicated),
+            "wrongAmount": len(self.wrongAmount),
+            "unexpected": len(self.unexpected),
+        }
+
+    # Full diff, with amounts as strings so it can be dumped as JSON
+    def report(self):
+        return {
+            "summary": self.summary(),
+            "missing": [
+                {"recipient": str(holder), "expected": str(amount)}
+                for (holder, amount) in self.missing
+            ],
+            "duplicated": [
+                {"recipient": str(recipient), "received": [str(a) for a in amounts]}
+                for (recipient, amounts) in self.duplicated
+            ],
+            "wrongAmount": [
+                {
+                    "recipient": str(recipient),
+                    "expected": str(expected),
+                    "received": str(received),
+                }
+                for (recipient, expected, received) in self.wrongAmount
+            ],
+            "unexpected": [
+                {"recipient": str(recipient), "received": str(amount)}
+                for (recipient, amount) in self.unexpected
+            ],
+        }
@@ -0,0 +1,171 @@
+import itertools
+import threading
+import requests
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from brownie import web3
+
+# Calls per JSON-RPC batch. Some providers limit it (e.g. Alchemy to 1000 and hardhat has
+# no limit) and large batches take longer to be answered.
+RPC_BATCH_SIZE = 100
+# Batches in flight at once, each over its own persistent connection
+RPC_POOL_SIZE = 4
+
+
+class RpcError(Exception):
+    def __init__(self, error):
+        super().__init__(error.get("message", error))
+        self.error = error
+
+
+# Queues JSON-RPC calls and sends them as batch arrays, each call getting a Future of its
+# result. A batch is sent when batchSize calls are queued and on flush. Use as a context
+# manager to flush on exit:
+#
+#   with RpcBatchClient() as client:
+#       balances = [client.getBalance(address) for address in addresses]
+#   balances = [balance.result() for balance in balances]
+#
+# Providers not over HTTP (e.g. IPC) get the calls one by one through web3.
+class RpcBatchClient:
+    def __init__(self, endpoint_uri=None, batchSize=None, poolSize=None):
+        if endpoint_uri is None:
+            endpoint_uri = getattr(web3.provider, "endpoint_uri", None)
+        self.endpoint_uri = str(endpoint_uri) if endpoint_uri is not None else None
+        self.batchSize = batchSize or RPC_BATCH_SIZE
+        poolSize = poolSize or RPC_POOL_SIZE
+        self.ids = itertools.count()
+        self.lock = threading.Lock()
+        self.pending = []
+        self.inFlight = []
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=poolSize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=poolSize)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # Send the queued calls and wait for all the batches to be answered
+    def flush(self):
+        with self.lock:
+            batch = self.pending
+            self.pending = []
+            inFlight = self.inFlight
+            self.inFlight = []
+        if batch:
+            self._send(batch)
+        for sent in inFlight:
+            sent.result()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.executor.shutdown()
+            self.session.close()
+
+    # Future of the result of a call
+    def request(self, method, params):
+        future = Future()
+        call = {
+            "jsonrpc": "2.0",
+            "id": next(self.ids),
+            "method": method,
+            "params": params,
+        }
+        with self.lock:
+            self.pending.append((call, future))
+            if len(self.pending) < self.batchSize:
+                return future
+            batch = self.pending
+            self.pending = []
+            self.inFlight.append(self.executor.submit(self._send, batch))
+        return future
+
+    def _send(self, batch):
+        try:
+            responses = self._post([call for (call, _) in batch])
+        except Exception as e:
+            for (_, future) in batch:
+                future.set_exception(e)
+            return
+        byId = {response.get("id"): response for response in responses}
+        for (call, future) in batch:
+            response = byId.get(call["id"])
+            if response is None:
+                future.set_exception(RpcError({"message": "No response"}))
+            elif "error" in response:
+                future.set_exception(RpcError(response["error"]))
+            else:
+                future.set_result(response["result"])
+
+    def _post(self, calls):
+        if self.endpoint_uri is None or not self.endpoint_uri.startswith("http"):
+            # The provider numbers requests itself, so its ids are replaced with ours
+            return [
+                {
+                    **web3.provider.make_request(call["method"], call["params"]),
+                    "id": call["id"],
+                }
+                for call in calls
+            ]
+        response = self.session.post(self.endpoint_uri, json=calls)
+        response.raise_for_status()
+        responses = response.json()
+        # A whole batch can be rejected with a single error
+        if isinstance(responses, dict):
+            raise RpcError(responses.get("error", responses))
+        return responses
+
+    # Future of the result after applying fn to it
+    def then(self, future, fn):
+        mapped = Future()
+
+        def done(f):
+            try:
+                mapped.set_result(fn(f.result()))
+            except Exception as e:
+                mapped.set_exception(e)
+
+        future.add_done_callback(done)
+        return mapped
+
+    def getBalance(self, address, block="latest"):
+        return self.then(
+            self.request("eth_getBalance", [str(address), _block(block)]),
+            lambda result: int(result, 16),
+        )
+
+    def getBlock(self, blockNumber, fullTransactions=False):
+        return self.request(
+            "eth_getBlockByNumber", [_block(blockNumber), fullTransactions]
+        )
+
+    def getTransactionReceipt(self, txHash):
+        return self.request("eth_getTransactionReceipt", [str(txHash)])
+
+    # Future of the decoded output of a brownie contract call, e.g.
+    # client.call(cf.flip.balanceOf, cf.ALICE, block=blockNumber)
+    def call(self, contractCall, *args, block="latest"):
+        return self.then(
+            self.request(
+                "eth_call",
+                [
+                    {
+                        "to": contractCall._address,
+                        "data": contractCall.encode_input(*args),
+                    },
+                    _block(block),
+                ],
+            ),
+            contractCall.decode_output,
+        )
+
+
+def _block(block):
+    return hex(block) if isinstance(block, int) else block
@@ -0,0 +1,88 @@
+import json
+import sqlite3
+import time
+
+# Append-only journal of a script run, to resume it after a crash or a rerun. Each entry is
+# a (kind, key, value) with a JSON value, e.g. ("phase", "snapshot", {...}),
+# ("address", "MultiSend", "0x..."), ("tx", txid, {"nonce": ...}) or ("receipt", txid, {...}).
+# Entries are never updated, the latest one of a (kind, key) is the current value, looked up
+# through an index instead of scanning the whole journal.
+class RunJournal:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT, key TEXT, value TEXT, timestamp REAL
+            );
+            CREATE INDEX IF NOT EXISTS entries_kind_key ON entries (kind, key, id);
+            """
+        )
+
+    def close(self):
+        self.db.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def append(self, kind, key, value=None):
+        with self.db:
+            self.db.execute(
+                "INSERT INTO entries (kind, key, value, timestamp) VALUES (?, ?, ?, ?)",
+                (kind, str(key), json.dumps(value), time.time()),
+            )
+
+    # Latest value of (kind, key), default if there is none
+    def get(self, kind, key, default=None):
+        row = self.db.execute(
+            "SELECT value FROM entries WHERE kind=? AND key=? ORDER BY id DESC LIMIT 1",
+            (kind, str(key)),
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def has(self, kind, key):
+        return (
+            self.db.execute(
+                "SELECT 1 FROM entries WHERE kind=? AND key=? LIMIT 1", (kind, str(key))
+            ).fetchone()
+            is not None
+        )
+
+    # {key: latest value} of a kind, in the order the keys were first added
+    def all(self, kind):
+        values = {}
+        for (key, value) in self.db.execute(
+            "SELECT key, value FROM entries WHERE kind=? ORDER BY id", (kind,)
+        ):
+            values[key] = json.loads(value)
+        return values
+
+    # Phases of the run, e.g. "snapshot" once it's been taken
+    def completePhase(self, phase, **data):
+        self.append("phase", phase, data)
+
+    def isPhaseComplete(self, phase):
+        return self.has("phase", phase)
+
+    def setAddress(self, name, address):
+        self.append("address", name, str(address))
+
+    def getAddress(self, name):
+        return self.get("address", name)
+
+    # Sent transactions and their receipts
+    def recordTx(self, txid, **data):
+        self.append("tx", txid, data)
+
+    def recordReceipt(self, txid, **data):
+        self.append("receipt", txid, data)
+
+    # {txid: data} of the transactions sent without a receipt recorded, in the order sent
+    def pendingTxs(self):
+        rows = self.db.execute(
+            "SELECT key, value FROM entries AS tx WHERE kind='tx' AND NOT EXISTS"
+            " (SELECT 1 FROM entries WHERE kind='receipt' AND key=tx.key) ORDER BY id"
+        )
+        return {key: json.loads(value) for (key, value) in rows}
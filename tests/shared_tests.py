@@ -1,4 +1,6 @@
+import os
 from consts import *
+from signing_client import SigningClient
 from brownie import web3
 
 from utils import *
@@ -259,6 +261,32 @@ def signed_call(keyManager, fcn, signer, sender, *args):
     )
 
 
+# Same as signed_call but signing through the local signing service, which assigns the nonce
+def signed_call_service(client, keyManager, fcn, sender, *args):
+    sigData = client.getSigData(keyManager, fcn, *args)
+
+    return fcn(
+        sigData,
+        *args,
+        {"from": sender},
+    )
+
+
+# Agg key signed call for scripts. With SIGNING_SERVICE set it signs through the local
+# signing service, so several scripts can run in parallel. Otherwise it syncs the nonce and
+# signs in-process with AGG_SIGNER_1, assuming the AGG_KEY is the default one.
+def signed_call_agg(keyManager, fcn, sender, *args):
+    if os.environ.get("SIGNING_SERVICE"):
+        client = SigningClient()
+        try:
+            return signed_call_service(client, keyManager, fcn, sender, *args)
+        finally:
+            client.close()
+
+    syncNonce(keyManager)
+    return signed_call(keyManager, fcn, AGG_SIGNER_1, sender, *args)
+
+
 # Assumption that all the parameters are the same length. Craft the TransferParams array.
 def craftTransferParamsArray(tokens, recipients, amounts):
     length = len(tokens)
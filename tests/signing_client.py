@@ -0,0 +1,62 @@
+import json
+import os
+import socket
+
+# Client for the local signing service (see signing_service.py). Only uses the standard
+# library so scripts can get Agg key signatures without importing umbral or py_ecc.
+
+SIGNING_SERVICE_HOST = os.environ.get("SIGNING_SERVICE_HOST") or "127.0.0.1"
+SIGNING_SERVICE_PORT = int(os.environ.get("SIGNING_SERVICE_PORT") or 8555)
+
+
+class SigningClient:
+    def __init__(self, host=SIGNING_SERVICE_HOST, port=SIGNING_SERVICE_PORT):
+        self.sock = socket.create_connection((host, port))
+        self.file = self.sock.makefile("rwb")
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def request(self, request):
+        self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        response = json.loads(self.file.readline())
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response
+
+    def stats(self):
+        return self.request({"method": "stats"})
+
+    # Same as Signer.getSigDataWithNonces but the nonce is assigned by the service.
+    # fcn is a brownie ContractTx, e.g. cf.vault.transferBatch
+    def getSigData(self, keyManager, fcn, *args, chainId=None):
+        [contract, function] = fcn._name.split(".")
+        request = {
+            "method": "sign",
+            "keyManager": str(keyManager.address),
+            "contract": contract,
+            "address": str(fcn._address),
+            "function": function,
+            "args": to_json(args),
+        }
+        if chainId is not None:
+            request["chainId"] = chainId
+        return self.request(request)["sigData"]
+
+
+# Convert brownie accounts/contracts, bytes and tuples to something JSON serializable.
+# Brownie's format_input in the service converts them back according to the ABI.
+def to_json(arg):
+    if hasattr(arg, "address"):
+        return str(arg.address)
+    if isinstance(arg, bool):
+        return arg
+    if isinstance(arg, (bytes, bytearray)):
+        return "0x" + bytes(arg).hex()
+    if isinstance(arg, (list, tuple)):
+        return [to_json(a) for a in arg]
+    if isinstance(arg, int):
+        return int(arg)
+    return str(arg)
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import time
+from crypto import *
+from artifact_registry import artifactRegistry
+
+# Local signing service. Holds the Agg key and the nonce counter so that several scripts
+# can request signatures in parallel without colliding on nonces. Clients connect over
+# TCP to 127.0.0.1 and exchange newline-delimited JSON (see signing_client.py).
+#
+# Requests:
+#   {"method": "sign", "keyManager": address, "contract": name, "address": address,
+#    "function": name, "args": [...], "chainId": int (optional)}
+#       -> {"sigData": [s, nonce, nonceTimesGeneratorAddress]}
+#   {"method": "stats"} -> counters (see SigningService.stats)
+# Errors are returned as {"error": message}.
+#
+# Concurrent sign requests are queued and signed together: each batch takes consecutive
+# nonces and its k*G are computed at once by Signer.sign_many.
+
+SIGNING_SERVICE_HOST = "127.0.0.1"
+SIGNING_SERVICE_PORT = 8555
+
+
+# Minimal stand-in for a brownie ContractTx built from the compiled artifacts, with the
+# attributes that Signer.generate_contractMsgHash needs.
+class ArtifactFunction:
+    def __init__(self, address, abi):
+        self._address = address
+        self.abi = abi
+        types = ",".join(get_type_strings(abi["inputs"]))
+        self.signature = web3.toHex(web3.keccak(text=f"{abi['name']}({types})")[:4])
+
+
+class SigningService:
+    def __init__(self, signer, nonce, maxBatchSize=64, batchWait=0.005):
+        self.signer = signer
+        # Only ever modified by the batching task, so no nonce is handed out twice
+        self.nonces = {AGG: nonce}
+        self.maxBatchSize = maxBatchSize
+        self.batchWait = batchWait
+
+        self.queue = None
+        self.server = None
+        self.abis = {}
+        self.startTime = time.time()
+        self.counters = {
+            "requests": 0,
+            "signed": 0,
+            "errors": 0,
+            "batches": 0,
+            "latencyTotal": 0.0,
+            "latencyMax": 0.0,
+        }
+
+    async def start(self, host=SIGNING_SERVICE_HOST, port=SIGNING_SERVICE_PORT):
+        self.queue = asyncio.Queue()
+        self.batcher = asyncio.create_task(self._batch_loop())
+        self.server = await asyncio.start_server(self._handle_client, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher.cancel()
+
+    def stats(self):
+        uptime = time.time() - self.startTime
+        signed = self.counters["signed"]
+        return {
+            **self.counters,
+            "nonce": self.nonces[AGG],
+            "uptime": uptime,
+            "throughput": signed / uptime if uptime > 0 else 0.0,
+            "latencyAvg": self.counters["latencyTotal"] / signed if signed else 0.0,
+        }
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._handle_request(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, line):
+        self.counters["requests"] += 1
+        try:
+            request = json.loads(line)
+            method = request.get("method")
+            if method == "stats":
+                return self.stats()
+            elif method == "sign":
+                # Hash before queueing so that invalid requests never take a nonce
+                contractMsgHash = self._contractMsgHash(request)
+                future = asyncio.get_running_loop().create_future()
+                await self.queue.put(
+                    (time.perf_counter(), request, contractMsgHash, future)
+                )
+                return {"sigData": await future}
+            else:
+                raise ValueError(f"Unknown method {method}")
+        except Exception as e:
+            self.counters["errors"] += 1
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    def _contractMsgHash(self, request):
+        fcn = ArtifactFunction(
+            request["address"],
+            self._function_abi(
+                request["contract"], request["function"], len(request["args"])
+            ),
+        )
+        return Signer.generate_contractMsgHash(fcn, *request["args"])
+
+    # ABI of a signed function, the first input being sigData
+    def _function_abi(self, contract, function, numArgs):
+        key = (contract, function, numArgs)
+        if key not in self.abis:
+            matches = [
+                entry
+                for entry in artifactRegistry.abi(contract)
+                if entry.get("type") == "function"
+                and entry["name"] == function
+                and len(entry["inputs"]) == numArgs + 1
+            ]
+            if len(matches) != 1:
+                raise ValueError(
+                    f"No signed function {contract}.{function} with {numArgs} args"
+                )
+            self.abis[key] = matches[0]
+        return self.abis[key]
+
+    async def _batch_loop(self):
+        while True:
+            batch = [await self.queue.get()]
+            # Give concurrent requests a chance to join the batch
+            await asyncio.sleep(self.batchWait)
+            while len(batch) < self.maxBatchSize and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            # Nonces are only handed out once the batch is signed, so a request that fails
+            # doesn't leave a gap in the nonces consumed by the KeyManager
+            startNonce = self.nonces[AGG]
+            self.counters["batches"] += 1
+
+            signable = []
+            msgHashes = []
+            for entry in batch:
+                (_, request, contractMsgHash, future) = entry
+                try:
+                    msgHashes.append(
+                        Signer.generate_msgHash(
+                            contractMsgHash,
+                            {AGG: startNonce + len(signable)},
+                            request["keyManager"],
+                            request["address"],
+                            chainId=request["chainId"]
+                            if "chainId" in request
+                            else chain.id,
+                        )
+                    )
+                    signable.append(entry)
+                except Exception as e:
+                    future.set_exception(e)
+            if not signable:
+                continue
+
+            try:
+                # Keep the event loop responsive while the EC work is done
+                sigs = await asyncio.get_running_loop().run_in_executor(
+                    None, self.signer.sign_many, msgHashes
+                )
+            except Exception as e:
+                for (_, _, _, future) in signable:
+                    future.set_exception(e)
+                continue
+            self.nonces[AGG] += len(signable)
+
+            now = time.perf_counter()
+            for i, (
+                (queuedAt, _, _, future),
+                [s, nonceTimesGeneratorAddress],
+            ) in enumerate(zip(signable, sigs)):
+                latency = now - queuedAt
+                self.counters["signed"] += 1
+                self.counters["latencyTotal"] += latency
+                self.counters["latencyMax"] = max(self.counters["latencyMax"], latency)
+                future.set_result([s, startNonce + i, nonceTimesGeneratorAddress])
@@ -4,6 +4,7 @@ from brownie import reverts, chain, web3
 from brownie.test import strategy, contract_strategy
 from brownie.convert import to_bytes
 from utils import *
+from deposit_addresses import DepositAddresses
 from hypothesis import strategies as hypStrat
 from random import choice, choices
 import time
@@ -120,33 +121,11 @@ def test_all(
                     {"from": a[0]},
                 )
 
-            cls.create2EthAddrs = [
-                getCreate2Addr(
-                    cls.v.address,
-                    cleanHexStrPad(swapID),
-                    Deposit,
-                    cleanHexStrPad(NATIVE_ADDR),
-                )
-                for swapID in range(0, MAX_SWAPID + 1)
-            ]
-            cls.create2TokenAAddrs = [
-                getCreate2Addr(
-                    cls.v.address,
-                    cleanHexStrPad(swapID),
-                    Deposit,
-                    cleanHexStrPad(cls.tokenA.address),
-                )
-                for swapID in range(0, MAX_SWAPID + 1)
-            ]
-            cls.create2TokenBAddrs = [
-                getCreate2Addr(
-                    cls.v.address,
-                    cleanHexStrPad(swapID),
-                    Deposit,
-                    cleanHexStrPad(cls.tokenB.address),
-                )
-                for swapID in range(0, MAX_SWAPID + 1)
-            ]
+            depositAddresses = DepositAddresses(cls.v.address, Deposit)
+            swapIDs = range(0, MAX_SWAPID + 1)
+            cls.create2EthAddrs = depositAddresses.addresses(swapIDs, NATIVE_ADDR)
+            cls.create2TokenAAddrs = depositAddresses.addresses(swapIDs, cls.tokenA)
+            cls.create2TokenBAddrs = depositAddresses.addresses(swapIDs, cls.tokenB)
 
             cls.funders = a[:MAX_NUM_SENDERS]
 
@@ -238,7 +217,7 @@ def test_all(
             self.lastValidateTime = self.deployerContract.tx.timestamp
             self.keyIDToCurKeys = {AGG: AGG_SIGNER_1}
             self.allKeys = [*self.keyIDToCurKeys.values()] + (
-                [Signer.gen_signer(None, {})]
+                [KEY_POOL.signer(None, {})]
                 * (TOTAL_KEYS - len(self.keyIDToCurKeys.values()))
             )
 
@@ -34,7 +34,7 @@ def test_keyManager(BaseStateMachine, state_machine, a, cfDeploy):
             self.lastValidateTime = self.deployerContract.tx.timestamp
             self.keyIDToCurKeys = {AGG: AGG_SIGNER_1}
             self.allKeys = [*self.keyIDToCurKeys.values()] + (
-                [Signer.gen_signer(None, {})]
+                [KEY_POOL.signer(None, {})]
                 * (TOTAL_KEYS - len(self.keyIDToCurKeys.values()))
             )
             self.numTxsTested = 0
@@ -98,10 +98,10 @@ def test_stateChainGateway(BaseStateMachine, state_machine, a, cfDeploy):
         st_minFunding = strategy("uint", max_value=int(INIT_FUNDING / 2))
         # So there's a 1% chance of a bad sig to maximise useful txs
         st_signer_agg = hypStrat.sampled_from(
-            ([AGG_SIGNER_1] * 99) + [Signer.gen_signer(None, {})]
+            ([AGG_SIGNER_1] * 99) + [KEY_POOL.signer(None, {})]
         )
         st_signer_gov = hypStrat.sampled_from(
-            [AGG_SIGNER_1] + ([Signer.gen_signer(None, {})] * 99)
+            [AGG_SIGNER_1] + ([KEY_POOL.signer(None, {})] * 99)
         )
 
         # Funds a random amount from a random funder to a random nodeID
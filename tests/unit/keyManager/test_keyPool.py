@@ -0,0 +1,44 @@
+from consts import *
+from shared_tests import *
+
+
+def test_keyPool(tmp_path):
+    path = str(tmp_path / "keyPool.bin")
+    keyPool = KeyPool(path, 8)
+
+    signers = keyPool.signers(10, AGG, nonces)
+
+    # Extended once it runs out of keys
+    assert len(keyPool.records) == 16
+    assert os.path.getsize(path) == 16 * KeyPool.RECORD_SIZE
+    assert len({signer.privKeyHex for signer in signers}) == 10
+
+    # Same data as deriving it from the private key
+    for signer in signers:
+        derivedSigner = Signer(signer.privKeyHex, AGG, nonces)
+        assert signer.getPubData() == derivedSigner.getPubData()
+        assert signer.pubKeyXHex == derivedSigner.pubKeyXHex
+        assert signer.pubKeyYParHex == derivedSigner.pubKeyYParHex
+        assert signer.pubKeyXInt < Signer.HALF_Q_INT
+
+    # Reloading the file hands out the same keys
+    reloadedSigners = KeyPool(path, 8).signers(16, AGG, nonces)
+    assert [signer.privKeyHex for signer in reloadedSigners[:10]] == [
+        signer.privKeyHex for signer in signers
+    ]
+
+
+def test_keyPool_setAggKey(cf):
+    newSigner = KEY_POOL.signer(AGG, nonces)
+
+    signed_call_cf(cf, cf.keyManager.setAggKeyWithAggKey, newSigner.getPubData())
+    assert cf.keyManager.getAggregateKey() == newSigner.getPubDataWith0x()
+
+    # The new key can sign
+    signed_call_cf(
+        cf,
+        cf.keyManager.setAggKeyWithAggKey,
+        AGG_SIGNER_1.getPubData(),
+        signer=newSigner,
+    )
+    assert cf.keyManager.getAggregateKey() == AGG_SIGNER_1.getPubDataWith0x()
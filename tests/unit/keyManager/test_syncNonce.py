@@ -0,0 +1,57 @@
+from consts import *
+from brownie.test import given, strategy
+
+
+@given(
+    st_numSigs=strategy("uint", min_value=1, max_value=20),
+    st_sender=strategy("address"),
+)
+def test_syncNonce(cf, st_numSigs, st_sender):
+    startNonce = nonces[AGG]
+
+    for _ in range(st_numSigs):
+        sigData = AGG_SIGNER_1.generate_sigData(
+            Signer.generate_msgHash(JUNK_HEX, nonces, cf.keyManager.address, st_sender),
+            nonces,
+        )
+        cf.keyManager.consumeKeyNonce(sigData, JUNK_HEX, {"from": st_sender})
+
+    assert syncNonceLinear(cf.keyManager, startNonce) == nonces[AGG]
+    assert syncNonceSearch(cf.keyManager, startNonce, 1) == nonces[AGG]
+    assert syncNonceSearch(cf.keyManager, startNonce, 4) == nonces[AGG]
+    assert syncNonceLogs(cf.keyManager, startNonce) == nonces[AGG]
+
+    # Already synched
+    assert syncNonceSearch(cf.keyManager, nonces[AGG]) == nonces[AGG]
+
+    nonces[AGG] = startNonce
+    for mode in ["linear", "search", "logs"]:
+        assert syncNonce(cf.keyManager, mode)[AGG] == startNonce + st_numSigs
+
+
+# Only isNonceUsedByAggKey is needed by the search, so check it against large
+# ranges of used nonces without having to sign them
+class UsedNonces:
+    def __init__(self, numUsed):
+        self.numUsed = numUsed
+        self.numCalls = 0
+
+    def isNonceUsedByAggKey(self, nonce):
+        self.numCalls += 1
+        return nonce < self.numUsed
+
+
+@given(
+    st_numUsed=strategy("uint", max_value=10**6),
+    st_startNonce=strategy("uint", max_value=10**3),
+    st_batchSize=strategy("uint", min_value=1, max_value=16),
+)
+def test_syncNonceSearch_large(st_numUsed, st_startNonce, st_batchSize):
+    keyManager = UsedNonces(st_numUsed)
+
+    # Not a deployed contract, so there's nothing to send in an RPC batch
+    assert syncNonceSearch(
+        keyManager, st_startNonce, st_batchSize, rpcBatch=False
+    ) == max(st_numUsed, st_startNonce)
+    # Logarithmic number of calls
+    assert keyManager.numCalls <= 1 + 2 * st_batchSize * (st_numUsed.bit_length() + 1)
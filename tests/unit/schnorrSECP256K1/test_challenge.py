@@ -0,0 +1,70 @@
+from consts import *
+from eth_abi import encode_abi
+from brownie.test import given, strategy
+
+
+@given(
+    st_contractMsgHash=strategy("bytes32"),
+    st_nonce=strategy("uint256"),
+    st_nonceConsumer=strategy("address"),
+    st_keyManager=strategy("address"),
+    st_chainId=strategy("uint256"),
+)
+def test_generate_msgHash(
+    st_contractMsgHash, st_nonce, st_nonceConsumer, st_keyManager, st_chainId
+):
+    msgHash = Signer.generate_msgHash(
+        st_contractMsgHash,
+        {AGG: st_nonce},
+        st_keyManager,
+        st_nonceConsumer,
+        chainId=st_chainId,
+    )
+
+    # Reference abi.encode
+    assert msgHash == cleanHexStr(
+        web3.keccak(
+            encode_abi(
+                ["bytes32", "uint256", "address", "uint256", "address"],
+                [
+                    st_contractMsgHash,
+                    st_nonce,
+                    str(st_nonceConsumer),
+                    st_chainId,
+                    str(st_keyManager),
+                ],
+            )
+        )
+    )
+    # Hex string inputs
+    assert msgHash == Signer.generate_msgHash(
+        cleanHexStr(st_contractMsgHash),
+        {AGG: st_nonce},
+        str(st_keyManager),
+        str(st_nonceConsumer),
+        chainId=st_chainId,
+    )
+
+
+@given(st_msgHash=strategy("bytes32"))
+def test_sign_challenge(st_msgHash):
+    msgHashHex = cleanHexStr(st_msgHash)
+    [s, nonceTimesGeneratorAddress] = AGG_SIGNER_1.sign(msgHashHex)
+
+    # Reference hex string construction of k*G's address and the challenge
+    k = int(web3.keccak(hexstr=msgHashHex).hex(), 16)
+    kTimesG = secp256k1.multiply(secp256k1.G, k)
+    k256 = web3.keccak(kTimesG[0].to_bytes(32, "big") + kTimesG[1].to_bytes(32, "big"))
+    assert nonceTimesGeneratorAddress == web3.toChecksumAddress(cleanHexStr(k256)[-40:])
+
+    e = web3.keccak(
+        hexstr=cleanHexStrPad(AGG_SIGNER_1.pubKeyX)
+        + AGG_SIGNER_1.pubKeyYParHex
+        + msgHashHex
+        + cleanHexStr(nonceTimesGeneratorAddress)
+    )
+    assert s == (k - AGG_SIGNER_1.privKeyInt * int(cleanHexStr(e), 16)) % Signer.Q_INT
+
+    # Same signature for every representation of the msgHash
+    assert AGG_SIGNER_1.sign("0x" + msgHashHex) == [s, nonceTimesGeneratorAddress]
+    assert AGG_SIGNER_1.sign(bytes(st_msgHash)) == [s, nonceTimesGeneratorAddress]
@@ -0,0 +1,61 @@
+import pytest
+from consts import *
+from brownie.test import given, strategy
+
+# Every available backend must match the py_ecc results
+@pytest.fixture(scope="module", params=list(CURVE_BACKENDS))
+def backend(request):
+    return CURVE_BACKENDS[request.param]()
+
+
+@given(
+    st_k=strategy("uint256"),
+    st_l=strategy("uint256", exclude=0),
+)
+def test_curveBackend(backend, st_k, st_l):
+    reference = PyEccBackend()
+    point = reference.base_multiply(st_l)
+
+    assert backend.base_multiply(st_k) == reference.base_multiply(st_k)
+    assert backend.multiply(point, st_k) == reference.multiply(point, st_k)
+    assert backend.add(point, backend.base_multiply(st_k)) == reference.add(
+        point, reference.base_multiply(st_k)
+    )
+
+
+def test_curveBackend_edge_cases(backend):
+    point = secp256k1.G
+    for k in [0, 1, 2, Signer.Q_INT - 1, Signer.Q_INT, Signer.Q_INT + 1, 2**256 - 1]:
+        assert backend.base_multiply(k) == tuple(secp256k1.multiply(point, k))
+        assert backend.multiply(point, k) == tuple(secp256k1.multiply(point, k))
+
+    assert backend.add(point, point) == tuple(secp256k1.add(point, point))
+    assert backend.add(point, (point[0], secp256k1.P - point[1])) == (0, 0)
+    assert backend.add((0, 0), point) == point
+
+
+@given(st_msgHash=strategy("uint256", exclude=0))
+def test_curveBackend_sign(schnorrTest, backend, st_msgHash):
+    msgHashHex = cleanHexStrPad(st_msgHash)
+    previousBackend = get_curve_backend().name
+
+    set_curve_backend(PyEccBackend.name)
+    sig = AGG_SIGNER_1.sign(msgHashHex)
+    set_curve_backend(backend.name)
+    try:
+        assert AGG_SIGNER_1.sign(msgHashHex) == sig
+        assert Signer(AGG_PRIV_HEX_1, AGG, nonces).getPubData() == (
+            AGG_SIGNER_1.getPubData()
+        )
+        assert verifySignature(st_msgHash, sig[0], *AGG_SIGNER_1.getPubData(), sig[1])
+    finally:
+        set_curve_backend(previousBackend)
+
+    assert schnorrTest.testVerifySignature(
+        st_msgHash, sig[0], *AGG_SIGNER_1.getPubData(), sig[1]
+    )
+
+
+def test_set_curve_backend_rev():
+    with pytest.raises(ValueError):
+        set_curve_backend("unknown")
@@ -0,0 +1,32 @@
+from consts import *
+from brownie.test import given, strategy
+
+
+@given(
+    st_msgHashes=strategy(
+        "uint256[]", min_value=1, min_length=1, max_length=10, unique=True
+    ),
+)
+def test_signMany(schnorrTest, st_msgHashes):
+    msgHashesHex = [cleanHexStrPad(msgHash) for msgHash in st_msgHashes]
+
+    sigs = AGG_SIGNER_1.sign_many(msgHashesHex)
+
+    assert len(sigs) == len(msgHashesHex)
+    for msgHash, msgHashHex, sig in zip(st_msgHashes, msgHashesHex, sigs):
+        assert sig == AGG_SIGNER_1.sign(msgHashHex)
+        assert schnorrTest.testVerifySignature(
+            msgHash, sig[0], *AGG_SIGNER_1.getPubData(), sig[1]
+        )
+
+
+def test_signMany_empty():
+    assert AGG_SIGNER_1.sign_many([]) == []
+
+
+def test_fixedBaseMultiplyMany_edge_scalars():
+    scalars = [0, 1, 2, Signer.Q_INT - 1, Signer.Q_INT, Signer.Q_INT + 1, 2**256 - 1]
+
+    assert fixed_base_multiply_many(scalars) == [
+        tuple(secp256k1.multiply(secp256k1.G, k)) for k in scalars
+    ]
@@ -0,0 +1,64 @@
+import pytest
+from consts import *
+from brownie import reverts
+from brownie.test import given, strategy
+
+
+# The python mirror must agree with the contract, including the revert reasons
+@given(
+    st_msgHash=strategy("uint256"),
+    st_sig=strategy("uint256"),
+    st_pubKeyX=strategy("uint256"),
+    st_pubKeyYParity=strategy("uint8", max_value=1),
+    st_address=strategy("address"),
+)
+def test_verifySignature_offchain_mirror(
+    schnorrTest, st_msgHash, st_sig, st_pubKeyX, st_pubKeyYParity, st_address
+):
+    args = (st_msgHash, st_sig, st_pubKeyX, st_pubKeyYParity, st_address)
+    try:
+        result = verifySignature(*args)
+    except ValueError as e:
+        with reverts(str(e)):
+            schnorrTest.testVerifySignature(*args)
+    else:
+        assert schnorrTest.testVerifySignature(*args) == result
+
+
+@given(
+    st_msgHashes=strategy(
+        "uint256[]", min_value=1, min_length=1, max_length=20, unique=True
+    ),
+    st_sig=strategy("uint256", min_value=1, max_value=Signer.Q_INT - 1),
+)
+def test_verifySignatures(schnorrTest, st_msgHashes, st_sig):
+    signatures = AGG_SIGNER_1.sign_many(
+        [cleanHexStrPad(msgHash) for msgHash in st_msgHashes]
+    )
+    sigs = [
+        (msgHash, s, *AGG_SIGNER_1.getPubData(), nonceTimesGeneratorAddress)
+        for msgHash, [s, nonceTimesGeneratorAddress] in zip(st_msgHashes, signatures)
+    ]
+    assert verifySignatures(sigs) == [True] * len(sigs)
+
+    # Tamper the first signature
+    sigs[0] = (sigs[0][0], st_sig, *sigs[0][2:])
+    results = verifySignatures(sigs)
+    assert results[0] == schnorrTest.testVerifySignature(*sigs[0])
+    assert results[1:] == [True] * (len(sigs) - 1)
+
+
+def test_verifySignature_offchain_sigData():
+    sigData = AGG_SIGNER_1.generate_sigData(JUNK_HEX_PAD, nonces)
+
+    assert verifySignature(JUNK_INT, sigData[0], *AGG_SIGNER_1.getPubData(), sigData[2])
+    assert not verifySignature(
+        JUNK_INT + 1, sigData[0], *AGG_SIGNER_1.getPubData(), sigData[2]
+    )
+
+
+def test_verifySigningKeyX():
+    verifySigningKeyX(AGG_SIGNER_1.getPubData()[0])
+
+    with pytest.raises(ValueError, match=REV_MSG_PUB_KEY_X):
+        verifySigningKeyX(Signer.HALF_Q_INT)
@@ -0,0 +1,56 @@
+from consts import *
+from shared_tests import *
+import pytest
+from brownie.test import given, strategy
+from hexbytes import HexBytes
+from address import Address
+
+
+@given(st_address=strategy("address"))
+def test_address_conversions(st_address):
+    address = Address(st_address)
+    raw = bytes.fromhex(str(st_address)[2:])
+
+    assert str(address) == str(st_address) == web3.toChecksumAddress(address.raw)
+    assert address.raw == bytes(address) == raw
+    for value in [
+        st_address,
+        str(st_address),
+        str(st_address).lower(),
+        str(st_address)[2:],
+        raw,
+        bytes(12) + raw,
+        HexBytes(raw),
+        address,
+    ]:
+        assert Address(value) == address
+
+    # Only equal to what hashes the same
+    for value in [raw, HexBytes(raw), address]:
+        assert address == value
+        assert not address != value
+        assert hash(address) == hash(value)
+    for value in [st_address, str(st_address), str(st_address).lower()]:
+        assert address != value
+        assert not address == value
+
+    # Same hash as the raw bytes
+    assert {raw: 1}[address] == 1
+    assert {address: 1}[raw] == 1
+    assert {address: 1}[Address(str(st_address).lower())] == 1
+
+
+def test_address_invalid():
+    for value in [
+        "0x1234",
+        JUNK_HEX_PAD,
+        bytes(19),
+        b"\x01" + bytes(31),
+        "notAnAddress",
+    ]:
+        with pytest.raises(ValueError):
+            Address(value)
+    assert Address(ZERO_ADDR).isZero()
+    assert not Address(NATIVE_ADDR).isZero()
+    assert Address(ZERO_ADDR) != "notAnAddress"
+    assert Address(ZERO_ADDR) != 0
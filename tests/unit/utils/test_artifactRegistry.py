@@ -0,0 +1,39 @@
+from consts import *
+from shared_tests import *
+from artifact_registry import ArtifactRegistry
+
+
+def test_artifactRegistry_selectors(cf):
+    artifactRegistry = ArtifactRegistry()
+    for contract in [cf.vault, cf.keyManager, cf.stateChainGateway, cf.flip]:
+        for selector, name in contract.selectors.items():
+            (_, abi) = artifactRegistry.function(selector)
+            assert abi["name"] == name
+
+        for name, topic0 in contract.topics.items():
+            (_, abi) = artifactRegistry.event(topic0)
+            assert abi["name"] == name
+
+    # Calldata is matched by its selector
+    tx = cf.flip.transfer(cf.BOB, TEST_AMNT, {"from": cf.ALICE})
+    (_, abi) = artifactRegistry.function(tx.input)
+    assert abi["name"] == "transfer"
+
+    assert artifactRegistry.function("0x00000000") is None
+    assert artifactRegistry.event(JUNK_HEX_PAD) is None
+
+
+def test_artifactRegistry_cached(cf):
+    artifactRegistry = ArtifactRegistry()
+    assert artifactRegistry.artifact("FLIP") is artifactRegistry.artifact("FLIP")
+    assert "FLIP" in artifactRegistry.names()
+    assert "IVault" in artifactRegistry.names()
+
+    flipContractObject = artifactRegistry.contract("FLIP", cf.flip.address)
+    assert flipContractObject is artifactRegistry.contract("FLIP", cf.flip.address)
+    assert flipContractObject.functions.balanceOf(cf.ALICE.address).call() == (
+        cf.flip.balanceOf(cf.ALICE)
+    )
+    assert get_contract_object("FLIP", cf.flip.address) is get_contract_object(
+        "FLIP", cf.flip.address
+    )
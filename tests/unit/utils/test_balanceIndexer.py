@@ -0,0 +1,56 @@
+from consts import *
+from shared_tests import *
+from brownie.test import given, strategy
+from balance_indexer import BalanceIndexer
+
+
+@given(
+    st_amounts=strategy("uint[]", max_value=TEST_AMNT, min_length=1, max_length=10),
+    st_checkpointInterval=strategy("uint", min_value=1, max_value=5),
+)
+def test_balanceIndexer(cf, tmp_path, st_amounts, st_checkpointInterval):
+    flipContractObject = get_contract_object("FLIP", cf.flip.address)
+    startBlock = 0
+    fetched = []
+    # tmp_path is shared by all the hypothesis examples, which revert the chain
+    path = str(tmp_path / f"balances{len(list(tmp_path.iterdir()))}.sqlite")
+
+    def fetchLogs(fromBlock, toBlock):
+        fetched.append((fromBlock, toBlock))
+        return scan_logs(flipContractObject.events.Transfer, fromBlock, toBlock)
+
+    def newIndexer():
+        return BalanceIndexer(
+            path,
+            cf.flip.address,
+            web3.eth.chain_id,
+            startBlock,
+            fetchLogs,
+            checkpointInterval=st_checkpointInterval,
+        )
+
+    holders = [cf.ALICE, cf.BOB, cf.CHARLIE]
+    blocks = []
+    for i, amount in enumerate(st_amounts):
+        cf.flip.transfer(holders[i % 2 + 1], amount, {"from": holders[i % 2]})
+        blocks.append(web3.eth.block_number)
+
+    balanceIndexer = newIndexer()
+    for block in blocks + blocks[::-1]:
+        balances = balanceIndexer.balancesAt(block)
+        for holder in holders:
+            assert balances.get(holder.address, 0) == cf.flip.balanceOf(
+                holder, block_identifier=block
+            )
+        assert balanceIndexer.totalBalance == cf.flip.totalSupply(
+            block_identifier=block
+        )
+    balanceIndexer.close()
+
+    # A new indexer resumes from the last checkpoint
+    fetched.clear()
+    balanceIndexer = newIndexer()
+    balances = balanceIndexer.balancesAt(blocks[-1])
+    assert fetched == []
+    assert balances.get(cf.ALICE.address, 0) == cf.flip.balanceOf(cf.ALICE)
+    balanceIndexer.close()
@@ -0,0 +1,124 @@
+from consts import *
+from shared_tests import *
+from event_store import EventStore
+
+
+def transfer_many(cf, amounts):
+    for amount in amounts:
+        cf.flip.transfer(cf.BOB, amount, {"from": cf.ALICE})
+
+
+def test_eventStore_fetch_events(cf, tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite"), confirmations=0)
+    flipContractObject = get_contract_object("FLIP", cf.flip.address)
+    event = flipContractObject.events.Transfer
+    fromBlock = web3.eth.block_number + 1
+
+    transfer_many(cf, [1, 2, 3])
+    events = list(fetch_events(event, from_block=fromBlock, store=store))
+    assert [e.args.value for e in events] == [1, 2, 3]
+
+    key = EventStore.key(
+        event_filter_params_for(event, None, fromBlock, "latest", None, None),
+        web3.eth.chain_id,
+    )
+    assert store.coverage(key) == (fromBlock, web3.eth.block_number)
+
+    # Served from the store
+    assert list(fetch_events(event, from_block=fromBlock, store=store)) == events
+    assert list(fetch_events(event, from_block=fromBlock)) == events
+
+    # Only the new blocks are fetched and the stored range is extended
+    transfer_many(cf, [4, 5])
+    events = list(fetch_events(event, from_block=fromBlock, store=store))
+    assert [e.args.value for e in events] == [1, 2, 3, 4, 5]
+    assert store.coverage(key) == (fromBlock, web3.eth.block_number)
+    assert events == list(fetch_events(event, from_block=fromBlock))
+
+    # Part of the range
+    assert list(
+        fetch_events(
+            event, from_block=fromBlock + 1, to_block=fromBlock + 2, store=store
+        )
+    ) == list(fetch_events(event, from_block=fromBlock + 1, to_block=fromBlock + 2))
+
+    # Persisted on disk
+    store.close()
+    store = EventStore(str(tmp_path / "events.sqlite"), confirmations=0)
+    assert store.coverage(key) == (fromBlock, web3.eth.block_number)
+    assert list(fetch_events(event, from_block=fromBlock, store=store)) == events
+
+
+def test_eventStore_scan_events(cf, tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite"), confirmations=0)
+    flipContractObject = get_contract_object("FLIP", cf.flip.address)
+    event = flipContractObject.events.Transfer
+    fromBlock = web3.eth.block_number + 1
+
+    transfer_many(cf, range(1, 11))
+    events = list(
+        scan_events(event, fromBlock, web3.eth.block_number, step=2, store=store)
+    )
+    assert [e.args.value for e in events] == list(range(1, 11))
+
+    transfer_many(cf, range(11, 16))
+    toBlock = web3.eth.block_number
+    events = list(scan_events(event, fromBlock, toBlock, step=2, store=store))
+    assert [e.args.value for e in events] == list(range(1, 16))
+    assert events == list(fetch_events(event, from_block=fromBlock, to_block=toBlock))
+
+    key = EventStore.key(
+        event_filter_params_for(event, None, fromBlock, toBlock, None, None),
+        web3.eth.chain_id,
+    )
+    assert store.coverage(key) == (fromBlock, toBlock)
+
+
+# Blocks that could still be reorged are not stored
+def test_eventStore_confirmations(cf, tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite"), confirmations=3)
+    flipContractObject = get_contract_object("FLIP", cf.flip.address)
+    event = flipContractObject.events.Transfer
+    fromBlock = web3.eth.block_number + 1
+
+    transfer_many(cf, [1, 2, 3, 4, 5])
+    events = list(fetch_events(event, from_block=fromBlock, store=store))
+    assert [e.args.value for e in events] == [1, 2, 3, 4, 5]
+
+    key = EventStore.key(
+        event_filter_params_for(event, None, fromBlock, "latest", None, None),
+        web3.eth.chain_id,
+    )
+    assert store.coverage(key) == (fromBlock, web3.eth.block_number - 3)
+    assert list(fetch_events(event, from_block=fromBlock, store=store)) == events
+
+
+# Logs of blocks that aren't in the chain anymore (e.g. a new hardhat session with the same
+# chainId and addresses) are dropped instead of being served
+def test_eventStore_chain_changed(cf, tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite"), confirmations=0)
+    flipContractObject = get_contract_object("FLIP", cf.flip.address)
+    event = flipContractObject.events.Transfer
+    fromBlock = web3.eth.block_number + 1
+
+    transfer_many(cf, [1, 2, 3])
+    events = list(fetch_events(event, from_block=fromBlock, store=store))
+    assert [e.args.value for e in events] == [1, 2, 3]
+
+    chain.undo(3)
+    transfer_many(cf, [4, 5, 6])
+    events = list(fetch_events(event, from_block=fromBlock, store=store))
+    assert [e.args.value for e in events] == [4, 5, 6]
+
+    key = EventStore.key(
+        event_filter_params_for(event, None, fromBlock, "latest", None, None),
+        web3.eth.chain_id,
+    )
+    assert store.coverage(key) == (fromBlock, web3.eth.block_number)
+
+    # Same when scanning
+    chain.undo(2)
+    transfer_many(cf, [7, 8])
+    toBlock = web3.eth.block_number
+    events = list(scan_events(event, fromBlock, toBlock, step=2, store=store))
+    assert [e.args.value for e in events] == [4, 7, 8]
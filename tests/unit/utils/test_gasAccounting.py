@@ -0,0 +1,102 @@
+from consts import *
+from shared_tests import *
+from brownie import chain, history
+from brownie.test import given, strategy
+from gas_accounting import GasAccounting, get_base_fees
+import gas_accounting
+
+
+# Gas spent the way it was calculated before, fetching every block
+def gasSpentByAddress(address, initialTransactionNumber):
+    nativeUsed = 0
+    for txReceipt in history.filter(sender=address)[initialTransactionNumber:]:
+        base_fee = web3.eth.get_block(txReceipt.block_number).baseFeePerGas
+        priority_fee = txReceipt.gas_price - base_fee
+        nativeUsed += (txReceipt.gas_used * base_fee) + (
+            txReceipt.gas_used * priority_fee
+        )
+    return nativeUsed
+
+
+@given(
+    st_senders=strategy("uint[]", max_value=2, min_length=1, max_length=10),
+    st_initialTransactionNumber=strategy("uint", max_value=5),
+)
+def test_gasSpentByAddress(cf, st_senders, st_initialTransactionNumber):
+    gasAccounting = GasAccounting()
+    senders = [cf.ALICE, cf.BOB, cf.CHARLIE]
+    for i, sender in enumerate(st_senders):
+        senders[sender].transfer(cf.DENICE, i + 1)
+
+        # Only the new transaction is processed on every call
+        for address in senders:
+            assert gasAccounting.gasSpentByAddress(
+                address, st_initialTransactionNumber
+            ) == gasSpentByAddress(address, st_initialTransactionNumber)
+        assert gasAccounting.processed == len(history)
+
+    tx = history[-1]
+    assert (
+        gasAccounting.gasTransaction(tx)
+        == calculateGasTransaction(tx)
+        == tx.gas_used * tx.gas_price
+    )
+
+
+def test_gasSpentByAddress_undo(cf):
+    gasAccounting = GasAccounting()
+    cf.ALICE.transfer(cf.BOB, 1)
+    spent = gasAccounting.gasSpentByAddress(cf.ALICE, 0)
+
+    cf.ALICE.transfer(cf.BOB, 1, gas_price=history[-1].gas_price * 2)
+    assert gasAccounting.gasSpentByAddress(cf.ALICE, 0) > spent
+
+    # The transaction is removed from the history and the totals are recalculated
+    chain.undo()
+    assert gasAccounting.gasSpentByAddress(cf.ALICE, 0) == spent
+    assert gasAccounting.gasSpentByAddress(cf.ALICE, 0) == gasSpentByAddress(
+        cf.ALICE, 0
+    )
+
+
+class FakeTx:
+    def __init__(self, sender, block_number, gas_used):
+        self.sender = sender
+        self.block_number = block_number
+        self.gas_used = gas_used
+        self.gas_price = 2
+
+
+# A transaction that isn't mined only holds back the later ones of the same sender
+def test_gasSpentByAddress_pending(monkeypatch):
+    stuck = FakeTx(NON_ZERO_ADDR, None, 100)
+    fakeHistory = [
+        FakeTx(NON_ZERO_ADDR, 1, 1),
+        stuck,
+        FakeTx(NATIVE_ADDR, 2, 10),
+        FakeTx(NON_ZERO_ADDR, 2, 1000),
+        FakeTx(NATIVE_ADDR, 3, 20),
+    ]
+    monkeypatch.setattr(gas_accounting, "history", fakeHistory)
+    gasAccounting = GasAccounting()
+    gasAccounting.baseFees = {1: 1, 2: 1, 3: 1}
+
+    assert gasAccounting.gasSpentByAddress(NON_ZERO_ADDR, 0) == 2
+    assert gasAccounting.gasSpentByAddress(NATIVE_ADDR, 0) == 60
+    assert gasAccounting.gasSpentByAddress(NATIVE_ADDR, 1) == 40
+
+    stuck.block_number = 3
+    assert gasAccounting.gasSpentByAddress(NON_ZERO_ADDR, 0) == 2202
+    assert gasAccounting.gasSpentByAddress(NON_ZERO_ADDR, 2) == 2000
+    assert gasAccounting.gasSpentByAddress(NATIVE_ADDR, 0) == 60
+
+
+def test_getBaseFees(cf):
+    for _ in range(3):
+        cf.ALICE.transfer(cf.BOB, 1)
+    blockNumbers = list(range(web3.eth.block_number - 2, web3.eth.block_number + 1))
+
+    assert get_base_fees(blockNumbers) == {
+        blockNumber: web3.eth.get_block(blockNumber).baseFeePerGas
+        for blockNumber in blockNumbers
+    }
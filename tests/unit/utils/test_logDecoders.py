@@ -0,0 +1,80 @@
+from consts import *
+from shared_tests import *
+from log_decoders import LogDecoders
+from brownie.test import given, strategy
+
+
+# Same values as web3's get_event_data for every arg and log field
+def assert_decoded(decoders, contractObject, logs):
+    assert len(logs) > 0
+    for log in logs:
+        decoded = decoders.decode(log)
+        event = getattr(contractObject.events, decoded.__class__.__name__)
+        expected = next(decode_logs(event, [log]))
+
+        assert decoded[: len(expected.args)] == tuple(expected.args.values())
+        assert decoded.address == expected.address
+        assert decoded.blockNumber == expected.blockNumber
+        assert decoded.transactionHash == expected.transactionHash
+        assert decoded.logIndex == expected.logIndex
+
+
+def get_logs(contract, fromBlock):
+    return web3.eth.get_logs({"address": contract.address, "fromBlock": fromBlock})
+
+
+@given(
+    st_amount=strategy("uint", min_value=1, max_value=TEST_AMNT),
+    st_dstAddress=strategy("bytes", max_size=100),
+    st_cfParameters=strategy("bytes", max_size=100),
+    st_dstChain=strategy("uint32"),
+)
+def test_logDecoders(cf, st_amount, st_dstAddress, st_cfParameters, st_dstChain):
+    decoders = LogDecoders.from_artifacts()
+    fromBlock = web3.eth.block_number + 1
+
+    # FLIP Transfer and Approval, Funded
+    cf.flip.transfer(cf.BOB, st_amount, {"from": cf.ALICE})
+    cf.flip.approve(cf.stateChainGateway, MIN_FUNDING, {"from": cf.ALICE})
+    cf.stateChainGateway.fundStateChainAccount(
+        JUNK_HEX, MIN_FUNDING, {"from": cf.ALICE}
+    )
+    # SwapNative with dynamic data
+    cf.vault.xSwapNative(
+        st_dstChain,
+        st_dstAddress,
+        0,
+        st_cfParameters,
+        {"from": cf.ALICE, "amount": st_amount},
+    )
+    # Struct in SignatureAccepted
+    signed_call_cf(cf, cf.keyManager.setGovKeyWithAggKey, cf.BOB)
+
+    assert_decoded(
+        decoders,
+        get_contract_object("IFLIP", cf.flip.address),
+        get_logs(cf.flip, fromBlock),
+    )
+    assert_decoded(
+        decoders,
+        get_contract_object("IStateChainGateway", cf.stateChainGateway.address),
+        get_logs(cf.stateChainGateway, fromBlock),
+    )
+    assert_decoded(
+        decoders,
+        get_contract_object("IVault", cf.vault.address),
+        get_logs(cf.vault, fromBlock),
+    )
+    assert_decoded(
+        decoders,
+        get_contract_object("IKeyManager", cf.keyManager.address),
+        get_logs(cf.keyManager, fromBlock),
+    )
+
+
+def test_logDecoders_unknown():
+    decoders = LogDecoders.from_artifacts()
+    assert (
+        decoders.decode({"topics": [bytes.fromhex(JUNK_HEX_PAD)], "data": "0x"}) is None
+    )
+    assert decoders.decode({"topics": [], "data": "0x"}) is None
@@ -0,0 +1,63 @@
+from consts import *
+from pipeline import Pipeline
+from log_decoders import LogDecoders
+from brownie.test import given, strategy
+import pytest
+
+
+@given(
+    st_chunks=strategy("uint[][]", max_value=1000, max_length=20),
+    st_maxsize=strategy("uint", min_value=1, max_value=4),
+)
+def test_pipeline(st_chunks, st_maxsize):
+    result = (
+        Pipeline(st_chunks, maxsize=st_maxsize)
+        .map(lambda chunk: [value * 2 for value in chunk])
+        .filter(lambda chunk: len(chunk) > 0)
+        .fold(lambda state, chunk: state + [chunk], [])
+    )
+
+    # Order is kept
+    assert result == [[value * 2 for value in chunk] for chunk in st_chunks if chunk]
+
+
+def test_pipeline_error():
+    def fail(chunk):
+        if chunk == 5:
+            raise ValueError("Failed chunk")
+        return chunk
+
+    with pytest.raises(ValueError, match="Failed chunk"):
+        Pipeline(range(10)).map(fail).fold(lambda state, chunk: state, None)
+
+
+# Stopping early doesn't leave any stage blocked
+def test_pipeline_close():
+    pipeline = Pipeline(range(1000), maxsize=1).map(lambda chunk: chunk)
+    for chunk in pipeline:
+        if chunk == 3:
+            break
+    pipeline.close()
+
+    assert all(not thread.is_alive() for thread in pipeline.threads)
+
+
+@given(
+    st_amounts=strategy("uint[]", min_value=1, max_value=TEST_AMNT, max_length=20),
+    st_step=strategy("uint", min_value=1, max_value=5),
+)
+def test_pipeline_scan_logs(cf, st_amounts, st_step):
+    fromBlock = web3.eth.block_number + 1
+    for amount in st_amounts:
+        cf.flip.transfer(cf.BOB, amount, {"from": cf.ALICE})
+
+    event = get_contract_object("FLIP", cf.flip.address).events.Transfer
+    transferDecoder = LogDecoders.from_artifacts(["FLIP"])["Transfer"]
+
+    total = (
+        Pipeline(scan_logs(event, fromBlock, web3.eth.block_number, step=st_step))
+        .map(lambda logs: [transferDecoder.decode(log) for log in logs])
+        .map(lambda events: [e.value for e in events if e.to == cf.BOB])
+        .fold(lambda state, values: state + values, [])
+    )
+    assert total == st_amounts
@@ -0,0 +1,61 @@
+from consts import *
+from address import Address
+from reconciliation import Reconciliation
+
+
+def test_reconciliation():
+    holders = [Address(web3.keccak(i.to_bytes(32, "big"))[-20:]) for i in range(6)]
+    expected = [(holders[i], (i + 1) * E_18) for i in range(5)]
+    # Two holders below the cutoff, only one of them airdropped
+    expected += [(holders[5], 1)]
+    expected = [(holder, str(amount)) for (holder, amount) in expected]
+
+    transfers = [[holders[0], E_18], [holders[4], 5 * E_18], [holders[5], 1]]
+    reconciliation = Reconciliation(expected, transfers, requiredMinAmount=2 * E_18)
+    assert not reconciliation.ok
+    assert reconciliation.missing == [
+        (holders[1], 2 * E_18),
+        (holders[2], 3 * E_18),
+        (holders[3], 4 * E_18),
+    ]
+    assert reconciliation.matched == 3
+
+    transfers += [
+        [holders[1], 2 * E_18],
+        [holders[2], 3 * E_18 + 1],
+        [holders[3], 4 * E_18],
+        [holders[3], 4 * E_18],
+        [Address(NON_ZERO_ADDR), 1],
+    ]
+    reconciliation = Reconciliation(expected, transfers, requiredMinAmount=2 * E_18)
+    assert not reconciliation.ok
+    assert reconciliation.missing == []
+    assert reconciliation.duplicated == [(holders[3], [4 * E_18, 4 * E_18])]
+    assert reconciliation.wrongAmount == [(holders[2], 3 * E_18, 3 * E_18 + 1)]
+    assert reconciliation.unexpected == [(Address(NON_ZERO_ADDR), 1)]
+    assert reconciliation.summary() == {
+        "expected": 6,
+        "received": 7,
+        "matched": 5,
+        "missing": 0,
+        "duplicated": 1,
+        "wrongAmount": 1,
+        "unexpected": 1,
+    }
+    report = reconciliation.report()
+    assert report["wrongAmount"] == [
+        {
+            "recipient": str(holders[2]),
+            "expected": str(3 * E_18),
+            "received": str(3 * E_18 + 1),
+        }
+    ]
+    assert report["unexpected"] == [{"recipient": NON_ZERO_ADDR, "received": "1"}]
+
+    # Without the extra transfers everything matches
+    reconciliation = Reconciliation(
+        expected,
+        transfers[:4] + [[holders[2], 3 * E_18]] + transfers[5:6],
+        requiredMinAmount=2 * E_18,
+    )
+    assert reconciliation.ok
@@ -0,0 +1,54 @@
+from consts import *
+from shared_tests import *
+import pytest
+from brownie.test import given, strategy
+from rpc_batch import RpcBatchClient, RpcError
+
+
+@given(
+    st_batchSize=strategy("uint", min_value=1, max_value=10),
+    st_poolSize=strategy("uint", min_value=1, max_value=4),
+    st_numCalls=strategy("uint", min_value=1, max_value=30),
+)
+def test_rpcBatch(cf, st_batchSize, st_poolSize, st_numCalls):
+    tx = cf.flip.transfer(cf.BOB, TEST_AMNT, {"from": cf.ALICE})
+    holders = [cf.ALICE, cf.BOB, cf.CHARLIE, cf.DENICE]
+
+    with RpcBatchClient(batchSize=st_batchSize, poolSize=st_poolSize) as client:
+        balances = [
+            client.getBalance(holders[i % len(holders)]) for i in range(st_numCalls)
+        ]
+        flipBalances = [
+            client.call(cf.flip.balanceOf, holders[i % len(holders)])
+            for i in range(st_numCalls)
+        ]
+        previousFlipBalance = client.call(
+            cf.flip.balanceOf, cf.BOB, block=tx.block_number - 1
+        )
+        block = client.getBlock(tx.block_number)
+        receipt = client.getTransactionReceipt(tx.txid)
+
+    for i in range(st_numCalls):
+        account = holders[i % len(holders)]
+        assert balances[i].result() == account.balance()
+        assert flipBalances[i].result() == cf.flip.balanceOf(account)
+    assert previousFlipBalance.result() == cf.flip.balanceOf(cf.BOB) - TEST_AMNT
+    assert int(block.result()["number"], 16) == tx.block_number
+    assert receipt.result()["transactionHash"] == tx.txid
+
+
+def test_rpcBatch_errors(cf):
+    with RpcBatchClient(batchSize=3) as client:
+        balance = client.getBalance(cf.ALICE)
+        invalid = client.request("eth_notAMethod", [])
+        nonceUsed = client.call(cf.keyManager.isNonceUsedByAggKey, 0)
+
+    # Each call fails on its own
+    assert balance.result() == cf.ALICE.balance()
+    with pytest.raises(RpcError):
+        invalid.result()
+    assert nonceUsed.result() == False
+
+    assert areNoncesUsed(cf.keyManager, [0, 1, 2]) == [
+        cf.keyManager.isNonceUsedByAggKey(nonce) for nonce in [0, 1, 2]
+    ]
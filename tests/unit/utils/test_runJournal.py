@@ -0,0 +1,36 @@
+from consts import *
+from run_journal import RunJournal
+
+
+def test_runJournal(tmp_path):
+    path = str(tmp_path / "journal.sqlite")
+    journal = RunJournal(path)
+    assert len(journal) == 0
+    assert not journal.isPhaseComplete("snapshot")
+    assert journal.getAddress("MultiSend") is None
+
+    journal.completePhase("snapshot", filename="snapshot.csv", blockNumber=1)
+    journal.setAddress("MultiSend", NATIVE_ADDR)
+    for i in range(3):
+        journal.recordTx(JUNK_HEX_PAD[:-1] + str(i), nonce=i)
+    journal.recordReceipt(JUNK_HEX_PAD[:-1] + "1", status=1)
+    journal.close()
+
+    # Resumed from the file
+    journal = RunJournal(path)
+    assert journal.isPhaseComplete("snapshot")
+    assert journal.get("phase", "snapshot") == {
+        "filename": "snapshot.csv",
+        "blockNumber": 1,
+    }
+    assert journal.getAddress("MultiSend") == NATIVE_ADDR
+    assert journal.pendingTxs() == {
+        JUNK_HEX_PAD[:-1] + "0": {"nonce": 0},
+        JUNK_HEX_PAD[:-1] + "2": {"nonce": 2},
+    }
+
+    # Entries are appended, the latest one is the current value
+    journal.setAddress("MultiSend", ZERO_ADDR)
+    assert journal.getAddress("MultiSend") == ZERO_ADDR
+    assert journal.all("address") == {"MultiSend": ZERO_ADDR}
+    assert len(journal) == 7
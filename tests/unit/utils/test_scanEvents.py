@@ -0,0 +1,167 @@
+from consts import *
+from shared_tests import *
+from brownie.test import given, strategy
+import utils
+import pytest
+import time
+
+
+@given(
+    st_amounts=strategy("uint[]", min_value=1, max_value=TEST_AMNT, max_length=20),
+    st_step=strategy("uint", min_value=1, max_value=10),
+    st_workers=strategy("uint", min_value=1, max_value=4),
+)
+def test_scanEvents(cf, st_amounts, st_step, st_workers):
+    fromBlock = web3.eth.block_number
+    for amount in st_amounts:
+        cf.flip.transfer(cf.BOB, amount, {"from": cf.ALICE})
+
+    flipContractObject = get_contract_object("FLIP", cf.flip.address)
+    events = list(
+        fetch_events(
+            flipContractObject.events.Transfer,
+            from_block=fromBlock,
+            to_block=web3.eth.block_number,
+        )
+    )
+    assert [event.args.value for event in events] == st_amounts
+
+    scannedEvents = list(
+        scan_events(
+            flipContractObject.events.Transfer,
+            fromBlock,
+            web3.eth.block_number,
+            step=st_step,
+            workers=st_workers,
+        )
+    )
+    assert scannedEvents == events
+
+
+# Ranges with more than maxEvents events are rejected as a provider would do
+@given(
+    st_amounts=strategy("uint[]", min_value=1, max_value=TEST_AMNT, max_length=20),
+    st_maxEvents=strategy("uint", min_value=1, max_value=5),
+)
+def test_scanEvents_split(cf, monkeypatch, st_amounts, st_maxEvents):
+    fromBlock = web3.eth.block_number
+    for amount in st_amounts:
+        cf.flip.transfer(cf.BOB, amount, {"from": cf.ALICE})
+
+    fetchLogs = utils.fetch_logs
+
+    def fetch_logs_limited(*args, **kwargs):
+        logs = fetchLogs(*args, **kwargs)
+        if len(logs) > st_maxEvents:
+            raise ValueError(
+                {"code": -32005, "message": "query returned more than 10000 results"}
+            )
+        return logs
+
+    monkeypatch.setattr(utils, "fetch_logs", fetch_logs_limited)
+    flipContractObject = get_contract_object("FLIP", cf.flip.address)
+    scannedEvents = list(
+        scan_events(
+            flipContractObject.events.Transfer,
+            fromBlock,
+            web3.eth.block_number,
+            step=100,
+        )
+    )
+
+    assert [event.args.value for event in scannedEvents] == st_amounts
+
+
+# Rate limited ranges are retried, other errors aren't taken as the range being too large
+def test_scanEvents_errors(cf, monkeypatch):
+    fromBlock = web3.eth.block_number
+    amounts = [1, 2, 3, 4]
+    for amount in amounts:
+        cf.flip.transfer(cf.BOB, amount, {"from": cf.ALICE})
+
+    fetchLogs = utils.fetch_logs
+    errors = []
+
+    def fetch_logs_failing(*args, **kwargs):
+        if errors:
+            raise errors.pop()
+        return fetchLogs(*args, **kwargs)
+
+    monkeypatch.setattr(utils, "fetch_logs", fetch_logs_failing)
+    monkeypatch.setattr(utils, "RATE_LIMIT_BACKOFF", 0)
+    flipContractObject = get_contract_object("FLIP", cf.flip.address)
+
+    def scan():
+        return list(
+            scan_events(
+                flipContractObject.events.Transfer,
+                fromBlock,
+                web3.eth.block_number,
+                step=100,
+                workers=1,
+            )
+        )
+
+    errors += [ValueError("429 Client Error: Too Many Requests")] * 3
+    assert [event.args.value for event in scan()] == amounts
+    assert errors == []
+
+    errors += [ValueError("daily request count limit exceeded, rate limited")] * (
+        utils.RATE_LIMIT_RETRIES + 1
+    )
+    with pytest.raises(ValueError, match="daily request count"):
+        scan()
+
+    errors[:] = [ValueError("Read timed out")]
+    with pytest.raises(ValueError, match="timed out"):
+        scan()
+
+
+# While the first range is split and retried, the ranges after it are only fetched up to a
+# window ahead instead of piling up in memory
+def test_scanEvents_headFailing(cf, monkeypatch):
+    fromBlock = web3.eth.block_number
+    amounts = list(range(1, 13))
+    for amount in amounts:
+        cf.flip.transfer(cf.BOB, amount, {"from": cf.ALICE})
+
+    (maxStep, workers) = (2, 2)
+    fetchLogs = utils.fetch_logs
+    head = {"failures": 0, "done": False, "maxToBlockMeanwhile": fromBlock}
+
+    def fetch_logs_headFailing(*args, **kwargs):
+        (start, end) = (kwargs["from_block"], kwargs["to_block"])
+        if start == fromBlock and not head["done"]:
+            if end > start:
+                raise ValueError(
+                    {
+                        "code": -32005,
+                        "message": "query returned more than 10000 results",
+                    }
+                )
+            if head["failures"] < 3:
+                head["failures"] += 1
+                time.sleep(0.1)
+                raise ValueError("429 Client Error: Too Many Requests")
+            head["done"] = True
+        elif not head["done"]:
+            head["maxToBlockMeanwhile"] = max(head["maxToBlockMeanwhile"], end)
+        return fetchLogs(*args, **kwargs)
+
+    monkeypatch.setattr(utils, "fetch_logs", fetch_logs_headFailing)
+    monkeypatch.setattr(utils, "RATE_LIMIT_BACKOFF", 0)
+    flipContractObject = get_contract_object("FLIP", cf.flip.address)
+    scannedEvents = list(
+        scan_events(
+            flipContractObject.events.Transfer,
+            fromBlock,
+            web3.eth.block_number,
+            step=maxStep,
+            max_step=maxStep,
+            workers=workers,
+        )
+    )
+
+    assert [event.args.value for event in scannedEvents] == amounts
+    assert head["failures"] == 3
+    assert head["maxToBlockMeanwhile"] < fromBlock + workers * maxStep + maxStep
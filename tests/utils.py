@@ -1,8 +1,19 @@
 import sys
+import time
 from brownie import web3, chain, history
 from web3._utils.filters import construct_event_filter_params
 from web3._utils.events import get_event_data
-import json
+from web3.exceptions import BlockNotFound
+from hexbytes import HexBytes
+from functools import lru_cache
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+from gas_accounting import GasAccounting
+from artifact_registry import artifactRegistry
+
+
+# Shared so that the base fees and running totals are kept across calls
+gasAccounting = GasAccounting()
 
 
 def cleanHexStr(thing):
@@ -32,19 +43,21 @@ def cleanHexStrPad(thing):
 
 
 def getCreate2Addr(sender, saltHex, contractContainer, argsHex):
-    deployByteCode = contractContainer.bytecode + argsHex
+    initCodeHash = getInitCodeHash(contractContainer.bytecode, argsHex)
     return web3.toChecksumAddress(
         web3.keccak(
-            hexstr=(
-                "ff"
-                + cleanHexStr(sender)
-                + saltHex
-                + cleanHexStr(web3.keccak(hexstr=deployByteCode))
-            )
+            hexstr=("ff" + cleanHexStr(sender) + saltHex + cleanHexStr(initCodeHash))
         )[-20:].hex()
     )
 
 
+# keccak of the init code (bytecode + constructor args). It only depends on the contract and
+# the args (e.g. the token of a Deposit), not on the salt, so it's computed once per pair.
+@lru_cache(maxsize=256)
+def getInitCodeHash(bytecode, argsHex):
+    return web3.keccak(hexstr=bytecode + argsHex)
+
+
 def getKeyFromValue(dic, value):
     for key, val in dic.items():
         if val == value:
@@ -95,14 +108,10 @@ def getChainTime():
 # Not using all history because we might not want to include deployment/setup transactions
 # Also, when testing with Rinkeby or a private blockchain, there might be previous
 # transactions (that is not an issue when a local hardhat node is span every time)
+# Only the transactions added to the history since the last call are processed (see GasAccounting)
 # NOTE: in case of failure related to gas calculations, refer to comment in test_all invariant_bals.
 def calculateGasSpentByAddress(address, initialTransactionNumber):
-    # history.filter returns a list of all the broadcasted transactions (not necessarily mined)
-    transactionList = history.filter(sender=address)[initialTransactionNumber:]
-    nativeUsed = 0
-    for txReceipt in transactionList:
-        nativeUsed += calculateGasTransaction(txReceipt)
-    return nativeUsed
+    return gasAccounting.gasSpentByAddress(address, initialTransactionNumber)
 
 
 # Calculate the gas spent in a single transaction
@@ -110,20 +119,13 @@ def calculateGasTransaction(txReceipt):
     # Might be necessary to wait for the transaction to be mined, especially in live networks that are slow.
     # Either check for status (txReceipt.status == 0 or == 1) or use wait_for_transaction_receipt.
     # web3.eth.wait_for_transaction_receipt(txReceipt.txid)
-
-    # Gas calculation
-    # Could be simplified with `txReceipt.gas_used * txReceipt.gas_price`, but keeping the calculation to show `base_fee + priority_fee`
-    base_fee = web3.eth.get_block(txReceipt.block_number).baseFeePerGas
-    priority_fee = txReceipt.gas_price - base_fee
-    return (txReceipt.gas_used * base_fee) + (txReceipt.gas_used * priority_fee)
+    return gasAccounting.gasTransaction(txReceipt)
 
 
 def get_contract_object(path_to_contract, address):
     ## path_to_contract from contracts folder. If a contract under the contracts folder, just the name of the contract.
-    with open("build/contracts/" + path_to_contract + ".json") as f:
-        info_json = json.load(f)
-    abi = info_json["abi"]
-    return web3.eth.contract(address=address, abi=abi)
+    ## The artifact is only read once and the contract objects are cached (see ArtifactRegistry)
+    return artifactRegistry.contract(path_to_contract, address)
 
 
 # In order to get the event from a contract do "get_contract_object("contract_name", contract_address).events.event_name
@@ -134,6 +136,7 @@ def fetch_events(
     to_block="latest",
     address=None,
     topics=None,
+    store=None,
 ):
     """Get events using eth_getLogs API.
 
@@ -146,12 +149,58 @@ def fetch_events(
     :param to_block: Fetch events until this contract
     :param address:
     :param topics:
+    :param store: EventStore to read the logs from and save them to
     :return:
     """
 
+    yield from decode_logs(
+        event,
+        fetch_logs(
+            event, argument_filters, from_block, to_block, address, topics, store
+        ),
+    )
+
+
+# Raw logs of fetch_events. If an EventStore is passed the logs are read from it where possible
+def fetch_logs(
+    event,
+    argument_filters=None,
+    from_block=None,
+    to_block="latest",
+    address=None,
+    topics=None,
+    store=None,
+):
     if from_block is None:
         raise TypeError("Missing mandatory keyword argument to getLogs: from_Block")
 
+    event_filter_params = event_filter_params_for(
+        event, argument_filters, from_block, to_block, address, topics
+    )
+
+    # Call node over JSON-RPC API
+    if store is not None:
+        return store.get_logs(
+            event_filter_params,
+            event.web3.eth.get_logs,
+            event.web3.eth.chain_id,
+            event.web3.eth.block_number,
+            lambda block_number: get_block_hash(event.web3, block_number),
+        )
+    return event.web3.eth.get_logs(event_filter_params)
+
+
+# Hash of a block as a hex string, None if the chain doesn't have it
+def get_block_hash(web3, block_number):
+    try:
+        return HexBytes(web3.eth.get_block(block_number).hash).hex()
+    except BlockNotFound:
+        return None
+
+
+def event_filter_params_for(
+    event, argument_filters, from_block, to_block, address, topics
+):
     abi = event._get_event_abi()
     abi_codec = event.web3.codec
 
@@ -169,14 +218,189 @@ def fetch_events(
         address=address,
         topics=topics,
     )
+    return event_filter_params
 
-    # Call node over JSON-RPC API
-    logs = event.web3.eth.get_logs(event_filter_params)
 
-    # Convert raw binary event data to easily manipulable Python objects
+# Convert raw binary event data to easily manipulable Python objects
+def decode_logs(event, logs):
+    abi = event._get_event_abi()
+    abi_codec = event.web3.codec
     for entry in logs:
-        data = get_event_data(abi_codec, abi, entry)
-        yield data
+        yield get_event_data(abi_codec, abi, entry)
+
+
+# Error messages returned by providers when a getLogs range has too many results or blocks
+RANGE_TOO_LARGE_ERRORS = [
+    "query returned more than",
+    "query exceeds max results",
+    "log response size exceeded",
+    "block range is too wide",
+    "block range too large",
+    "exceed maximum block range",
+    "eth_getlogs is limited to",
+    "query timeout exceeded",
+]
+# Error messages returned by providers when requests are rate limited. The range is retried
+# up to RATE_LIMIT_RETRIES times, waiting RATE_LIMIT_BACKOFF seconds doubled every time.
+RATE_LIMIT_ERRORS = [
+    "too many requests",
+    "rate limit",
+    "rate exceeded",
+    "exceeded its compute units",
+]
+RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_BACKOFF = 1.0
+
+
+def is_range_too_large(error):
+    message = str(error).lower()
+    return any(pattern in message for pattern in RANGE_TOO_LARGE_ERRORS)
+
+
+def is_rate_limited(error):
+    message = str(error).lower()
+    return not is_range_too_large(error) and any(
+        pattern in message for pattern in RATE_LIMIT_ERRORS
+    )
+
+
+# Same as fetch_events over [from_block, to_block] (both inclusive) but splitting it in
+# ranges that are fetched concurrently by a pool of `workers` threads. A range rejected by
+# the provider as too large is split in half and the range size is halved, every success
+# grows it again (up to max_step). Rate limited ranges are retried with a backoff and any
+# other error is raised. Events are yielded in (blockNumber, logIndex) order as
+# soon as all the ranges before them have been fetched.
+# If an EventStore is passed, the blocks already stored are read from it and only the rest
+# are fetched, storing them as they are yielded.
+def scan_events(
+    event,
+    from_block,
+    to_block,
+    argument_filters=None,
+    address=None,
+    topics=None,
+    step=10000,
+    max_step=100000,
+    workers=4,
+    store=None,
+):
+    for logs in scan_logs(
+        event,
+        from_block,
+        to_block,
+        argument_filters,
+        address,
+        topics,
+        step,
+        max_step,
+        workers,
+        store,
+    ):
+        yield from decode_logs(event, logs)
+
+
+# Raw logs of scan_events, yielded in chunks (one per block range) so that they can be
+# processed as they arrive without holding the whole range in memory (see pipeline.py).
+def scan_logs(
+    event,
+    from_block,
+    to_block,
+    argument_filters=None,
+    address=None,
+    topics=None,
+    step=10000,
+    max_step=100000,
+    workers=4,
+    store=None,
+):
+    def fetch(start, end):
+        attempt = 0
+        while True:
+            try:
+                logs = fetch_logs(
+                    event,
+                    argument_filters=argument_filters,
+                    from_block=start,
+                    to_block=end,
+                    address=address,
+                    topics=topics,
+                )
+                break
+            except Exception as e:
+                if not is_rate_limited(e) or attempt >= RATE_LIMIT_RETRIES:
+                    raise
+                time.sleep(RATE_LIMIT_BACKOFF * 2**attempt)
+                attempt += 1
+        return sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"]))
+
+    key = None
+    if store is not None:
+        latest_block = event.web3.eth.block_number
+        block_hash = lambda block_number: get_block_hash(event.web3, block_number)
+        key = store.key(
+            event_filter_params_for(
+                event, argument_filters, from_block, to_block, address, topics
+            ),
+            event.web3.eth.chain_id,
+        )
+    if key is not None:
+        coverage = store.coverage(key, block_hash)
+        # Read in ranges of max_step blocks to keep the chunks small
+        while coverage is not None and coverage[0] <= from_block <= coverage[1]:
+            end = min(from_block + max_step - 1, to_block, coverage[1])
+            yield store.read(key, from_block, end)
+            if end == to_block:
+                return
+            from_block = end + 1
+
+    # Ranges fetched, by starting block. Yielded once all previous ones are done. New ranges
+    # are only started within window blocks of the first one not yielded, so that while
+    # that one is retried or split the ones after it don't pile up in done.
+    done = {}
+    next_yield = from_block
+    next_start = from_block
+    window = workers * max_step
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+
+        def submit(start, end):
+            pending[executor.submit(fetch, start, end)] = (start, end)
+
+        while next_start <= to_block or pending:
+            # Keep the pool full
+            while (
+                next_start <= to_block
+                and next_start < next_yield + window
+                and len(pending) < workers
+            ):
+                end = min(next_start + step - 1, to_block)
+                submit(next_start, end)
+                next_start = end + 1
+
+            finished, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in finished:
+                (start, end) = pending.pop(future)
+                try:
+                    done[start] = (end, future.result())
+                    step = min(step * 2, max_step)
+                except Exception as e:
+                    if not is_range_too_large(e) or start == end:
+                        raise
+                    middle = (start + end) // 2
+                    submit(start, middle)
+                    submit(middle + 1, end)
+                    step = max((end - start + 1) // 2, 1)
+
+            while next_yield in done:
+                (end, logs) = done.pop(next_yield)
+                # In order, so the stored range is extended
+                if key is not None:
+                    store.write(key, logs, next_yield, end, latest_block, block_hash)
+                yield logs
+                next_yield = end + 1
 
 
 def prompt_user_continue_or_break(prompt, default_yes):